@@ -1,29 +1,593 @@
-
+# app/database.py
+import itertools
+import json
+import logging
+import math
 import psycopg2
+import psycopg2.pool
 import os
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
 from dotenv import load_dotenv
+from psycopg2 import extensions
 from psycopg2.extras import RealDictCursor
+from app.utils.metrics import METRICS_ENABLED, record_query
 
 # Load environment variables from .env
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 DB_HOST = os.getenv("DB_HOST", "localhost")
 DB_NAME = os.getenv("DB_NAME", "zomato_clone")
 DB_USER = os.getenv("DB_USER", "postgres")
 DB_PASSWORD = os.getenv("DB_PASSWORD", "postgres123")
 DB_PORT = os.getenv("DB_PORT", "5432")
 
-def get_db():
+# Storage engine behind db_connection(): "postgres" or "sqlite" (see app.database_sqlite)
+DB_BACKEND = os.getenv("DB_BACKEND", "postgres").lower()
+if DB_BACKEND not in ("postgres", "sqlite"):
+    raise ValueError(f"Unsupported DB_BACKEND: {DB_BACKEND}")
+IS_SQLITE = DB_BACKEND == "sqlite"
+
+# Serve queries through the asyncio pool in app.database_async instead of the threadpool
+# (Postgres only; SQLite queries are in-process and always run in the threadpool)
+DB_ASYNC = os.getenv("DB_ASYNC", "false").lower() in ("1", "true", "yes") and not IS_SQLITE
+
+# PREPARE the hot model queries once per connection and EXECUTE them by name (see
+# PreparedStatement). Turn off behind a transaction-pooling proxy such as PgBouncer,
+# where consecutive transactions may run on different server sessions.
+DB_PREPARED_STATEMENTS = os.getenv("DB_PREPARED_STATEMENTS", "true").lower() in ("1", "true", "yes")
+
+# Read replicas (Postgres only): a JSON list of libpq connection strings or
+# postgresql:// URLs, e.g. '["host=replica1 dbname=zomato_clone user=app", "host=replica2 ..."]'
+# (a list, since a multi-host connection string has commas of its own).
+# Read-only model functions use them through read_connection().
+DB_REPLICA_URLS = [] if IS_SQLITE else [url.strip() for url in json.loads(os.getenv("DB_REPLICA_URLS") or "[]") if url.strip()]
+DB_REPLICA_MAX_LAG = float(os.getenv("DB_REPLICA_MAX_LAG", "5"))  # seconds behind the primary before reads skip a replica
+DB_REPLICA_LAG_CHECK_INTERVAL = float(os.getenv("DB_REPLICA_LAG_CHECK_INTERVAL", "1"))  # seconds between lag measurements
+# A replica that has heard nothing from the primary for this long is treated as lagging
+# (the primary sends keepalives every wal_sender_timeout / 2, 30 seconds by default)
+DB_REPLICA_RECEIVER_TIMEOUT = float(os.getenv("DB_REPLICA_RECEIVER_TIMEOUT", "60"))
+# After a client writes, its reads stay on the primary for this long (see ReplicaRoutingMiddleware)
+DB_REPLICA_STICKY_SECONDS = float(os.getenv("DB_REPLICA_STICKY_SECONDS", str(DB_REPLICA_MAX_LAG)))
+
+# Connection pool settings
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "1"))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))  # seconds to wait for a free connection
+DB_POOL_MAX_LIFETIME = float(os.getenv("DB_POOL_MAX_LIFETIME", "1800"))  # recycle connections after this
+DB_POOL_HEALTH_CHECK_INTERVAL = float(os.getenv("DB_POOL_HEALTH_CHECK_INTERVAL", "30"))  # ping idle connections older than this
+
+
+class InstrumentedCursor(RealDictCursor):
+    """Dict cursor that reports every statement's duration to app.utils.metrics."""
+
+    def execute(self, query, vars=None):
+        start = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            record_query(time.perf_counter() - start)
+
+    def executemany(self, query, vars_list):
+        start = time.perf_counter()
+        try:
+            return super().executemany(query, vars_list)
+        finally:
+            record_query(time.perf_counter() - start)
+
+    def copy_expert(self, sql, file, size=8192):
+        start = time.perf_counter()
+        try:
+            return super().copy_expert(sql, file, size)
+        finally:
+            record_query(time.perf_counter() - start)
+
+
+def _numeric_as_float(value, cur):
+    return float(value) if value is not None else None
+
+
+# NUMERIC columns (prices) are parsed straight to float, the type every schema
+# and response uses, instead of to Decimal that callers then have to convert
+NUMERIC_AS_FLOAT = extensions.new_type(extensions.DECIMAL.values, "NUMERIC_AS_FLOAT", _numeric_as_float)
+
+
+class TrackingConnection(extensions.connection):
+    """
+    psycopg2 connection that remembers which prepared statements it has created
+    and marks the current request as having written when it commits.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared_statements = set()
+
+    def commit(self):
+        super().commit()
+        _record_write()
+
+
+def get_db(dsn=None):
     """
-    Get a new database connection.
+    Get a new database connection (to the primary, or to `dsn` if given).
     Remember to close() after use.
+
+    Prefer db_connection(), which borrows a connection from the shared pool.
     """
+    settings = {"dsn": dsn} if dsn else {
+        "host": DB_HOST, "database": DB_NAME, "user": DB_USER, "password": DB_PASSWORD, "port": DB_PORT,
+    }
     conn = psycopg2.connect(
-        host=DB_HOST,
-        database=DB_NAME,
-        user=DB_USER,
-        password=DB_PASSWORD,
-        port=DB_PORT,
-        cursor_factory=RealDictCursor
+        **settings,
+        connection_factory=TrackingConnection,
+        cursor_factory=InstrumentedCursor if METRICS_ENABLED else RealDictCursor
     )
+    # Registered per connection, so other psycopg2 users in the process keep Decimal
+    extensions.register_type(NUMERIC_AS_FLOAT, conn)
     return conn
+
+
+_PLACEHOLDER = re.compile(r"%[s%]")
+_prepared_statements = {}  # name -> PreparedStatement
+
+
+class PreparedStatement:
+    """
+    A query that is parsed and planned by Postgres once per connection.
+
+    The first execute_prepared() on a connection sends PREPARE with the query
+    (its %s placeholders numbered $1, $2, ...); after that only
+    `EXECUTE name (params)` goes over the wire. Create them at import time
+    with prepared_statement(), next to the query constants.
+    """
+
+    def __init__(self, name, query):
+        self.name = name
+        self.query = query
+        count = iter(range(1, query.count("%s") + 1))
+        numbered = _PLACEHOLDER.sub(lambda m: f"${next(count)}" if m.group() == "%s" else "%", query)
+        self.prepare_sql = f"PREPARE {name} AS {numbered.strip().rstrip(';')};"
+        params = ", ".join(["%s"] * query.count("%s"))
+        self.execute_sql = f"EXECUTE {name} ({params});" if params else f"EXECUTE {name};"
+
+    def __repr__(self):
+        return f"PreparedStatement({self.name!r})"
+
+
+def prepared_statement(name, query):
+    """Register `query` under `name` (a SQL identifier, unique across the models)."""
+    existing = _prepared_statements.get(name)
+    if existing is not None:
+        if existing.query != query:
+            raise ValueError(f"Prepared statement {name!r} is already registered for another query")
+        return existing
+    statement = _prepared_statements[name] = PreparedStatement(name, query)
+    return statement
+
+
+def execute_prepared(cur, statement, vars=()):
+    """
+    Run a PreparedStatement on `cur`, preparing it on the cursor's connection first
+    if needed. Falls back to executing the query text when prepared statements are
+    disabled and on SQLite, whose driver keeps its own cache of compiled statements.
+    """
+    prepared = getattr(getattr(cur, "connection", None), "prepared_statements", None)
+    if prepared is None or not DB_PREPARED_STATEMENTS:
+        return cur.execute(statement.query, vars)
+    if statement.name not in prepared:
+        cur.execute(statement.prepare_sql)
+        prepared.add(statement.name)
+    return cur.execute(statement.execute_sql, vars)
+
+
+# Errors either backend's driver can raise
+DatabaseError = (psycopg2.Error, sqlite3.Error)
+IntegrityError = (psycopg2.IntegrityError, sqlite3.IntegrityError)
+
+
+class PoolTimeoutError(psycopg2.pool.PoolError):
+    """Raised when no connection becomes available within the pool timeout."""
+
+
+class ConnectionPool:
+    """
+    Bounded, thread-safe pool of psycopg2 connections.
+
+    Connections are checked out with connection(), a context manager that
+    returns them to the pool afterwards. On checkout a connection that has
+    been idle longer than health_check_interval is pinged, and connections
+    older than max_lifetime are closed and replaced.
+    """
+
+    def __init__(self, connect, min_size=DB_POOL_MIN_SIZE, max_size=DB_POOL_MAX_SIZE,
+                 timeout=DB_POOL_TIMEOUT, max_lifetime=DB_POOL_MAX_LIFETIME,
+                 health_check_interval=DB_POOL_HEALTH_CHECK_INTERVAL):
+        if max_size < 1 or min_size > max_size:
+            raise ValueError("Invalid pool size settings")
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.health_check_interval = health_check_interval
+
+        self._cond = threading.Condition()
+        self._idle = deque()  # (conn, created_at, last_used)
+        self._created = {}  # id(conn) -> created_at, for checked-out connections
+        self._size = 0
+        self._closed = False
+
+        for _ in range(min_size):
+            conn = self._connect()
+            self._size += 1
+            now = time.monotonic()
+            self._idle.append((conn, now, now))
+
+    @property
+    def size(self):
+        return self._size
+
+    @property
+    def idle(self):
+        return len(self._idle)
+
+    def getconn(self):
+        """Check out a connection, waiting up to `timeout` seconds for one to free up."""
+        deadline = time.monotonic() + self.timeout
+        while True:
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise psycopg2.pool.PoolError("Connection pool is closed")
+                    if self._idle:
+                        conn, created_at, last_used = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        conn = None
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolTimeoutError(
+                            f"Timed out after {self.timeout}s waiting for a database connection"
+                        )
+                    self._cond.wait(remaining)
+
+            if conn is None:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    self._release_slot()
+                    raise
+                created_at = time.monotonic()
+            elif not self._is_usable(conn, created_at, last_used):
+                self._discard(conn)
+                continue
+
+            with self._cond:
+                self._created[id(conn)] = created_at
+            return conn
+
+    def putconn(self, conn):
+        """Return a connection to the pool, resetting any open transaction."""
+        with self._cond:
+            created_at = self._created.pop(id(conn), None)
+        if created_at is None:
+            raise psycopg2.pool.PoolError("Connection was not checked out from this pool")
+
+        if not conn.closed and conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+            try:
+                conn.rollback()
+            except DatabaseError:
+                pass
+
+        now = time.monotonic()
+        expired = now - created_at >= self.max_lifetime
+        if self._closed or conn.closed or expired or \
+                conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+            self._discard(conn)
+            return
+
+        with self._cond:
+            self._idle.append((conn, created_at, now))
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        conn = self.getconn()
+        try:
+            yield conn
+        finally:
+            self.putconn(conn)
+
+    def close(self):
+        """Close every idle connection; checked-out ones are closed when returned."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = list(self._idle), deque()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for conn, _, _ in idle:
+            conn.close()
+
+    def _is_usable(self, conn, created_at, last_used):
+        if conn.closed:
+            return False
+        now = time.monotonic()
+        if now - created_at >= self.max_lifetime:
+            return False
+        if now - last_used >= self.health_check_interval:
+            try:
+                with conn.cursor() as cur:
+                    cur.execute("SELECT 1;")
+                conn.rollback()
+            except DatabaseError:
+                return False
+        return True
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except DatabaseError:
+            pass
+        self._release_slot()
+
+    def _release_slot(self):
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Return the process-wide connection pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                if IS_SQLITE:
+                    from app.database_sqlite import connect
+                    _pool = ConnectionPool(connect)
+                else:
+                    _pool = ConnectionPool(get_db)
+    return _pool
+
+
+def close_pool():
+    global _pool, _replicas
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+        replicas, _replicas = _replicas, None
+    for replica in replicas or ():
+        replica.pool.close()
+
+
+def pool_metrics():
+    """Prometheus lines for the sync pool (none until it is first used)."""
+    pool = _pool
+    if pool is None:
+        return []
+    idle = pool.idle
+    lines = [
+        "# TYPE db_pool_connections gauge",
+        f'db_pool_connections{{state="idle"}} {idle}',
+        f'db_pool_connections{{state="in_use"}} {pool.size - idle}',
+        "# TYPE db_pool_max_connections gauge",
+        f"db_pool_max_connections {pool.max_size}",
+    ]
+    replicas = _replicas
+    if replicas:
+        lines.append("# TYPE db_replica_lag_seconds gauge")
+        lines.extend(
+            f'db_replica_lag_seconds{{replica="{n}"}} {"NaN" if replica.lag is None else replica.lag}'
+            for n, replica in enumerate(replicas)
+        )
+    return lines
+
+
+def db_connection():
+    """
+    Borrow a pooled database connection:
+
+        with db_connection() as conn:
+            cur = conn.cursor()
+            ...
+
+    Uncommitted work is rolled back when the connection is returned.
+    """
+    return get_pool().connection()
+
+
+# Seconds the replica's last replayed transaction is behind, or 0 if it has replayed
+# everything it has received (an idle primary sends nothing, so the replay timestamp ages).
+# NULL, i.e. lagging, unless the WAL receiver is streaming and has heard from the
+# primary in the last DB_REPLICA_RECEIVER_TIMEOUT seconds: a disconnected replica
+# has also replayed all it received. Reading pg_stat_wal_receiver needs pg_read_all_stats.
+REPLICA_LAG_QUERY = """
+SELECT CASE
+    WHEN receiver.status IS DISTINCT FROM 'streaming'
+        OR receiver.last_msg_receipt_time IS NULL
+        OR receiver.last_msg_receipt_time < now() - make_interval(secs => %s) THEN NULL
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+END AS lag
+FROM (SELECT 1) one
+LEFT JOIN pg_stat_wal_receiver receiver ON true;
+"""
+
+
+class Replica:
+    """A read replica's connection pool and its most recently measured lag."""
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.lag = None  # seconds, None until measured, if the last check failed or the replica is disconnected
+        self._checked_at = float("-inf")
+        self._lock = threading.Lock()
+
+    def caught_up(self, conn):
+        """
+        Whether the replica is at most DB_REPLICA_MAX_LAG seconds behind, measured
+        on `conn` at most every DB_REPLICA_LAG_CHECK_INTERVAL seconds.
+        """
+        with self._lock:
+            now = time.monotonic()
+            due = now - self._checked_at >= DB_REPLICA_LAG_CHECK_INTERVAL
+            if due:
+                # Other threads use the previous measurement meanwhile
+                self._checked_at = now
+        if due:
+            try:
+                with conn.cursor() as cur:
+                    cur.execute(REPLICA_LAG_QUERY, (DB_REPLICA_RECEIVER_TIMEOUT,))
+                    lag = cur.fetchone()["lag"]
+                self.lag = None if lag is None else float(lag)
+                conn.rollback()
+            except DatabaseError as e:
+                logger.warning("Could not measure replica lag: %s", e)
+                self.lag = None
+        return self.lag is not None and self.lag <= DB_REPLICA_MAX_LAG
+
+
+_replicas = None
+_replica_turn = itertools.count()
+
+
+def get_replicas():
+    """The process-wide replica pools, in DB_REPLICA_URLS order ([] without replicas)."""
+    global _replicas
+    if _replicas is None:
+        with _pool_lock:
+            if _replicas is None:
+                _replicas = [
+                    Replica(ConnectionPool(lambda url=url: get_db(url), min_size=0)) for url in DB_REPLICA_URLS
+                ]
+    return _replicas
+
+
+class RequestRouting:
+    """Where the current request's reads go; see ReplicaRoutingMiddleware."""
+
+    def __init__(self, sticky=False):
+        self.sticky = sticky  # the client wrote recently (it sent the sticky cookie)
+        self.wrote = False    # this request has committed a write
+        self.replica = None   # replica this request reads from, once chosen
+
+    @property
+    def primary(self):
+        return self.sticky or self.wrote
+
+
+# Routing state of the request being served, if any
+_request_routing = ContextVar("request_routing", default=None)
+
+
+def _record_write():
+    routing = _request_routing.get()
+    if routing is not None:
+        routing.wrote = True
+
+
+def _checkout_replica(replicas, routing):
+    if routing is not None and routing.replica is not None:
+        # One replica per request, so reads within it never go back in time
+        candidates = [routing.replica]
+    else:
+        start = next(_replica_turn) % len(replicas)
+        candidates = replicas[start:] + replicas[:start]
+    for replica in candidates:
+        try:
+            conn = replica.pool.getconn()
+        except (*DatabaseError, psycopg2.pool.PoolError) as e:
+            logger.warning("Read replica unavailable, trying the next one: %s", e)
+            continue
+        if replica.caught_up(conn):
+            if routing is not None:
+                routing.replica = replica
+            return replica, conn
+        replica.pool.putconn(conn)
+    return None, None
+
+
+@contextmanager
+def read_connection():
+    """
+    Borrow a connection for a read-only query, like db_connection():
+
+        with read_connection() as conn:
+            cur = conn.cursor()
+            ...
+
+    Comes from a read replica at most DB_REPLICA_MAX_LAG seconds behind, and
+    from the primary when there are no replicas, none is caught up, or the
+    request has written (read-your-writes).
+    """
+    replicas = get_replicas()
+    routing = _request_routing.get()
+    replica, conn = (None, None) if not replicas or (routing is not None and routing.primary) \
+        else _checkout_replica(replicas, routing)
+    if conn is None:
+        with get_pool().connection() as conn:
+            yield conn
+        return
+    try:
+        yield conn
+    finally:
+        replica.pool.putconn(conn)
+
+
+def _cookie_names(scope):
+    names = set()
+    for name, value in scope.get("headers", ()):
+        if name == b"cookie":
+            names.update(part.split(b"=", 1)[0].strip() for part in value.split(b";"))
+    return names
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Pure ASGI middleware giving each request read-your-writes over replicas.
+
+    Once a request commits, its later reads use the primary, and the response
+    sets a short-lived cookie so the same client's next requests (for
+    DB_REPLICA_STICKY_SECONDS) read from the primary too, until the replicas
+    have caught up with what it wrote.
+    """
+
+    STICKY_COOKIE = b"db_primary"
+
+    def __init__(self, app):
+        self.app = app
+        self.sticky_header = (
+            b"set-cookie",
+            self.STICKY_COOKIE + f"=1; Max-Age={math.ceil(DB_REPLICA_STICKY_SECONDS)}; Path=/; HttpOnly; SameSite=Lax".encode(),
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        routing = RequestRouting(sticky=self.STICKY_COOKIE in _cookie_names(scope))
+        token = _request_routing.set(routing)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and routing.wrote:
+                message["headers"] = [*message.get("headers", []), self.sticky_header]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_routing.reset(token)
@@ -0,0 +1,154 @@
+# app/database_async.py
+"""
+Asyncio-native database access.
+
+When DB_ASYNC is enabled the API talks to Postgres through a psycopg 3
+AsyncConnectionPool, so route handlers await queries on the event loop
+instead of occupying a threadpool slot each. Model functions that have an
+async counterpart register it with @async_variant, and routes call them
+through run_query(), which picks the right implementation for the
+configured mode.
+"""
+import time
+from contextlib import asynccontextmanager
+from starlette.concurrency import run_in_threadpool
+from app.database import (
+    DB_ASYNC, DB_PREPARED_STATEMENTS, DB_HOST, DB_NAME, DB_USER, DB_PASSWORD, DB_PORT,
+    DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE, DB_POOL_TIMEOUT, DB_POOL_MAX_LIFETIME,
+    PoolTimeoutError,
+)
+from app.utils.metrics import METRICS_ENABLED, record_query
+
+_pool = None
+
+
+def _instrumented_cursor_class():
+    """psycopg 3 counterpart of app.database.InstrumentedCursor."""
+    from psycopg import AsyncCursor
+
+    class InstrumentedAsyncCursor(AsyncCursor):
+        async def execute(self, query, params=None, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await super().execute(query, params, **kwargs)
+            finally:
+                record_query(time.perf_counter() - start)
+
+        async def executemany(self, query, params_seq, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await super().executemany(query, params_seq, **kwargs)
+            finally:
+                record_query(time.perf_counter() - start)
+
+    return InstrumentedAsyncCursor
+
+
+async def _configure_connection(conn):
+    # Same as app.database.NUMERIC_AS_FLOAT: NUMERIC columns load as float, not Decimal
+    from psycopg.types.numeric import FloatLoader
+    conn.adapters.register_loader("numeric", FloatLoader)
+
+
+async def open_async_pool():
+    """Open the process-wide async pool (psycopg 3 is only required in async mode)."""
+    global _pool
+    from psycopg.rows import dict_row
+    from psycopg_pool import AsyncConnectionPool
+
+    if _pool is not None:
+        return _pool
+    connect_kwargs = {
+        "host": DB_HOST,
+        "dbname": DB_NAME,
+        "user": DB_USER,
+        "password": DB_PASSWORD,
+        "port": DB_PORT,
+        "row_factory": dict_row,
+        # psycopg 3 prepares a query by itself after this many executions on a connection
+        "prepare_threshold": 5 if DB_PREPARED_STATEMENTS else None,
+    }
+    if METRICS_ENABLED:
+        connect_kwargs["cursor_factory"] = _instrumented_cursor_class()
+    _pool = AsyncConnectionPool(
+        conninfo="",
+        kwargs=connect_kwargs,
+        configure=_configure_connection,
+        min_size=DB_POOL_MIN_SIZE,
+        max_size=DB_POOL_MAX_SIZE,
+        timeout=DB_POOL_TIMEOUT,
+        max_lifetime=DB_POOL_MAX_LIFETIME,
+        check=AsyncConnectionPool.check_connection,
+        open=False,
+    )
+    await _pool.open()
+    return _pool
+
+
+async def close_async_pool():
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+
+
+@asynccontextmanager
+async def async_db_connection():
+    """
+    Borrow a connection from the async pool:
+
+        async with async_db_connection() as conn:
+            async with conn.cursor() as cur:
+                ...
+
+    Uncommitted work is rolled back when the connection is returned.
+    """
+    from psycopg import Error
+    from psycopg_pool import PoolTimeout
+
+    if _pool is None:
+        raise RuntimeError("Async database pool is not open; is DB_ASYNC enabled?")
+    try:
+        conn = await _pool.getconn()
+    except PoolTimeout as e:
+        raise PoolTimeoutError(str(e)) from e
+    try:
+        yield conn
+    finally:
+        if not conn.closed:
+            try:
+                await conn.rollback()
+            except Error:
+                pass
+        await _pool.putconn(conn)
+
+
+async def execute_prepared_async(cur, statement, params=()):
+    """
+    Async counterpart of app.database.execute_prepared: psycopg 3 keeps the
+    per-connection PREPAREd statements itself, keyed by query text, so the
+    statement is just prepared on its first execution instead of its fifth.
+    """
+    await cur.execute(statement.query, params, prepare=DB_PREPARED_STATEMENTS)
+
+
+def async_variant(sync_fn):
+    """Register the decorated coroutine function as the async counterpart of sync_fn."""
+    def register(async_fn):
+        sync_fn.async_variant = async_fn
+        return async_fn
+    return register
+
+
+async def run_query(fn, *args, **kwargs):
+    """
+    Call a model function without blocking the event loop.
+
+    In async mode the function's registered async variant is awaited directly;
+    otherwise (or if it has none) the sync function runs in the threadpool.
+    """
+    if DB_ASYNC:
+        async_fn = getattr(fn, "async_variant", None)
+        if async_fn is not None:
+            return await async_fn(*args, **kwargs)
+    return await run_in_threadpool(fn, *args, **kwargs)
@@ -1,85 +1,272 @@
-import sqlite3
+"""
+SQLite storage backend (DB_BACKEND=sqlite).
+
+Connections are wrapped so the models' psycopg2-style code runs unchanged:
+cursors take `%s` placeholders, return rows as dicts, and support the
+handful of Postgres constructs the models use (NOW() and
+timezone('UTC', now()), `= ANY(%s)` with a list parameter). Every connection runs in WAL mode with pragmas tuned for
+many concurrent readers and one writer, and TIMESTAMP / NUMERIC columns
+come back as datetime / float like they do from Postgres. Parameters and
+results are converted by the wrapper itself, so other sqlite3 users in the
+process keep the standard adapters and converters.
+"""
+import json
 import os
+import re
+import sqlite3
+import time
 from contextlib import contextmanager
+from datetime import datetime
+from decimal import Decimal
+from functools import lru_cache
+from psycopg2 import extensions
+from app.utils.metrics import METRICS_ENABLED, record_query
+
+DATABASE_PATH = os.getenv("SQLITE_PATH", "zomato_clone.db")
+SQLITE_BUSY_TIMEOUT = float(os.getenv("SQLITE_BUSY_TIMEOUT", "5"))  # seconds a writer waits for the lock
+
+PRAGMAS = (
+    "PRAGMA journal_mode = WAL",        # readers never block the writer (or each other)
+    "PRAGMA synchronous = NORMAL",      # fsync on checkpoint only; safe with WAL
+    "PRAGMA foreign_keys = ON",         # ON DELETE CASCADE
+    "PRAGMA cache_size = -65536",       # 64MB page cache per connection
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA mmap_size = 268435456",     # 256MB memory-mapped reads
+)
+
+# Timestamps are stored as 'YYYY-MM-DD HH:MM:SS.SSS' text, which sorts chronologically
+TIMESTAMP_SQL = "(strftime('%Y-%m-%d %H:%M:%f', 'now'))"
+
+
+def _adapt_datetime(value):
+    # Same format as TIMESTAMP_SQL, so keyset comparisons against stored values are exact
+    return value.strftime("%Y-%m-%d %H:%M:%S.") + f"{value.microsecond // 1000:03d}"
+
+
+# Parameter types sqlite3 cannot bind, by exact type like sqlite3.register_adapter
+_ADAPTERS = {
+    datetime: _adapt_datetime,
+    Decimal: float,
+    list: json.dumps,  # for `= ANY(%s)`, see translate()
+}
+
+
+def _adapt(params):
+    return tuple(_ADAPTERS[type(value)](value) if type(value) in _ADAPTERS else value for value in params)
+
+
+def _convert_numeric(value):
+    # NUMERIC affinity stores whole numbers as integers
+    return float(value) if type(value) is int else value
+
+
+def _convert_timestamp(value):
+    return datetime.fromisoformat(value) if type(value) is str else value
+
+
+# Declared column type (first word, as sqlite3.PARSE_DECLTYPES reads it) -> result converter
+_CONVERTERS = {
+    "TIMESTAMP": _convert_timestamp,
+    "NUMERIC": _convert_numeric,
+}
+_DECLTYPE = re.compile(r"\w+")
+_DDL = re.compile(r"^(\s*--[^\n]*\n)*\s*(CREATE|ALTER|DROP)\b", re.IGNORECASE)
+
+_ANY_PARAM = re.compile(r"=\s*ANY\s*\(\s*%s\s*\)", re.IGNORECASE)
+_NOW = re.compile(r"\bNOW\(\)", re.IGNORECASE)
+# SQLite's clock is UTC already
+_UTC_NOW = re.compile(r"\btimezone\(\s*'UTC'\s*,\s*now\(\)\s*\)", re.IGNORECASE)
+
+
+@lru_cache(maxsize=512)
+def translate(query):
+    """Rewrite a psycopg2-style query for SQLite."""
+    query = _ANY_PARAM.sub("IN (SELECT value FROM json_each(%s))", query)
+    query = query.replace("%s", "?").replace("%%", "%")
+    return _NOW.sub(TIMESTAMP_SQL, _UTC_NOW.sub(TIMESTAMP_SQL, query))
+
+
+@lru_cache(maxsize=512)
+def _changes_schema(query):
+    return _DDL.match(query) is not None
+
+
+def split_statements(script):
+    """Split a SQL script into complete statements (cursor.execute runs one at a time)."""
+    statements = []
+    current = ""
+    for line in script.splitlines(keepends=True):
+        current += line
+        if sqlite3.complete_statement(current):
+            if current.strip():
+                statements.append(current.strip())
+            current = ""
+    if current.strip() and not current.strip().startswith("--"):
+        statements.append(current.strip())
+    return statements
+
+
+class _Rows:
+    """
+    Row factory for one connection: rows as dicts, with the values of
+    TIMESTAMP / NUMERIC columns converted. Result columns are matched to the
+    schema by name (a name has the same type in every table), so aliases
+    such as `SUM(revenue) AS revenue` are converted too. The schema is
+    read on first use and again after DDL run through the wrapper.
+    """
+
+    def __init__(self, conn):
+        self._conn = conn
+        self._types = None  # column name -> converter
+        self._description = None
+        self._converters = ()
+
+    def invalidate(self):
+        self._types = None
+        self._description = None
+
+    def load(self):
+        if self._types is not None:
+            return
+        types = {}
+        tables = self._conn.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'view');").fetchall()
+        for table in tables:
+            for column in self._conn.execute("SELECT name, type FROM pragma_table_info(?);", (table["name"],)):
+                decltype = _DECLTYPE.match(column["type"] or "")
+                converter = decltype and _CONVERTERS.get(decltype.group().upper())
+                if converter:
+                    types[column["name"]] = converter
+        self._types = types
+
+    def __call__(self, cursor, row):
+        description = cursor.description
+        if description is not self._description:
+            types = self._types or {}
+            self._converters = tuple((column[0], types.get(column[0])) for column in description)
+            self._description = description
+        return {
+            name: converter(value) if converter and value is not None else value
+            for (name, converter), value in zip(self._converters, row)
+        }
+
+
+class SQLiteCursor:
+    """psycopg2-compatible cursor over sqlite3."""
+
+    def __init__(self, cursor, rows):
+        self._cursor = cursor
+        self._rows = rows
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    def execute(self, query, vars=None):
+        start = time.perf_counter()
+        try:
+            self._rows.load()
+            self._cursor.execute(translate(query), _adapt(vars) if vars is not None else ())
+            if _changes_schema(query):
+                self._rows.invalidate()
+        finally:
+            if METRICS_ENABLED:
+                record_query(time.perf_counter() - start)
+        return None
+
+    def executemany(self, query, vars_list):
+        start = time.perf_counter()
+        try:
+            self._rows.load()
+            self._cursor.executemany(translate(query), [_adapt(v) for v in vars_list])
+        finally:
+            if METRICS_ENABLED:
+                record_query(time.perf_counter() - start)
+        return None
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def close(self):
+        self._cursor.close()
+
+
+class SQLiteConnection:
+    """psycopg2-compatible connection, so app.database.ConnectionPool can manage it."""
+
+    def __init__(self, conn):
+        self._conn = conn
+        self._rows = conn.row_factory
+        self.closed = False
+
+    def cursor(self):
+        return SQLiteCursor(self._conn.cursor(), self._rows)
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def close(self):
+        if not self.closed:
+            self._conn.close()
+            self.closed = True
+
+    def get_transaction_status(self):
+        if self._conn.in_transaction:
+            return extensions.TRANSACTION_STATUS_INTRANS
+        return extensions.TRANSACTION_STATUS_IDLE
+
+
+def connect(path=None):
+    conn = sqlite3.connect(
+        path or DATABASE_PATH,
+        timeout=SQLITE_BUSY_TIMEOUT,
+        # The pool hands connections between threads, one at a time
+        check_same_thread=False,
+    )
+    conn.row_factory = _Rows(conn)
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    return SQLiteConnection(conn)
 
-DATABASE_PATH = "zomato_clone.db"
 
 def get_db():
-    """Get a SQLite database connection with row factory for dict-like access"""
-    conn = sqlite3.connect(DATABASE_PATH)
-    conn.row_factory = sqlite3.Row  # This makes rows behave like dictionaries
-    return conn
+    """Get a new SQLite connection. Remember to close() after use."""
+    return connect()
+
 
 @contextmanager
 def get_db_connection():
-    """Context manager for database connections"""
+    """Context manager for a standalone (unpooled) connection"""
     conn = get_db()
     try:
         yield conn
     finally:
         conn.close()
 
+
 def init_database():
-    """Initialize the database with all required tables"""
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        
-        # Users table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username VARCHAR(50) UNIQUE NOT NULL,
-                email VARCHAR(100) UNIQUE NOT NULL,
-                password_hash VARCHAR(255) NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # Restaurants table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS restaurants (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name VARCHAR(100) NOT NULL,
-                description TEXT,
-                address TEXT,
-                phone VARCHAR(20),
-                image_url VARCHAR(255),
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # Menu items table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS menu_items (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                restaurant_id INTEGER NOT NULL,
-                name VARCHAR(100) NOT NULL,
-                description TEXT,
-                price DECIMAL(10,2) NOT NULL,
-                category VARCHAR(50),
-                image_url VARCHAR(255),
-                is_available BOOLEAN DEFAULT 1,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (restaurant_id) REFERENCES restaurants(id) ON DELETE CASCADE
-            )
-        """)
-        
-        # Orders table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS orders (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                customer_id INTEGER NOT NULL,
-                restaurant_id INTEGER NOT NULL,
-                total_price DECIMAL(10,2) NOT NULL,
-                status VARCHAR(20) CHECK (status IN ('placed', 'delivered')) DEFAULT 'placed',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (customer_id) REFERENCES users(id) ON DELETE CASCADE,
-                FOREIGN KEY (restaurant_id) REFERENCES restaurants(id) ON DELETE CASCADE
-            )
-        """)
-        
-        conn.commit()
-        print("Database initialized successfully!")
+    """Create or upgrade the schema at DATABASE_PATH"""
+    from app.database import DB_BACKEND
+    from app.migrate import run_migrations
+    if DB_BACKEND != "sqlite":
+        raise SystemExit("Set DB_BACKEND=sqlite to initialise the SQLite database")
+    run_migrations()
+
 
 if __name__ == "__main__":
     init_database()
@@ -1,9 +1,61 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from app.routes import users, resturants, menu, orders, upload
+from fastapi.responses import JSONResponse, PlainTextResponse
+from starlette.concurrency import run_in_threadpool
+from app.database import DB_ASYNC, DB_REPLICA_URLS, IS_SQLITE, PoolTimeoutError, ReplicaRoutingMiddleware, close_pool, pool_metrics
+from app.database_async import open_async_pool, close_async_pool
+from app.migrate import DB_MIGRATE_ON_STARTUP, run_migrations
+from app.models.analytics import SALES_FOLD_INTERVAL, fold_sales_deltas
+from app.models.menu_item import menu_cache
+from app.models.orders import IDEMPOTENCY_KEY_PURGE_INTERVAL, purge_idempotency_keys
+from app.models.users import user_cache
+from app.routes import users, resturants, menu, orders, search, upload, analytics
+from app.utils.auth import token_cache
+from app.utils.events import hub as event_hub
+from app.utils.hashing import start_hash_workers, shutdown_hash_workers
+from app.utils.images import start_image_workers, shutdown_image_workers
+from app.utils.metrics import (
+    METRICS_ENABLED, MetricsMiddleware, cache_collector, register_collector, render_metrics,
+)
+from app.utils.idempotency import REPLAYED_HEADER
+from app.utils.notifications import listener
+from app.utils.pagination import NEXT_CURSOR_HEADER
+from app.utils.periodic import PeriodicTask
+from app.utils.uploads import UPLOAD_DIR, UploadFiles
+
+maintenance = [PeriodicTask("purge-idempotency-keys", IDEMPOTENCY_KEY_PURGE_INTERVAL, purge_idempotency_keys)]
+# SQLite's triggers update the sales rollups directly; there is nothing to fold
+if not IS_SQLITE:
+    maintenance.append(PeriodicTask("fold-sales-deltas", SALES_FOLD_INTERVAL, fold_sales_deltas))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if DB_MIGRATE_ON_STARTUP:
+        await run_in_threadpool(run_migrations)
+    if DB_ASYNC:
+        await open_async_pool()
+    # Cross-worker cache invalidation and order events (no-op unless something subscribed)
+    listener.start()
+    start_image_workers()
+    start_hash_workers()
+    for task in maintenance:
+        task.start()
+    yield
+    for task in maintenance:
+        await run_in_threadpool(task.stop)
+    event_hub.close_all()
+    await run_in_threadpool(listener.stop)
+    await run_in_threadpool(shutdown_image_workers)
+    await run_in_threadpool(shutdown_hash_workers)
+    # Release pooled database connections on shutdown
+    if DB_ASYNC:
+        await close_async_pool()
+    close_pool()
+
 
-app = FastAPI(title="Zomato Clone API", version="1.0.0")
+app = FastAPI(title="Zomato Clone API", version="1.0.0", lifespan=lifespan)
 
 # Add CORS middleware
 app.add_middleware(
@@ -12,24 +64,47 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"],
     allow_headers=["*"],
-    expose_headers=["*"],
+    # Named, because browsers ignore "*" on credentialed requests
+    expose_headers=[NEXT_CURSOR_HEADER, "X-Cache", "ETag", REPLAYED_HEADER],
     max_age=600,
 )
 
+# Read-your-writes for reads served by replicas
+if DB_REPLICA_URLS:
+    app.add_middleware(ReplicaRoutingMiddleware)
+
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    register_collector(pool_metrics)
+    register_collector(cache_collector("menu", menu_cache))
+    register_collector(cache_collector("token", token_cache))
+    register_collector(cache_collector("user", user_cache))
+
 # Include routers
 app.include_router(users.router, prefix="/api/users", tags=["users"])
 app.include_router(resturants.router, prefix="/api/restaurants", tags=["restaurants"])
 app.include_router(menu.router, prefix="/api/menu", tags=["menu"])
 app.include_router(orders.router, prefix="/api/orders", tags=["orders"])
+app.include_router(search.router, prefix="/api/search", tags=["search"])
 app.include_router(upload.router, prefix="/api", tags=["upload"])
+app.include_router(analytics.router, prefix="/api/analytics", tags=["analytics"])
 
-# Mount static files for uploaded images
-app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
+@app.exception_handler(PoolTimeoutError)
+async def pool_timeout_handler(request: Request, exc: PoolTimeoutError):
+    return JSONResponse(status_code=503, content={"detail": "Database is busy, please retry"})
+
+# Mount uploaded images (served as immutable, see app/utils/uploads.py)
+app.mount("/uploads", UploadFiles(directory=UPLOAD_DIR), name="uploads")
 
 @app.get("/")
 def read_root():
     return {"message": "Welcome to Zomato Clone API"}
 
+# Prometheus scrape endpoint
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8047)
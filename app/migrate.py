@@ -0,0 +1,136 @@
+# app/migrate.py
+"""
+Versioned schema migrations.
+
+Migrations are the numbered SQL files in migrations/ (NNNN_description.sql;
+migrations/sqlite/ for DB_BACKEND=sqlite), applied in order and recorded in
+the schema_version table so each one runs exactly once. Run from the
+command line:
+
+    python -m app.migrate            # apply pending migrations
+    python -m app.migrate --status   # list applied and pending migrations
+
+or at application startup by setting DB_MIGRATE_ON_STARTUP=true.
+"""
+import argparse
+import os
+import re
+from pathlib import Path
+from app.database import IS_SQLITE, db_connection
+
+MIGRATIONS_ROOT = Path(__file__).resolve().parent.parent / "migrations"
+MIGRATIONS_DIR = MIGRATIONS_ROOT / "sqlite" if IS_SQLITE else MIGRATIONS_ROOT
+MIGRATION_FILE_PATTERN = re.compile(r"^(\d{4})_(\w+)\.sql$")
+
+DB_MIGRATE_ON_STARTUP = os.getenv("DB_MIGRATE_ON_STARTUP", "false").lower() in ("1", "true", "yes")
+
+# Arbitrary key for pg_advisory_lock, so concurrently starting workers migrate one at a time
+MIGRATION_LOCK_ID = 741852963
+
+CREATE_SCHEMA_VERSION_TABLE = """
+CREATE TABLE IF NOT EXISTS schema_version (
+    version INT PRIMARY KEY,
+    name VARCHAR(200) NOT NULL,
+    applied_at TIMESTAMP DEFAULT NOW()
+);
+"""
+
+
+def discover_migrations(directory=MIGRATIONS_DIR):
+    """Return [(version, name, path)] for every migration file, ordered by version."""
+    migrations = []
+    for path in directory.iterdir():
+        match = MIGRATION_FILE_PATTERN.match(path.name)
+        if match:
+            migrations.append((int(match.group(1)), match.group(2), path))
+    migrations.sort()
+
+    versions = [version for version, _, _ in migrations]
+    if len(versions) != len(set(versions)):
+        raise ValueError(f"Duplicate migration versions in {directory}")
+    return migrations
+
+
+def applied_versions(cur):
+    cur.execute("SELECT version FROM schema_version ORDER BY version;")
+    return {row["version"] for row in cur.fetchall()}
+
+
+def _execute_script(cur, sql):
+    if IS_SQLITE:
+        from app.database_sqlite import split_statements
+        for statement in split_statements(sql):
+            cur.execute(statement)
+    else:
+        cur.execute(sql)
+
+
+def run_migrations(directory=MIGRATIONS_DIR):
+    """Apply every pending migration, each in its own transaction. Returns the versions applied."""
+    applied = []
+    with db_connection() as conn:
+        cur = conn.cursor()
+        if not IS_SQLITE:
+            cur.execute("SELECT pg_advisory_lock(%s);", (MIGRATION_LOCK_ID,))
+        try:
+            cur.execute(CREATE_SCHEMA_VERSION_TABLE)
+            conn.commit()
+            done = applied_versions(cur)
+
+            for version, name, path in discover_migrations(directory):
+                if version in done:
+                    continue
+                try:
+                    if IS_SQLITE:
+                        # Take the write lock up front, then re-check: another worker may have just applied it
+                        cur.execute("BEGIN IMMEDIATE;")
+                        if version in applied_versions(cur):
+                            conn.rollback()
+                            continue
+                    _execute_script(cur, path.read_text())
+                    cur.execute(
+                        "INSERT INTO schema_version (version, name) VALUES (%s, %s);",
+                        (version, name),
+                    )
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+                print(f"Applied migration {version:04d}_{name}")
+                applied.append(version)
+        finally:
+            if not IS_SQLITE:
+                cur.execute("SELECT pg_advisory_unlock(%s);", (MIGRATION_LOCK_ID,))
+                conn.commit()
+            cur.close()
+    return applied
+
+
+def migration_status(directory=MIGRATIONS_DIR):
+    """Return [(version, name, is_applied)] for every migration file."""
+    with db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute(CREATE_SCHEMA_VERSION_TABLE)
+        conn.commit()
+        done = applied_versions(cur)
+        cur.close()
+    return [(version, name, version in done) for version, name, _ in discover_migrations(directory)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply database schema migrations")
+    parser.add_argument("--status", action="store_true", help="list migrations without applying them")
+    args = parser.parse_args()
+
+    if args.status:
+        for version, name, is_applied in migration_status():
+            print(f"{'applied' if is_applied else 'pending':<8} {version:04d}_{name}")
+        return
+
+    applied = run_migrations()
+    if not applied:
+        print("Database schema is up to date")
+
+
+if __name__ == "__main__":
+    main()
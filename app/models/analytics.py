@@ -0,0 +1,158 @@
+# app/models/analytics.py
+"""
+Sales analytics for restaurant owners, read from the hourly rollup tables
+that migration 0006_sales_rollups keeps up to date as orders are placed,
+updated and deleted. A report costs one row per hour in its range (plus one
+per item sold in each hour), however many orders there were.
+
+On Postgres the order triggers append deltas (migration 0009), which
+fold_sales_deltas() moves into the hourly rows every SALES_FOLD_INTERVAL
+seconds; reports read views that add the deltas not folded yet.
+
+Buckets are whole UTC hours or days; days are summed from their hours.
+Revenue counts every order; delivered_orders says how many of them were
+delivered.
+"""
+import os
+from app.database import IS_SQLITE, db_connection, read_connection
+from app.database_async import async_db_connection, async_variant
+
+SALES_FOLD_INTERVAL = float(os.getenv("SALES_FOLD_INTERVAL", "60"))  # seconds between folds of the sales deltas
+DEFAULT_TOP_ITEMS = 5
+MAX_TOP_ITEMS = 20
+
+# The bucket each rollup hour falls into
+BUCKETS = {"hour": "hour", "day": "date_trunc('day', hour)"}
+BUCKETS_SQLITE = {"hour": "hour", "day": "strftime('%%Y-%%m-%%d 00:00:00.000', hour)"}
+
+SALES_BUCKETS_QUERY = """
+SELECT {bucket} AS bucket, SUM(order_count) AS orders, SUM(revenue) AS revenue,
+       SUM(CASE WHEN status = 'delivered' THEN order_count ELSE 0 END) AS delivered_orders
+FROM restaurant_sales
+WHERE restaurant_id = %s AND hour >= %s AND hour < %s
+GROUP BY 1
+HAVING SUM(order_count) > 0
+ORDER BY 1;
+"""
+TOP_ITEMS_PER_BUCKET_QUERY = """
+SELECT ranked.bucket, ranked.menu_item_id, m.name, ranked.quantity, ranked.revenue
+FROM (
+    SELECT {bucket} AS bucket, menu_item_id, SUM(quantity) AS quantity, SUM(revenue) AS revenue,
+           ROW_NUMBER() OVER (
+               PARTITION BY {bucket} ORDER BY SUM(quantity) DESC, SUM(revenue) DESC, menu_item_id
+           ) AS item_rank
+    FROM menu_item_sales
+    WHERE restaurant_id = %s AND hour >= %s AND hour < %s
+    GROUP BY 1, 2
+    HAVING SUM(quantity) > 0
+) ranked
+JOIN menu_items m ON m.id = ranked.menu_item_id
+WHERE ranked.item_rank <= %s
+ORDER BY ranked.bucket, ranked.item_rank;
+"""
+TOP_ITEMS_QUERY = """
+SELECT s.menu_item_id, m.name, SUM(s.quantity) AS quantity, SUM(s.revenue) AS revenue
+FROM menu_item_sales s
+JOIN menu_items m ON m.id = s.menu_item_id
+WHERE s.restaurant_id = %s AND s.hour >= %s AND s.hour < %s
+GROUP BY s.menu_item_id, m.name
+HAVING SUM(s.quantity) > 0
+ORDER BY quantity DESC, revenue DESC, s.menu_item_id
+LIMIT %s;
+"""
+
+FOLD_SALES_DELTAS_QUERY = "SELECT fold_sales_deltas() AS folded;"
+
+
+def _queries(granularity):
+    bucket = (BUCKETS_SQLITE if IS_SQLITE else BUCKETS)[granularity]
+    return SALES_BUCKETS_QUERY.format(bucket=bucket), TOP_ITEMS_PER_BUCKET_QUERY.format(bucket=bucket)
+
+
+def _totals(orders, delivered_orders, revenue):
+    return {
+        "orders": orders,
+        "delivered_orders": delivered_orders,
+        "revenue": round(revenue, 2),
+        "average_ticket": round(revenue / orders, 2) if orders else 0.0,
+    }
+
+
+def _item(row):
+    return {
+        "menu_item_id": row["menu_item_id"],
+        "name": row["name"],
+        "quantity": row["quantity"],
+        "revenue": round(float(row["revenue"]), 2),
+    }
+
+
+def _report(bucket_rows, bucket_item_rows, top_item_rows):
+    items_by_bucket = {}
+    for row in bucket_item_rows:
+        items_by_bucket.setdefault(row["bucket"], []).append(_item(row))
+    buckets = [
+        {
+            "start": row["bucket"],
+            **_totals(row["orders"], row["delivered_orders"], float(row["revenue"])),
+            "top_items": items_by_bucket.get(row["bucket"], []),
+        }
+        for row in bucket_rows
+    ]
+    totals = _totals(
+        sum(bucket["orders"] for bucket in buckets),
+        sum(bucket["delivered_orders"] for bucket in buckets),
+        sum(float(row["revenue"]) for row in bucket_rows),
+    )
+    return {"totals": totals, "buckets": buckets, "top_items": [_item(row) for row in top_item_rows]}
+
+
+# ✅ Revenue, order counts, average ticket and top items per hour or day
+def get_sales(restaurant_id, granularity, start, end, top=DEFAULT_TOP_ITEMS):
+    """
+    Sales of one restaurant from `start` (inclusive) to `end` (exclusive),
+    both naive UTC datetimes on bucket boundaries. Returns
+    {"totals", "buckets", "top_items"}; buckets without orders are left out.
+    """
+    buckets_query, bucket_items_query = _queries(granularity)
+    params = (restaurant_id, start, end)
+    with read_connection() as conn:
+        cur = conn.cursor()
+        cur.execute(buckets_query, params)
+        bucket_rows = cur.fetchall()
+        cur.execute(bucket_items_query, (*params, top))
+        bucket_item_rows = cur.fetchall()
+        cur.execute(TOP_ITEMS_QUERY, (*params, top))
+        top_item_rows = cur.fetchall()
+        cur.close()
+    return _report(bucket_rows, bucket_item_rows, top_item_rows)
+
+
+# ✅ Move the sales deltas into the hourly rollups (Postgres)
+def fold_sales_deltas():
+    """Returns how many deltas were folded; 0 on SQLite, whose triggers update the rollups directly."""
+    if IS_SQLITE:
+        return 0
+    with db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute(FOLD_SALES_DELTAS_QUERY)
+        folded = cur.fetchone()["folded"]
+        conn.commit()
+        cur.close()
+    return folded
+
+
+# Async variants (used when DB_ASYNC is enabled)
+@async_variant(get_sales)
+async def get_sales_async(restaurant_id, granularity, start, end, top=DEFAULT_TOP_ITEMS):
+    buckets_query, bucket_items_query = _queries(granularity)
+    params = (restaurant_id, start, end)
+    async with async_db_connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(buckets_query, params)
+            bucket_rows = await cur.fetchall()
+            await cur.execute(bucket_items_query, (*params, top))
+            bucket_item_rows = await cur.fetchall()
+            await cur.execute(TOP_ITEMS_QUERY, (*params, top))
+            top_item_rows = await cur.fetchall()
+    return _report(bucket_rows, bucket_item_rows, top_item_rows)
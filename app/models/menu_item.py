@@ -1,64 +1,241 @@
 # app/models/menu_item.py
-from app.database import get_db
-
-# ✅ Create table (run once during migrations/setup)
-def create_menu_items_table():
-    query = """
-    CREATE TABLE IF NOT EXISTS menu_items (
-        id SERIAL PRIMARY KEY,
-        restaurant_id INT REFERENCES restaurants(id) ON DELETE CASCADE,
-        name VARCHAR(200) NOT NULL,
-        price NUMERIC(10,2) NOT NULL,
-        category VARCHAR(100),
-        image TEXT,
-        created_at TIMESTAMP DEFAULT NOW()
-    );
-    """
-    conn = get_db()
-    cur = conn.cursor()
-    cur.execute(query)
-    conn.commit()
-    cur.close()
-    conn.close()
+import os
+import re
+import tempfile
+from itertools import islice
+from app.database import IS_SQLITE, db_connection, execute_prepared, get_pool, prepared_statement
+from app.database_async import async_db_connection, async_variant, execute_prepared_async
+from app.utils.cache import TTLCache
+from app.utils.notifications import NOTIFY_QUERY, listener
+from app.utils.pagination import DEFAULT_PAGE_SIZE, keyset_condition
+
+MENU_CACHE_SIZE = int(os.getenv("MENU_CACHE_SIZE", "1024"))   # restaurants kept
+MENU_CACHE_PAGES = int(os.getenv("MENU_CACHE_PAGES", "4"))    # first-page sizes kept per restaurant
+MENU_CACHE_MAX_BYTES = int(os.getenv("MENU_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))  # serialized pages kept
+MENU_CACHE_TTL = float(os.getenv("MENU_CACHE_TTL", "300"))    # seconds
+# Broadcast invalidations to every worker through Postgres NOTIFY (not available on SQLite)
+MENU_CACHE_NOTIFY = os.getenv("MENU_CACHE_NOTIFY", "false").lower() in ("1", "true", "yes") and not IS_SQLITE
+MENU_CACHE_CHANNEL = "menu_cache_invalidate"
+MENU_IMPORT_MAX_ROWS = int(os.getenv("MENU_IMPORT_MAX_ROWS", "200000"))  # rows accepted per bulk import
+MENU_IMPORT_SPOOL_SIZE = int(os.getenv("MENU_IMPORT_SPOOL_SIZE", str(8 * 1024 * 1024)))  # staged bytes kept in memory
+INSERT_BATCH_SIZE = 1000  # rows per executemany when loading an import into SQLite
+
+# restaurant_id -> {limit: (serialized first page, next cursor, validators)}, filled by the menu route.
+# Later pages are not cached: their cursors come from clients, so there is no bound on them.
+menu_cache = TTLCache(
+    MENU_CACHE_SIZE,
+    MENU_CACHE_TTL,
+    sizeof=lambda pages: sum(len(body) for body, _, _ in pages.values()),
+    maxbytes=MENU_CACHE_MAX_BYTES,
+)
+
+ADD_MENU_ITEM_QUERY = """
+INSERT INTO menu_items (restaurant_id, name, price, category, image)
+VALUES (%s, %s, %s, %s, %s)
+RETURNING id, name, price, category, image, created_at;
+"""
+GET_MENU_ITEMS_QUERY = """
+SELECT id, name, price, category, image, created_at
+FROM menu_items
+WHERE restaurant_id = %s AND {keyset}
+ORDER BY created_at, id
+LIMIT %s;
+"""
+# The first page and later pages differ in their keyset condition, so each is its own statement
+GET_MENU_ITEMS_FIRST_PAGE = prepared_statement(
+    "get_menu_items_first_page", GET_MENU_ITEMS_QUERY.format(keyset=keyset_condition(None)[0]))
+GET_MENU_ITEMS_NEXT_PAGE = prepared_statement(
+    "get_menu_items_next_page", GET_MENU_ITEMS_QUERY.format(keyset=keyset_condition((None, None))[0]))
+DELETE_MENU_ITEM_QUERY = "DELETE FROM menu_items WHERE id = %s RETURNING id, restaurant_id;"
+# Bumped by triggers on every menu item change (migration 0004)
+GET_MENU_VERSION_QUERY = "SELECT menu_version, menu_updated_at FROM restaurants WHERE id = %s;"
+COPY_MENU_ITEMS_QUERY = "COPY menu_items (restaurant_id, name, price, category, image) FROM STDIN;"
+INSERT_MENU_ITEM_QUERY = """
+INSERT INTO menu_items (restaurant_id, name, price, category, image)
+VALUES (%s, %s, %s, %s, %s);
+"""
+
+# COPY text format: tab-separated, \N for NULL, backslash escapes
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+_COPY_UNESCAPE = re.compile(r"\\([\\tnr])")
+_COPY_UNESCAPES = {"\\": "\\", "t": "\t", "n": "\n", "r": "\r"}
+
+
+# ✅ Drop a restaurant's cached menu in this worker
+def invalidate_menu_cache(restaurant_id):
+    menu_cache.invalidate(int(restaurant_id))
+
+
+if MENU_CACHE_NOTIFY:
+    listener.subscribe(MENU_CACHE_CHANNEL, invalidate_menu_cache)
+
+
+def _notify_params(restaurant_id):
+    return (MENU_CACHE_CHANNEL, str(restaurant_id))
 
 
 # ✅ Add new menu item
 def add_menu_item(restaurant_id, name, price, category=None, image=None):
-    query = """
-    INSERT INTO menu_items (restaurant_id, name, price, category, image)
-    VALUES (%s, %s, %s, %s, %s)
-    RETURNING id, name, price, category, image, created_at;
-    """
-    conn = get_db()
-    cur = conn.cursor()
-    cur.execute(query, (restaurant_id, name, price, category, image))
-    result = cur.fetchone()
-    conn.commit()
-    cur.close()
-    conn.close()
+    with db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute(ADD_MENU_ITEM_QUERY, (restaurant_id, name, price, category, image))
+        result = cur.fetchone()
+        if MENU_CACHE_NOTIFY:
+            cur.execute(NOTIFY_QUERY, _notify_params(restaurant_id))
+        conn.commit()
+        cur.close()
+    invalidate_menu_cache(restaurant_id)
     return result
 
 
 # ✅ Get menu items by restaurant
-def get_menu_items_by_restaurant(restaurant_id):
-    query = "SELECT id, name, price, category, image FROM menu_items WHERE restaurant_id = %s;"
-    conn = get_db()
-    cur = conn.cursor()
-    cur.execute(query, (restaurant_id,))
-    items = cur.fetchall()
-    cur.close()
-    conn.close()
+def get_menu_items_by_restaurant(restaurant_id, limit=DEFAULT_PAGE_SIZE, after=None):
+    _, params = keyset_condition(after)
+    statement = GET_MENU_ITEMS_FIRST_PAGE if after is None else GET_MENU_ITEMS_NEXT_PAGE
+    with db_connection() as conn:
+        cur = conn.cursor()
+        execute_prepared(cur, statement, (restaurant_id, *params, limit))
+        items = cur.fetchall()
+        cur.close()
     return items
 
 
+# ✅ Get the version of a restaurant's menu (None if there is no such restaurant)
+def get_menu_version(restaurant_id):
+    with db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute(GET_MENU_VERSION_QUERY, (restaurant_id,))
+        row = cur.fetchone()
+        cur.close()
+    return row
+
+
 # ✅ Delete menu item
 def delete_menu_item(menu_item_id):
-    query = "DELETE FROM menu_items WHERE id = %s RETURNING id;"
-    conn = get_db()
-    cur = conn.cursor()
-    cur.execute(query, (menu_item_id,))
-    result = cur.fetchone()
-    conn.commit()
-    cur.close()
-    conn.close()
+    with db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute(DELETE_MENU_ITEM_QUERY, (menu_item_id,))
+        result = cur.fetchone()
+        if result and MENU_CACHE_NOTIFY:
+            cur.execute(NOTIFY_QUERY, _notify_params(result["restaurant_id"]))
+        conn.commit()
+        cur.close()
+    if result:
+        invalidate_menu_cache(result["restaurant_id"])
+    return result
+
+
+def _copy_value(value):
+    if value is None:
+        return "\\N"
+    if isinstance(value, str):
+        return value.translate(_COPY_ESCAPES)
+    return repr(value)
+
+
+def _from_copy_value(text):
+    if text == "\\N":
+        return None
+    return _COPY_UNESCAPE.sub(lambda match: _COPY_UNESCAPES[match.group(1)], text)
+
+
+# ✅ Bulk import menu items in one transaction
+class MenuImport:
+    """
+    Loads menu items for one restaurant in a single transaction:
+
+        importer = MenuImport(restaurant_id)
+        importer.write(rows)   # any number of batches of (name, price, category, image)
+        importer.commit()      # or abort()
+
+    write() only stages the rows, in COPY text format, in a temporary file
+    that spills to disk past MENU_IMPORT_SPOOL_SIZE bytes. No pooled
+    connection is held while the request body is still arriving: commit()
+    checks one out for a single COPY (executemany batches on SQLite).
+    """
+
+    def __init__(self, restaurant_id):
+        self.restaurant_id = restaurant_id
+        self.count = 0
+        self._staged = tempfile.SpooledTemporaryFile(
+            max_size=MENU_IMPORT_SPOOL_SIZE, mode="w+", encoding="utf-8", newline="\n"
+        )
+
+    def write(self, rows):
+        self._staged.write("".join(
+            "\t".join(map(_copy_value, (self.restaurant_id, *row))) + "\n" for row in rows
+        ))
+        self.count += len(rows)
+
+    def commit(self):
+        self._staged.seek(0)
+        try:
+            with get_pool().connection() as conn:
+                cur = conn.cursor()
+                try:
+                    if IS_SQLITE:
+                        for batch in iter(lambda: list(islice(self._staged, INSERT_BATCH_SIZE)), []):
+                            cur.executemany(INSERT_MENU_ITEM_QUERY, [
+                                tuple(map(_from_copy_value, line.rstrip("\n").split("\t"))) for line in batch
+                            ])
+                    else:
+                        cur.copy_expert(COPY_MENU_ITEMS_QUERY, self._staged)
+                    if MENU_CACHE_NOTIFY:
+                        cur.execute(NOTIFY_QUERY, _notify_params(self.restaurant_id))
+                    conn.commit()
+                finally:
+                    cur.close()
+        finally:
+            self.abort()
+        invalidate_menu_cache(self.restaurant_id)
+        return self.count
+
+    def abort(self):
+        """Discard the staged rows (no-op after commit)."""
+        self._staged.close()
+
+
+# Async variants (used when DB_ASYNC is enabled)
+@async_variant(add_menu_item)
+async def add_menu_item_async(restaurant_id, name, price, category=None, image=None):
+    async with async_db_connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(ADD_MENU_ITEM_QUERY, (restaurant_id, name, price, category, image))
+            result = await cur.fetchone()
+            if MENU_CACHE_NOTIFY:
+                await cur.execute(NOTIFY_QUERY, _notify_params(restaurant_id))
+        await conn.commit()
+    invalidate_menu_cache(restaurant_id)
+    return result
+
+
+@async_variant(get_menu_items_by_restaurant)
+async def get_menu_items_by_restaurant_async(restaurant_id, limit=DEFAULT_PAGE_SIZE, after=None):
+    _, params = keyset_condition(after)
+    statement = GET_MENU_ITEMS_FIRST_PAGE if after is None else GET_MENU_ITEMS_NEXT_PAGE
+    async with async_db_connection() as conn:
+        async with conn.cursor() as cur:
+            await execute_prepared_async(cur, statement, (restaurant_id, *params, limit))
+            return await cur.fetchall()
+
+
+@async_variant(get_menu_version)
+async def get_menu_version_async(restaurant_id):
+    async with async_db_connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(GET_MENU_VERSION_QUERY, (restaurant_id,))
+            return await cur.fetchone()
+
+
+@async_variant(delete_menu_item)
+async def delete_menu_item_async(menu_item_id):
+    async with async_db_connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(DELETE_MENU_ITEM_QUERY, (menu_item_id,))
+            result = await cur.fetchone()
+            if result and MENU_CACHE_NOTIFY:
+                await cur.execute(NOTIFY_QUERY, _notify_params(result["restaurant_id"]))
+        await conn.commit()
+    if result:
+        invalidate_menu_cache(result["restaurant_id"])
     return result
@@ -1,88 +1,305 @@
 # app/models/orders.py
-from app.database import get_db
-
-# ✅ Create table (run once during migrations/setup)
-def create_order_items_table():
-    query = """
-    CREATE TABLE IF NOT EXISTS order_items (
-        id SERIAL PRIMARY KEY,
-        order_id INT REFERENCES orders(id) ON DELETE CASCADE,
-        menu_item_id INT REFERENCES menu_items(id) ON DELETE CASCADE,
-        quantity INT NOT NULL,
-        price NUMERIC(10, 2) NOT NULL
-    );
-    """
-    conn = get_db()
-    cur = conn.cursor()
-    cur.execute(query)
-    conn.commit()
-    cur.close()
-    conn.close()
-
-def create_orders_table():
-    query = """
-    CREATE TABLE IF NOT EXISTS orders (
-        id SERIAL PRIMARY KEY,
-        customer_id INT REFERENCES users(id) ON DELETE CASCADE,
-        restaurant_id INT REFERENCES restaurants(id) ON DELETE CASCADE,
-        total_price NUMERIC(10,2) NOT NULL,
-        status VARCHAR(20) CHECK (status IN ('placed', 'delivered')) DEFAULT 'placed',
-        payment_status VARCHAR(10) DEFAULT 'Unpaid',
-        created_at TIMESTAMP DEFAULT NOW()
-    );
-    """
-    conn = get_db()
-    cur = conn.cursor()
-    cur.execute(query)
-    conn.commit()
-    cur.close()
-    conn.close()
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from app.database import (
+    IS_SQLITE, IntegrityError, db_connection, execute_prepared, prepared_statement, read_connection,
+)
+from app.database_async import async_db_connection, async_variant, execute_prepared_async
+from app.utils.events import hub
+from app.utils.idempotency import IDEMPOTENCY_KEY_RETENTION_HOURS
+from app.utils.notifications import listener
+from app.utils.pagination import DEFAULT_PAGE_SIZE, keyset_condition
+
+logger = logging.getLogger(__name__)
+
+# Triggers NOTIFY this channel on every order change (migration 0007_order_events)
+ORDER_EVENTS_CHANNEL = "order_events"
+
+IDEMPOTENCY_KEY_PURGE_INTERVAL = float(os.getenv("IDEMPOTENCY_KEY_PURGE_INTERVAL", "3600"))  # seconds between purges
+
+# Fans order NOTIFYs out to the streams, loading new orders, off the shared
+# listener thread. One thread, so events reach streams in commit order.
+_event_dispatcher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="order-events")
+
+# Inserts the order header and every line item, and returns the full order
+# with its items, in a single statement (one round trip for any cart size)
+_CREATE_ORDER_SQL = """
+WITH new_order AS (
+    INSERT INTO orders (customer_id, restaurant_id, total_price, payment_status)
+    VALUES (%s, %s, %s, %s)
+    RETURNING id, customer_id, restaurant_id, total_price, status, created_at, payment_status
+), new_items AS (
+    INSERT INTO order_items (order_id, menu_item_id, quantity, price)
+    SELECT new_order.id, line.menu_item_id, line.quantity, line.price
+    FROM new_order, unnest(%s::int[], %s::int[], %s::numeric[]) AS line(menu_item_id, quantity, price)
+    RETURNING id, menu_item_id, quantity, price
+){idempotency}
+SELECT o.id, o.customer_id, o.restaurant_id, o.total_price, o.status, o.created_at, o.payment_status,
+       r.name AS restaurant_name,
+       COALESCE((
+           SELECT json_agg(json_build_object(
+                      'id', ni.id, 'name', mi.name, 'price', ni.price,
+                      'quantity', ni.quantity, 'menu_item_id', ni.menu_item_id
+                  ) ORDER BY ni.id)
+           FROM new_items ni
+           JOIN menu_items mi ON mi.id = ni.menu_item_id
+       ), '[]'::json) AS items
+FROM new_order o
+JOIN restaurants r ON r.id = o.restaurant_id;
+"""
+# The key row goes in with the order, so a duplicate key rolls the whole order back
+_IDEMPOTENCY_KEY_CTE = """, idempotency_key AS (
+    INSERT INTO idempotency_keys (customer_id, key, request_hash, order_id)
+    SELECT customer_id, %s, %s, id FROM new_order
+)"""
+CREATE_ORDER_QUERY = _CREATE_ORDER_SQL.format(idempotency="")
+CREATE_KEYED_ORDER_QUERY = _CREATE_ORDER_SQL.format(idempotency=_IDEMPOTENCY_KEY_CTE)
+# SQLite has neither data-modifying CTEs nor unnest(); it runs in-process, so
+# inserting the header and lines separately costs no extra network round trips
+INSERT_ORDER_QUERY = """
+INSERT INTO orders (customer_id, restaurant_id, total_price, payment_status)
+VALUES (%s, %s, %s, %s)
+RETURNING id;
+"""
+INSERT_ORDER_ITEM_QUERY = "INSERT INTO order_items (order_id, menu_item_id, quantity, price) VALUES (%s, %s, %s, %s);"
+INSERT_IDEMPOTENCY_KEY_QUERY = """
+INSERT INTO idempotency_keys (customer_id, key, request_hash, order_id)
+VALUES (%s, %s, %s, %s);
+"""
+# Params: (customer_id, key, cutoff); expired keys are not returned
+GET_IDEMPOTENCY_KEY_QUERY = """
+SELECT request_hash, order_id FROM idempotency_keys
+WHERE customer_id = %s AND key = %s AND created_at >= %s;
+"""
+DELETE_EXPIRED_IDEMPOTENCY_KEY_QUERY = """
+DELETE FROM idempotency_keys WHERE customer_id = %s AND key = %s AND created_at < %s;
+"""
+PURGE_IDEMPOTENCY_KEYS_QUERY = "DELETE FROM idempotency_keys WHERE created_at < %s;"
+GET_ORDER_QUERY = """
+SELECT o.id, o.customer_id, o.restaurant_id, o.total_price, o.status, o.created_at, o.payment_status, r.name as restaurant_name
+FROM orders o
+JOIN restaurants r ON o.restaurant_id = r.id
+WHERE o.id = %s;
+"""
+GET_ORDER_ITEMS_QUERY = """
+SELECT oi.id, mi.name, oi.price, oi.quantity, oi.menu_item_id
+FROM order_items oi
+JOIN menu_items mi ON oi.menu_item_id = mi.id
+WHERE oi.order_id = %s
+"""
+GET_ORDER = prepared_statement("get_order", GET_ORDER_QUERY)
+GET_ORDER_ITEMS = prepared_statement("get_order_items", GET_ORDER_ITEMS_QUERY)
+GET_ITEMS_FOR_ORDERS_QUERY = """
+SELECT oi.order_id, oi.id, mi.name, oi.price, oi.quantity, oi.menu_item_id
+FROM order_items oi
+JOIN menu_items mi ON oi.menu_item_id = mi.id
+WHERE oi.order_id = ANY(%s)
+ORDER BY oi.order_id, oi.id;
+"""
+GET_CUSTOMER_ORDERS_QUERY = """
+SELECT o.*, r.name as restaurant_name
+FROM orders o
+JOIN restaurants r ON o.restaurant_id = r.id
+WHERE o.customer_id = %s AND {keyset}
+ORDER BY o.created_at DESC, o.id DESC
+LIMIT %s;
+"""
+GET_RESTAURANT_ORDERS_QUERY = """SELECT o.id, o.customer_id, o.restaurant_id, o.total_price, o.status, o.created_at, o.payment_status, r.name as restaurant_name
+FROM orders o
+JOIN restaurants r ON o.restaurant_id = r.id
+WHERE o.restaurant_id = %s AND {keyset}
+ORDER BY o.created_at DESC, o.id DESC
+LIMIT %s;"""
+# Params: (status, order_id, status). Leaves the row alone (and returns
+# nothing) when the order already has that status
+UPDATE_ORDER_STATUS_QUERY = """
+UPDATE orders
+SET status = %s
+WHERE id = %s AND (status <> %s OR status IS NULL)
+RETURNING id;
+"""
+DELETE_ORDER_QUERY = "DELETE FROM orders WHERE id = %s RETURNING id, restaurant_id, customer_id, status, payment_status;"
+
+
+def order_topics(order):
+    """The event hub topics an order's events are published on."""
+    return (f"restaurant:{order['restaurant_id']}", f"order:{order['id']}")
+
+
+def _order_ref(order):
+    # What order_updated / order_deleted events carry (the NOTIFY payload of migration 0007)
+    return {key: order[key] for key in ("id", "restaurant_id", "customer_id", "status", "payment_status")}
+
+
+def _publish_order_event(event_type, data):
+    # SQLite has no NOTIFY: publish straight to this worker's streams
+    if IS_SQLITE:
+        hub.publish(order_topics(data), event_type, data)
+
+
+def _on_order_notification(payload):
+    """Fan a NOTIFY from another (or this) worker out to the streams here."""
+    event = json.loads(payload)
+    if hub.has_subscribers(order_topics(event)):
+        _event_dispatcher.submit(_dispatch_order_event, event)
+
+
+def _dispatch_order_event(event):
+    event_type = event.pop("type")
+    topics = order_topics(event)
+    try:
+        if event_type == "order_created":
+            # Loaded once per worker, for all of its streams
+            event = get_order(event["id"])
+            if event is None:
+                return  # already deleted
+        hub.publish(topics, event_type, event)
+    except Exception:
+        logger.exception("Could not publish %s for order %s", event_type, event["id"])
+
+
+if not IS_SQLITE:
+    listener.subscribe(ORDER_EVENTS_CHANNEL, _on_order_notification)
+
+
+def _customer_order(order, items):
+    order_dict = dict(order)
+    order_dict['items'] = items
+    return order_dict
+
+
+def _create_order_params(customer_id, restaurant_id, total_price, items, payment_status):
+    # Line items travel as three parallel arrays that unnest() zips back into rows
+    return (
+        customer_id, restaurant_id, total_price, payment_status,
+        [item['menu_item_id'] for item in items],
+        [item['quantity'] for item in items],
+        [item['price'] for item in items],
+    )
+
+
+def _insert_order_sqlite(cur, customer_id, restaurant_id, total_price, items, payment_status, idempotency=None):
+    cur.execute(INSERT_ORDER_QUERY, (customer_id, restaurant_id, total_price, payment_status))
+    order_id = cur.fetchone()['id']
+    cur.executemany(INSERT_ORDER_ITEM_QUERY, [
+        (order_id, item['menu_item_id'], item['quantity'], item['price']) for item in items
+    ])
+    if idempotency:
+        cur.execute(INSERT_IDEMPOTENCY_KEY_QUERY, (customer_id, *idempotency, order_id))
+    return get_order_by_id(cur, order_id)
+
+
+def _group_items_by_order(item_rows):
+    items_by_order = {}
+    for row in item_rows:
+        item = dict(row)
+        items_by_order.setdefault(item.pop('order_id'), []).append(item)
+    return items_by_order
 
 
 # ✅ Create new order
 def create_order(customer_id, restaurant_id, total_price, items, payment_status='Unpaid'):
-    conn = get_db()
-    cur = conn.cursor()
-    try:
-        # Insert the main order record
-        query = """
-        INSERT INTO orders (customer_id, restaurant_id, total_price, payment_status)
-        VALUES (%s, %s, %s, %s) RETURNING id;
-        """
-        cur.execute(query, (customer_id, restaurant_id, total_price, payment_status))
-        order_id = cur.fetchone()['id']
-
-        # Insert order items
-        items_query = """
-        INSERT INTO order_items (order_id, menu_item_id, quantity, price)
-        VALUES (%s, %s, %s, %s);
-        """
-        for item in items:
-            cur.execute(items_query, (order_id, item['menu_item_id'], item['quantity'], item['price']))
-
-        # Fetch the complete order details to return
-        full_order = get_order_by_id(cur, order_id)
+    with db_connection() as conn:
+        cur = conn.cursor()
+        try:
+            if IS_SQLITE:
+                full_order = _insert_order_sqlite(cur, customer_id, restaurant_id, total_price, items, payment_status)
+            else:
+                # Insert the order with all its items and read it back in one statement
+                cur.execute(CREATE_ORDER_QUERY, _create_order_params(customer_id, restaurant_id, total_price, items, payment_status))
+                full_order = dict(cur.fetchone())
+            conn.commit()
+            _publish_order_event("order_created", full_order)
+            return full_order
+        except Exception as e:
+            conn.rollback()
+            # It's good practice to log the error here
+            print(f"Error creating order: {e}")
+            return None
+        finally:
+            cur.close()
+
+
+def _idempotency_cutoff():
+    # created_at is a TIMESTAMP column in UTC
+    return datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(hours=IDEMPOTENCY_KEY_RETENTION_HOURS)
+
+
+def _insert_keyed_order(cur, idempotency_key, request_hash, customer_id, restaurant_id, total_price, items, payment_status):
+    if IS_SQLITE:
+        return _insert_order_sqlite(
+            cur, customer_id, restaurant_id, total_price, items, payment_status,
+            idempotency=(idempotency_key, request_hash),
+        )
+    cur.execute(CREATE_KEYED_ORDER_QUERY, _create_order_params(
+        customer_id, restaurant_id, total_price, items, payment_status,
+    ) + (idempotency_key, request_hash))
+    return dict(cur.fetchone())
+
+
+# ✅ Create an order at most once per idempotency key
+def create_order_once(idempotency_key, request_hash, customer_id, restaurant_id, total_price, items, payment_status='Unpaid'):
+    """
+    Like create_order, but the order is recorded under the customer's
+    idempotency key. If the key was used in the last
+    IDEMPOTENCY_KEY_RETENTION_HOURS (or is being used by a transaction that
+    then commits), nothing is inserted and the existing order is returned
+    instead; an older key is dropped and used again. Returns (order or None,
+    the request_hash the order was created for, whether this call created it).
+    """
+    with db_connection() as conn:
+        cur = conn.cursor()
+        try:
+            for attempt in range(2):
+                try:
+                    full_order = _insert_keyed_order(
+                        cur, idempotency_key, request_hash,
+                        customer_id, restaurant_id, total_price, items, payment_status,
+                    )
+                    conn.commit()
+                    _publish_order_event("order_created", full_order)
+                    return full_order, request_hash, True
+                except IntegrityError as e:
+                    conn.rollback()
+                    # Blocked on the key until the other transaction finished; read what it stored
+                    cutoff = _idempotency_cutoff()
+                    cur.execute(GET_IDEMPOTENCY_KEY_QUERY, (customer_id, idempotency_key, cutoff))
+                    existing = cur.fetchone()
+                    if existing is not None:
+                        return get_order_by_id(cur, existing['order_id']), existing['request_hash'], False
+                    # Expired: free the key and place the order once more
+                    cur.execute(DELETE_EXPIRED_IDEMPOTENCY_KEY_QUERY, (customer_id, idempotency_key, cutoff))
+                    freed = cur.rowcount
+                    conn.commit()
+                    if attempt or not freed:
+                        print(f"Error creating order: {e}")
+                        return None, request_hash, False
+        except Exception as e:
+            conn.rollback()
+            print(f"Error creating order: {e}")
+            return None, request_hash, False
+        finally:
+            cur.close()
+
+
+# ✅ Delete idempotency keys past their retention
+def purge_idempotency_keys():
+    """Returns how many keys were deleted."""
+    with db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute(PURGE_IDEMPOTENCY_KEYS_QUERY, (_idempotency_cutoff(),))
+        purged = cur.rowcount
         conn.commit()
-        return full_order
-    except Exception as e:
-        conn.rollback()
-        # It's good practice to log the error here
-        print(f"Error creating order: {e}")
-        return None
-    finally:
         cur.close()
-        conn.close()
+    return purged
 
 
 # ✅ Get order by ID
 def get_order_by_id(cur, order_id):
-    query = """
-    SELECT o.id, o.customer_id, o.restaurant_id, o.total_price, o.status, o.created_at, o.payment_status, r.name as restaurant_name
-    FROM orders o
-    JOIN restaurants r ON o.restaurant_id = r.id
-    WHERE o.id = %s;
-    """
-    cur.execute(query, (order_id,))
+    execute_prepared(cur, GET_ORDER, (order_id,))
     order_data = cur.fetchone()
 
     if not order_data:
@@ -93,128 +310,204 @@ def get_order_by_id(cur, order_id):
     return order
 
 
+def get_order(order_id):
+    with db_connection() as conn:
+        cur = conn.cursor()
+        try:
+            return get_order_by_id(cur, order_id)
+        finally:
+            cur.close()
+
+
 # ✅ Get orders by customer
-def get_orders_by_customer(customer_id):
-    conn = get_db()
-    cur = conn.cursor()
-    try:
-        # First get all orders for the customer
-        query = """
-        SELECT o.*, r.name as restaurant_name
-        FROM orders o
-        JOIN restaurants r ON o.restaurant_id = r.id
-        WHERE o.customer_id = %s
-        ORDER BY o.created_at DESC;
-        """
-        cur.execute(query, (customer_id,))
-        orders = cur.fetchall()
-
-        # For each order, get its items with menu item names
-        result = []
-        for order in orders:
-            order_dict = dict(order)
-            items_query = """
-            SELECT oi.*, mi.name
-            FROM order_items oi
-            JOIN menu_items mi ON oi.menu_item_id = mi.id
-            WHERE oi.order_id = %s;
-            """
-            cur.execute(items_query, (order['id'],))
-            items = cur.fetchall()
-            
-            # Convert Decimal to float for JSON serialization
-            order_dict['total_price'] = float(order_dict['total_price'])
-            order_dict['items'] = [{
-                'id': item['id'],
-                'menu_item_id': item['menu_item_id'],
-                'name': item['name'],
-                'quantity': item['quantity'],
-                'price': float(item['price'])
-            } for item in items]
-            
-            result.append(order_dict)
-
-        return result
-    except Exception as e:
-        print(f"Error getting orders by customer: {e}")
-        return []
-    finally:
-        cur.close()
-        conn.close()
+def get_orders_by_customer(customer_id, limit=DEFAULT_PAGE_SIZE, after=None):
+    keyset, params = keyset_condition(after, "o.created_at", "o.id", descending=True)
+    with read_connection() as conn:
+        cur = conn.cursor()
+        try:
+            # First get a page of orders for the customer
+            cur.execute(GET_CUSTOMER_ORDERS_QUERY.format(keyset=keyset), (customer_id, *params, limit))
+            orders = cur.fetchall()
+
+            # Then the items of all those orders in a single query
+            items_by_order = get_order_items_by_order_ids(cur, [order['id'] for order in orders])
+            return [_customer_order(order, items_by_order.get(order['id'], [])) for order in orders]
+        except Exception as e:
+            print(f"Error getting orders by customer: {e}")
+            return []
+        finally:
+            cur.close()
 
 def get_order_items_by_order_id(cur, order_id):
-    query = """
-    SELECT oi.id, mi.name, oi.price, oi.quantity, oi.menu_item_id
-    FROM order_items oi
-    JOIN menu_items mi ON oi.menu_item_id = mi.id
-    WHERE oi.order_id = %s
-    """
-    cur.execute(query, (order_id,))
+    execute_prepared(cur, GET_ORDER_ITEMS, (order_id,))
     items = cur.fetchall()
     return [dict(item) for item in items]
 
+def get_order_items_by_order_ids(cur, order_ids):
+    """Load the items of many orders in one query, grouped by order id."""
+    if not order_ids:
+        return {}
+    cur.execute(GET_ITEMS_FOR_ORDERS_QUERY, (list(order_ids),))
+    return _group_items_by_order(cur.fetchall())
+
 # Get orders by restaurant
-def get_orders_by_restaurant(restaurant_id):
-    conn = get_db()
-    cur = conn.cursor()
-    try:
-        query = """SELECT o.id, o.customer_id, o.restaurant_id, o.total_price, o.status, o.created_at, o.payment_status, r.name as restaurant_name
-        FROM orders o
-        JOIN restaurants r ON o.restaurant_id = r.id
-        WHERE o.restaurant_id = %s ORDER BY o.created_at DESC;"""
-        cur.execute(query, (restaurant_id,))
-        orders_data = cur.fetchall()
-
-        orders = []
-        for order_data in orders_data:
-            order = dict(order_data)
-            order['items'] = get_order_items_by_order_id(cur, order['id'])
-            orders.append(order)
-        return orders
-    finally:
-        cur.close()
-        conn.close()
+def get_orders_by_restaurant(restaurant_id, limit=DEFAULT_PAGE_SIZE, after=None):
+    keyset, params = keyset_condition(after, "o.created_at", "o.id", descending=True)
+    with read_connection() as conn:
+        cur = conn.cursor()
+        try:
+            cur.execute(GET_RESTAURANT_ORDERS_QUERY.format(keyset=keyset), (restaurant_id, *params, limit))
+            orders = [dict(order_data) for order_data in cur.fetchall()]
+
+            items_by_order = get_order_items_by_order_ids(cur, [order['id'] for order in orders])
+            for order in orders:
+                order['items'] = items_by_order.get(order['id'], [])
+            return orders
+        finally:
+            cur.close()
 
 
 # ✅ Update order status
 def update_order_status(order_id, status):
-    conn = get_db()
-    cur = conn.cursor()
-    try:
-        query = """
-        UPDATE orders 
-        SET status = %s 
-        WHERE id = %s 
-        RETURNING id;
-        """
-        cur.execute(query, (status, order_id))
-        result = cur.fetchone()
-        if not result:
+    with db_connection() as conn:
+        cur = conn.cursor()
+        try:
+            cur.execute(UPDATE_ORDER_STATUS_QUERY, (status, order_id, status))
+            changed = cur.fetchone() is not None
+
+            # After updating, fetch the full order details
+            updated_order = get_order_by_id(cur, order_id)
+            if not updated_order:
+                return None
+            conn.commit()
+            # Like the NOTIFY trigger, only announce a real change
+            if changed:
+                _publish_order_event("order_updated", _order_ref(updated_order))
+            return updated_order
+        except Exception as e:
+            conn.rollback()
+            print(f"Error updating order status: {e}")
             return None
-        
-        # After updating, fetch the full order details
-        updated_order = get_order_by_id(cur, order_id)
-        conn.commit()
-        return updated_order
-    except Exception as e:
-        conn.rollback()
-        print(f"Error updating order status: {e}")
-        return None
-    finally:
-        cur.close()
-        conn.close()
+        finally:
+            cur.close()
 
 
 # ✅ Delete order
 def delete_order(order_id):
-    query = "DELETE FROM orders WHERE id = %s RETURNING id;"
-    conn = get_db()
-    cur = conn.cursor()
-    cur.execute(query, (order_id,))
-    result = cur.fetchone()
-    conn.commit()
-    cur.close()
-    conn.close()
+    with db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute(DELETE_ORDER_QUERY, (order_id,))
+        result = cur.fetchone()
+        conn.commit()
+        cur.close()
+    if result:
+        _publish_order_event("order_deleted", _order_ref(result))
+        return dict(result)
+    return None
+
+
+# Async variants (used when DB_ASYNC is enabled)
+async def get_order_by_id_async(cur, order_id):
+    await execute_prepared_async(cur, GET_ORDER, (order_id,))
+    order_data = await cur.fetchone()
+
+    if not order_data:
+        return None
+
+    order = dict(order_data)
+    order['items'] = await get_order_items_by_order_id_async(cur, order['id'])
+    return order
+
+
+async def get_order_items_by_order_id_async(cur, order_id):
+    await execute_prepared_async(cur, GET_ORDER_ITEMS, (order_id,))
+    items = await cur.fetchall()
+    return [dict(item) for item in items]
+
+
+async def get_order_items_by_order_ids_async(cur, order_ids):
+    if not order_ids:
+        return {}
+    await cur.execute(GET_ITEMS_FOR_ORDERS_QUERY, (list(order_ids),))
+    return _group_items_by_order(await cur.fetchall())
+
+
+@async_variant(create_order)
+async def create_order_async(customer_id, restaurant_id, total_price, items, payment_status='Unpaid'):
+    async with async_db_connection() as conn:
+        async with conn.cursor() as cur:
+            try:
+                await cur.execute(CREATE_ORDER_QUERY, _create_order_params(customer_id, restaurant_id, total_price, items, payment_status))
+                full_order = dict(await cur.fetchone())
+                await conn.commit()
+                return full_order
+            except Exception as e:
+                await conn.rollback()
+                print(f"Error creating order: {e}")
+                return None
+
+
+@async_variant(get_order)
+async def get_order_async(order_id):
+    async with async_db_connection() as conn:
+        async with conn.cursor() as cur:
+            return await get_order_by_id_async(cur, order_id)
+
+
+@async_variant(get_orders_by_customer)
+async def get_orders_by_customer_async(customer_id, limit=DEFAULT_PAGE_SIZE, after=None):
+    keyset, params = keyset_condition(after, "o.created_at", "o.id", descending=True)
+    async with async_db_connection() as conn:
+        async with conn.cursor() as cur:
+            try:
+                await cur.execute(GET_CUSTOMER_ORDERS_QUERY.format(keyset=keyset), (customer_id, *params, limit))
+                orders = await cur.fetchall()
+
+                items_by_order = await get_order_items_by_order_ids_async(cur, [order['id'] for order in orders])
+                return [_customer_order(order, items_by_order.get(order['id'], [])) for order in orders]
+            except Exception as e:
+                print(f"Error getting orders by customer: {e}")
+                return []
+
+
+@async_variant(get_orders_by_restaurant)
+async def get_orders_by_restaurant_async(restaurant_id, limit=DEFAULT_PAGE_SIZE, after=None):
+    keyset, params = keyset_condition(after, "o.created_at", "o.id", descending=True)
+    async with async_db_connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(GET_RESTAURANT_ORDERS_QUERY.format(keyset=keyset), (restaurant_id, *params, limit))
+            orders = [dict(order_data) for order_data in await cur.fetchall()]
+
+            items_by_order = await get_order_items_by_order_ids_async(cur, [order['id'] for order in orders])
+            for order in orders:
+                order['items'] = items_by_order.get(order['id'], [])
+            return orders
+
+
+@async_variant(update_order_status)
+async def update_order_status_async(order_id, status):
+    async with async_db_connection() as conn:
+        async with conn.cursor() as cur:
+            try:
+                await cur.execute(UPDATE_ORDER_STATUS_QUERY, (status, order_id, status))
+                updated_order = await get_order_by_id_async(cur, order_id)
+                if not updated_order:
+                    return None
+                await conn.commit()
+                return updated_order
+            except Exception as e:
+                await conn.rollback()
+                print(f"Error updating order status: {e}")
+                return None
+
+
+@async_variant(delete_order)
+async def delete_order_async(order_id):
+    async with async_db_connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(DELETE_ORDER_QUERY, (order_id,))
+            result = await cur.fetchone()
+        await conn.commit()
     if result:
         return dict(result)
-    return None
\ No newline at end of file
+    return None
@@ -74,52 +74,49 @@
 #     conn.close()
 #     return result
 # app/models/restaurants.py
-from app.database import get_db
+from app.database import db_connection, read_connection
+from app.database_async import async_db_connection, async_variant
+from app.models.menu_item import MENU_CACHE_CHANNEL, MENU_CACHE_NOTIFY, invalidate_menu_cache
+from app.utils.notifications import NOTIFY_QUERY
 from app.schemas.restaurant import  RestaurantResponse
-
-def create_restaurants_table():
-    query = """
-    CREATE TABLE IF NOT EXISTS restaurants (
-        id SERIAL PRIMARY KEY,
-        name VARCHAR(200) NOT NULL,
-        description TEXT,
-        address VARCHAR(300),
-        phone VARCHAR(20),
-        created_at TIMESTAMP DEFAULT NOW()
-    );
-    """
-    conn = get_db()
-    cur = conn.cursor()
-    cur.execute(query)
-    conn.commit()
-    cur.close()
-    conn.close()
+from app.utils.pagination import DEFAULT_PAGE_SIZE, keyset_condition
+
+ADD_RESTAURANT_QUERY = """
+INSERT INTO restaurants (name, description, address, phone)
+VALUES (%s, %s, %s, %s)
+RETURNING id, name, description, address, phone, created_at;
+"""
+GET_RESTAURANTS_QUERY = "SELECT id, name, created_at FROM restaurants WHERE {keyset} ORDER BY created_at, id LIMIT %s;"
+GET_RESTAURANT_QUERY = """
+    SELECT id, name, description, address, phone, created_at
+    FROM restaurants
+    WHERE id = %s;
+"""
+DELETE_RESTAURANT_QUERY = "DELETE FROM restaurants WHERE id = %s RETURNING id;"
+# Validators for conditional GETs (migration 0004): any insert, delete or edit
+# changes either the count or the latest updated_at
+# Bumped by triggers whenever the restaurant list changes (migration 0012)
+GET_RESTAURANTS_VERSION_QUERY = "SELECT version FROM restaurant_list_version WHERE id = 1;"
+GET_RESTAURANT_VERSION_QUERY = "SELECT version, updated_at FROM restaurants WHERE id = %s;"
 
 
 def add_restaurant(name, description=None, address=None, phone=None):
-    query = """
-    INSERT INTO restaurants (name, description, address, phone)
-    VALUES (%s, %s, %s, %s)
-    RETURNING id, name, description, address, phone, created_at;
-    """
-    conn = get_db()
-    cur = conn.cursor()
-    cur.execute(query, (name, description, address, phone))
-    row = cur.fetchone()   # 👈 now dict
-    conn.commit()
-    cur.close()
-    conn.close()
+    with db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute(ADD_RESTAURANT_QUERY, (name, description, address, phone))
+        row = cur.fetchone()   # 👈 now dict
+        conn.commit()
+        cur.close()
     return row
 
 
-def get_restaurants():
-    query = "SELECT id, name FROM restaurants;"
-    conn = get_db()
-    cur = conn.cursor()
-    cur.execute(query)
-    rows = cur.fetchall()  # 👈 list[dict]
-    cur.close()
-    conn.close()
+def get_restaurants(limit=DEFAULT_PAGE_SIZE, after=None):
+    keyset, params = keyset_condition(after)
+    with read_connection() as conn:
+        cur = conn.cursor()
+        cur.execute(GET_RESTAURANTS_QUERY.format(keyset=keyset), (*params, limit))
+        rows = cur.fetchall()  # 👈 list[dict]
+        cur.close()
     return rows
 
 
@@ -135,18 +132,33 @@ def get_restaurants():
 
 
 def get_restaurant_by_id(rest_id: int):
-    query = """
-        SELECT id, name, description, address, phone, created_at
-        FROM restaurants
-        WHERE id = %s;
-    """
-    conn = get_db()
-    cur = conn.cursor()
-    cur.execute(query, (rest_id,))
-    row = cur.fetchone()
-    cur.close()
-    conn.close()
+    with db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute(GET_RESTAURANT_QUERY, (rest_id,))
+        row = cur.fetchone()
+        cur.close()
+    return _to_restaurant_response(row)
+
+
+def get_restaurants_version():
+    with read_connection() as conn:
+        cur = conn.cursor()
+        cur.execute(GET_RESTAURANTS_VERSION_QUERY)
+        row = cur.fetchone()
+        cur.close()
+    return row
 
+
+def get_restaurant_version(rest_id: int):
+    with db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute(GET_RESTAURANT_VERSION_QUERY, (rest_id,))
+        row = cur.fetchone()
+        cur.close()
+    return row
+
+
+def _to_restaurant_response(row):
     if row:
         return RestaurantResponse(
             id=row["id"],
@@ -160,12 +172,74 @@ def get_restaurant_by_id(rest_id: int):
 
 
 def delete_restaurant(rest_id):
-    query = "DELETE FROM restaurants WHERE id = %s RETURNING id;"
-    conn = get_db()
-    cur = conn.cursor()
-    cur.execute(query, (rest_id,))
-    row = cur.fetchone()
-    conn.commit()
-    cur.close()
-    conn.close()
+    with db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute(DELETE_RESTAURANT_QUERY, (rest_id,))
+        row = cur.fetchone()
+        if row and MENU_CACHE_NOTIFY:
+            cur.execute(NOTIFY_QUERY, (MENU_CACHE_CHANNEL, str(rest_id)))
+        conn.commit()
+        cur.close()
+    if row:
+        # Its menu items went with it (ON DELETE CASCADE)
+        invalidate_menu_cache(rest_id)
+    return row
+
+
+# Async variants (used when DB_ASYNC is enabled)
+@async_variant(add_restaurant)
+async def add_restaurant_async(name, description=None, address=None, phone=None):
+    async with async_db_connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(ADD_RESTAURANT_QUERY, (name, description, address, phone))
+            row = await cur.fetchone()
+        await conn.commit()
+    return row
+
+
+@async_variant(get_restaurants)
+async def get_restaurants_async(limit=DEFAULT_PAGE_SIZE, after=None):
+    keyset, params = keyset_condition(after)
+    async with async_db_connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(GET_RESTAURANTS_QUERY.format(keyset=keyset), (*params, limit))
+            return await cur.fetchall()
+
+
+@async_variant(get_restaurant_by_id)
+async def get_restaurant_by_id_async(rest_id: int):
+    async with async_db_connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(GET_RESTAURANT_QUERY, (rest_id,))
+            row = await cur.fetchone()
+    return _to_restaurant_response(row)
+
+
+@async_variant(get_restaurants_version)
+async def get_restaurants_version_async():
+    async with async_db_connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(GET_RESTAURANTS_VERSION_QUERY)
+            return await cur.fetchone()
+
+
+@async_variant(get_restaurant_version)
+async def get_restaurant_version_async(rest_id: int):
+    async with async_db_connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(GET_RESTAURANT_VERSION_QUERY, (rest_id,))
+            return await cur.fetchone()
+
+
+@async_variant(delete_restaurant)
+async def delete_restaurant_async(rest_id):
+    async with async_db_connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(DELETE_RESTAURANT_QUERY, (rest_id,))
+            row = await cur.fetchone()
+            if row and MENU_CACHE_NOTIFY:
+                await cur.execute(NOTIFY_QUERY, (MENU_CACHE_CHANNEL, str(rest_id)))
+        await conn.commit()
+    if row:
+        invalidate_menu_cache(rest_id)
     return row
@@ -0,0 +1,124 @@
+# app/models/search.py
+"""
+Ranked search over restaurants (name, description, address) and menu items
+(name, category), served by the indexes from migration 0003_search.
+
+On Postgres a row matches when its search_vector matches
+websearch_to_tsquery() of the text, or when its name is trigram-similar to
+the text (typos); its score is the normalised ts_rank_cd plus that name
+similarity. On SQLite a row matches when it contains every word of the text
+(the last one as a prefix, for search-as-you-type) in its FTS5 table, and
+the score is the negated bm25 rank.
+
+Each table contributes its SEARCH_MAX_CANDIDATES best-scoring matches to
+the ranking. Every match is still scored, but for a very common word only
+that many rows per table are joined and sorted into pages.
+"""
+import os
+import re
+from app.database import IS_SQLITE, read_connection
+from app.database_async import async_db_connection, async_variant
+
+SEARCH_MAX_CANDIDATES = int(os.getenv("SEARCH_MAX_CANDIDATES", "1000"))  # matches ranked per table
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+SEARCH_KINDS = ("restaurant", "menu_item")
+
+_TERM = re.compile(r"\w+")
+
+SEARCH_RESTAURANTS_SQL = """
+SELECT 'restaurant' AS type, r.id, r.name, NULL AS category, r.id AS restaurant_id, r.name AS restaurant_name,
+       r.score
+FROM (
+    SELECT id, name,
+           ts_rank_cd(search_vector, websearch_to_tsquery('english', %s), 32) + similarity(name, %s) AS score
+    FROM restaurants
+    WHERE search_vector @@ websearch_to_tsquery('english', %s) OR name %% %s
+    ORDER BY score DESC, id
+    LIMIT %s
+) r
+"""
+SEARCH_MENU_ITEMS_SQL = """
+SELECT 'menu_item' AS type, m.id, m.name, m.category, m.restaurant_id, r.name AS restaurant_name,
+       m.score
+FROM (
+    SELECT id, name, category, restaurant_id,
+           ts_rank_cd(search_vector, websearch_to_tsquery('english', %s), 32) + similarity(name, %s) AS score
+    FROM menu_items
+    WHERE search_vector @@ websearch_to_tsquery('english', %s) OR name %% %s
+    ORDER BY score DESC, id
+    LIMIT %s
+) m
+JOIN restaurants r ON r.id = m.restaurant_id
+"""
+SEARCH_RESTAURANTS_SQLITE = """
+SELECT 'restaurant' AS type, r.id, r.name, NULL AS category, r.id AS restaurant_id, r.name AS restaurant_name,
+       -f.bm25 AS score
+FROM (
+    SELECT rowid, rank AS bm25 FROM restaurants_fts WHERE restaurants_fts MATCH %s ORDER BY rank LIMIT %s
+) f
+JOIN restaurants r ON r.id = f.rowid
+"""
+SEARCH_MENU_ITEMS_SQLITE = """
+SELECT 'menu_item' AS type, m.id, m.name, m.category, m.restaurant_id, r.name AS restaurant_name,
+       -f.bm25 AS score
+FROM (
+    SELECT rowid, rank AS bm25 FROM menu_items_fts WHERE menu_items_fts MATCH %s ORDER BY rank LIMIT %s
+) f
+JOIN menu_items m ON m.id = f.rowid
+JOIN restaurants r ON r.id = m.restaurant_id
+"""
+SEARCH_RESULTS_SQL = "SELECT * FROM ({fragments}) results ORDER BY score DESC, type, id LIMIT %s OFFSET %s;"
+
+
+def fts_query(text):
+    """
+    FTS5 query matching rows that contain every word of text, the last one
+    as a prefix since it may still be being typed ("" if text has no words).
+    """
+    terms = [f'"{term}"' for term in _TERM.findall(text.lower())]
+    if terms:
+        terms[-1] += "*"
+    return " ".join(terms)
+
+
+def _search_query(text, kinds, limit, offset):
+    """The search SQL and its params, or (None, ()) when the text cannot match anything."""
+    if IS_SQLITE:
+        text = fts_query(text)
+        fragments = {"restaurant": SEARCH_RESTAURANTS_SQLITE, "menu_item": SEARCH_MENU_ITEMS_SQLITE}
+        fragment_params = (text, SEARCH_MAX_CANDIDATES)
+    else:
+        text = text.strip()
+        fragments = {"restaurant": SEARCH_RESTAURANTS_SQL, "menu_item": SEARCH_MENU_ITEMS_SQL}
+        fragment_params = (text, text, text, text, SEARCH_MAX_CANDIDATES)
+    kinds = [kind for kind in SEARCH_KINDS if kind in kinds]
+    if not text or not kinds:
+        return None, ()
+    query = SEARCH_RESULTS_SQL.format(fragments="\nUNION ALL\n".join(fragments[kind] for kind in kinds))
+    return query, fragment_params * len(kinds) + (limit, offset)
+
+
+# ✅ Search restaurants and menu items, best match first
+def search(text, kinds=SEARCH_KINDS, limit=DEFAULT_SEARCH_LIMIT, offset=0):
+    query, params = _search_query(text, kinds, limit, offset)
+    if query is None:
+        return []
+    with read_connection() as conn:
+        cur = conn.cursor()
+        cur.execute(query, params)
+        rows = cur.fetchall()
+        cur.close()
+    return rows
+
+
+# Async variants (used when DB_ASYNC is enabled)
+@async_variant(search)
+async def search_async(text, kinds=SEARCH_KINDS, limit=DEFAULT_SEARCH_LIMIT, offset=0):
+    query, params = _search_query(text, kinds, limit, offset)
+    if query is None:
+        return []
+    async with async_db_connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(query, params)
+            return await cur.fetchall()
@@ -0,0 +1,63 @@
+# app/models/uploads.py
+from app.database import db_connection
+from app.database_async import async_db_connection, async_variant
+
+# Re-uploading a file restarts its grace period (see delete_unreferenced_uploads).
+# uploaded_at is UTC, like the cutoff upload_gc compares it with
+REGISTER_UPLOAD_QUERY = """
+INSERT INTO uploads (url, size, content_type)
+VALUES (%s, %s, %s)
+ON CONFLICT (url) DO UPDATE SET uploaded_at = timezone('UTC', now());
+"""
+GET_UPLOAD_QUERY = "SELECT url, size, content_type, ref_count, uploaded_at FROM uploads WHERE url = %s;"
+DELETE_UNREFERENCED_UPLOADS_QUERY = """
+DELETE FROM uploads
+WHERE ref_count = 0 AND uploaded_at < %s
+RETURNING url;
+"""
+
+
+# ✅ Record a stored upload (before its file is put in place)
+def register_upload(url, size, content_type=None):
+    with db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute(REGISTER_UPLOAD_QUERY, (url, size, content_type))
+        conn.commit()
+        cur.close()
+
+
+# ✅ Get one upload's row
+def get_upload(url):
+    with db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute(GET_UPLOAD_QUERY, (url,))
+        row = cur.fetchone()
+        cur.close()
+    return row
+
+
+# ✅ Forget uploads nothing has referenced since `uploaded_before`
+def delete_unreferenced_uploads(uploaded_before, remove_files):
+    """
+    Deletes the rows and calls remove_files(urls) before committing, while
+    the rows are still locked: a concurrent upload of the same file waits
+    for the commit and then registers it afresh before putting it back on
+    disk. Returns the deleted URLs.
+    """
+    with db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute(DELETE_UNREFERENCED_UPLOADS_QUERY, (uploaded_before,))
+        urls = [row["url"] for row in cur.fetchall()]
+        remove_files(urls)
+        conn.commit()
+        cur.close()
+    return urls
+
+
+# Async variants (used when DB_ASYNC is enabled)
+@async_variant(register_upload)
+async def register_upload_async(url, size, content_type=None):
+    async with async_db_connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(REGISTER_UPLOAD_QUERY, (url, size, content_type))
+        await conn.commit()
@@ -1,59 +1,83 @@
-import psycopg2.extras
-from app.database import get_db
+import os
+from app.database import IS_SQLITE, db_connection, execute_prepared, prepared_statement
+from app.utils.cache import TTLCache
 from app.utils.hashing import hash_password
+from app.utils.notifications import NOTIFY_QUERY, listener
+from app.utils.pagination import DEFAULT_PAGE_SIZE, keyset_condition
+
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "4096"))   # users kept
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "30"))     # seconds
+# Broadcast invalidations to every worker through Postgres NOTIFY (not available on SQLite)
+USER_CACHE_NOTIFY = os.getenv("USER_CACHE_NOTIFY", "false").lower() in ("1", "true", "yes") and not IS_SQLITE
+USER_CACHE_CHANNEL = "user_cache_invalidate"
+
+GET_USER_BY_EMAIL = prepared_statement(
+    "get_user_by_email", "SELECT id, name, email, password, role, created_at FROM users WHERE email = %s;")
+
+# email -> user row without the password hash, filled by the /me route
+user_cache = TTLCache(USER_CACHE_SIZE, USER_CACHE_TTL)
+
+
+# ✅ Drop a cached user in this worker
+def invalidate_user_cache(email):
+    user_cache.invalidate(email)
+
+
+if USER_CACHE_NOTIFY:
+    listener.subscribe(USER_CACHE_CHANNEL, invalidate_user_cache)
 
 
 # ✅ Get user by email
 def get_user_by_email(email: str):
-    query = "SELECT id, name, email, password, role, created_at FROM users WHERE email = %s;"
-    conn = get_db()
-    cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)  # <-- dict cursor
-    cur.execute(query, (email,))
-    user = cur.fetchone()
-    cur.close()
-    conn.close()
+    with db_connection() as conn:
+        cur = conn.cursor()  # <-- dict cursor (connection default)
+        execute_prepared(cur, GET_USER_BY_EMAIL, (email,))
+        user = cur.fetchone()
+        cur.close()
     return user
 
 
 # ✅ Add user
 def add_user(username, email, password_hash, role="customer"):
-    conn = get_db()
-    cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)  # <-- dict cursor
-    cur.execute(
-        """
-        INSERT INTO users (name, email, password, role)
-        VALUES (%s, %s, %s, %s)
-        RETURNING id, name, email, role, created_at;
-        """,
-        (username, email, password_hash, role)
-    )
-    user = cur.fetchone()
-    conn.commit()
-    cur.close()
-    conn.close()
+    with db_connection() as conn:
+        cur = conn.cursor()  # <-- dict cursor (connection default)
+        cur.execute(
+            """
+            INSERT INTO users (name, email, password, role)
+            VALUES (%s, %s, %s, %s)
+            RETURNING id, name, email, role, created_at;
+            """,
+            (username, email, password_hash, role)
+        )
+        user = cur.fetchone()
+        conn.commit()
+        cur.close()
     return user
 
 
-# ✅ Get all users
-def get_users():
-    query = "SELECT id, name, email, created_at FROM users;"
-    conn = get_db()
-    cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)  # <-- dict cursor
-    cur.execute(query)
-    users = cur.fetchall()
-    cur.close()
-    conn.close()
+# ✅ Get a page of users, ordered by (created_at, id)
+def get_users(limit=DEFAULT_PAGE_SIZE, after=None):
+    keyset, params = keyset_condition(after)
+    query = f"SELECT id, name, email, created_at FROM users WHERE {keyset} ORDER BY created_at, id LIMIT %s;"
+    with db_connection() as conn:
+        cur = conn.cursor()  # <-- dict cursor (connection default)
+        cur.execute(query, (*params, limit))
+        users = cur.fetchall()
+        cur.close()
     return users
 
 
 # ✅ Delete user
 def delete_user(user_id: int):
-    query = "DELETE FROM users WHERE id = %s RETURNING id;"
-    conn = get_db()
-    cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)  # <-- dict cursor
-    cur.execute(query, (user_id,))
-    deleted = cur.fetchone()
-    conn.commit()
-    cur.close()
-    conn.close()
+    query = "DELETE FROM users WHERE id = %s RETURNING id, email;"
+    with db_connection() as conn:
+        cur = conn.cursor()  # <-- dict cursor (connection default)
+        cur.execute(query, (user_id,))
+        deleted = cur.fetchone()
+        if deleted and USER_CACHE_NOTIFY:
+            cur.execute(NOTIFY_QUERY, (USER_CACHE_CHANNEL, deleted["email"]))
+        conn.commit()
+        cur.close()
+    if deleted:
+        invalidate_user_cache(deleted["email"])
     return deleted
@@ -0,0 +1,59 @@
+# app/routes/analytics.py
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query
+from app.database_async import run_query
+from app.models import analytics, resturants
+from app.schemas.analytics import Granularity, SalesAnalytics
+
+BUCKET_SIZES = {Granularity.hour: timedelta(hours=1), Granularity.day: timedelta(days=1)}
+DEFAULT_RANGES = {Granularity.hour: timedelta(hours=24), Granularity.day: timedelta(days=30)}
+MAX_BUCKETS = {Granularity.hour: 24 * 31, Granularity.day: 366}
+
+router = APIRouter(tags=["Analytics"])
+
+
+def _utc(moment):
+    # Naive datetimes are taken to be UTC, like the TIMESTAMP columns
+    return moment if moment.tzinfo is None else moment.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _floor(moment, granularity):
+    moment = moment.replace(minute=0, second=0, microsecond=0)
+    return moment.replace(hour=0) if granularity == Granularity.day else moment
+
+
+def _ceil(moment, granularity):
+    floor = _floor(moment, granularity)
+    return floor if floor == moment else floor + BUCKET_SIZES[granularity]
+
+
+# ✅ Sales of one restaurant per hour or day
+@router.get("/restaurants/{restaurant_id}/sales", response_model=SalesAnalytics)
+async def get_restaurant_sales(
+    restaurant_id: int,
+    granularity: Granularity = Query(Granularity.day, description="Bucket size"),
+    start: Optional[datetime] = Query(None, description="Start of the range (UTC unless an offset is given)"),
+    end: Optional[datetime] = Query(None, description="End of the range, exclusive (default: now)"),
+    top: int = Query(analytics.DEFAULT_TOP_ITEMS, ge=1, le=analytics.MAX_TOP_ITEMS, description="Top items per bucket"),
+):
+    """
+    Revenue, order counts, average ticket and best-selling items, per bucket
+    and for the whole range, served from the hourly rollup tables. The range
+    is widened to whole buckets.
+    """
+    end = _utc(end) if end else datetime.now(timezone.utc).replace(tzinfo=None)
+    start = _utc(start) if start else end - DEFAULT_RANGES[granularity]
+    start, end = _floor(start, granularity), _ceil(end, granularity)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    if end - start > BUCKET_SIZES[granularity] * MAX_BUCKETS[granularity]:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {MAX_BUCKETS[granularity]} {granularity.value} buckets can be requested at once",
+        )
+
+    if not await run_query(resturants.get_restaurant_version, restaurant_id):
+        raise HTTPException(status_code=404, detail="Restaurant not found")
+    report = await run_query(analytics.get_sales, restaurant_id, granularity.value, start, end, top)
+    return {"restaurant_id": restaurant_id, "granularity": granularity, "start": start, "end": end, **report}
@@ -1,17 +1,40 @@
 # app/routes/menu.py
-from fastapi import APIRouter, HTTPException
-from app.models import menu_item
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from pydantic import TypeAdapter
+from starlette.concurrency import run_in_threadpool
+from app.database import DatabaseError
+from app.models import menu_item, resturants
+from app.database_async import run_query
 from app.schemas.menu_item import MenuItemCreate, MenuItemResponse
+from app.utils.bulk import read_batches, validate_batch
+from app.utils.conditional import Validators
+from app.utils.pagination import NEXT_CURSOR_HEADER, PageParams
 from typing import List
 
+menu_page_adapter = TypeAdapter(List[MenuItemResponse])
+
+MAX_REPORTED_ERRORS = 1000
+
+# The body is streamed by hand, so describe it for the docs
+MENU_IMPORT_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "text/csv": {"schema": {"type": "string", "example": "name,price,category,image\nMasala Dosa,4.50,Main Course,\n"}},
+            "application/x-ndjson": {"schema": {"type": "string", "example": '{"name": "Masala Dosa", "price": 4.5}\n'}},
+        },
+    }
+}
+
 router = APIRouter(
     tags=["Menu"]
 )
 
 # ✅ Add a menu item
 @router.post("/{restaurant_id}", response_model=MenuItemResponse)
-def create_menu_item(restaurant_id: int, item: MenuItemCreate):
-    new_item = menu_item.add_menu_item(
+async def create_menu_item(restaurant_id: int, item: MenuItemCreate):
+    new_item = await run_query(
+        menu_item.add_menu_item,
         restaurant_id=restaurant_id,
         name=item.name,
         price=item.price,
@@ -30,27 +53,100 @@ def create_menu_item(restaurant_id: int, item: MenuItemCreate):
     )
 
 
-# Get all menu items for a restaurant
+# Get a page of menu items for a restaurant (read-through cache of the serialized first pages)
 @router.get("/{restaurant_id}", response_model=List[MenuItemResponse])
-def fetch_menu_items(restaurant_id: int):
-    items = menu_item.get_menu_items_by_restaurant(restaurant_id)
-    return [
-        MenuItemResponse(
-            id=i["id"],
-            name=i["name"],
-            price=i["price"],
-            category=i["category"],
-            image=i["image"],
-            created_at=None  # since we didn't fetch created_at in query
+async def fetch_menu_items(restaurant_id: int, request: Request, page: PageParams = Depends()):
+    # Only first pages are cached, at most MENU_CACHE_PAGES page sizes per restaurant
+    cacheable = page.after is None
+    generation = menu_item.menu_cache.generation
+    pages = (menu_item.menu_cache.get(restaurant_id) or {}) if cacheable else {}
+    cached = pages.get(page.limit)
+
+    if cached is None:
+        cache_status = "MISS"
+        # Read the version before the items, so the ETag is never newer than the body
+        version = await run_query(menu_item.get_menu_version, restaurant_id)
+        validators = version and Validators(
+            "menu", restaurant_id, version["menu_version"], (page.limit, page.after),
+            last_modified=version["menu_updated_at"],
+        )
+        if validators and validators.is_current(request):
+            return validators.not_modified({"X-Cache": cache_status})
+        items = await run_query(
+            menu_item.get_menu_items_by_restaurant, restaurant_id, limit=page.fetch_size, after=page.after
         )
-        for i in items
-    ]
+        items, next_cursor = page.trim(items)
+        body = menu_page_adapter.dump_json(menu_page_adapter.validate_python(items))
+        # No version means no such restaurant; don't keep an empty menu for it
+        if cacheable and version:
+            pages = {**pages, page.limit: (body, next_cursor, validators)}
+            while len(pages) > menu_item.MENU_CACHE_PAGES:
+                pages.pop(next(iter(pages)))
+            # Skipped if a write invalidated the cache while we were reading
+            menu_item.menu_cache.set(restaurant_id, pages, generation=generation)
+    else:
+        cache_status = "HIT"
+        body, next_cursor, validators = cached
+        if validators and validators.is_current(request):
+            return validators.not_modified({"X-Cache": cache_status})
+
+    headers = {"X-Cache": cache_status}
+    if validators:
+        headers.update(validators.headers)
+    if next_cursor:
+        headers[NEXT_CURSOR_HEADER] = next_cursor
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.post("/{restaurant_id}/import", openapi_extra=MENU_IMPORT_BODY)
+async def import_menu_items(restaurant_id: int, request: Request, skip_invalid: bool = False):
+    """
+    Load many menu items in one transaction. Rows are validated in batches as
+    the body streams in. By default any invalid row rejects the whole import
+    (422, listing the bad rows); with skip_invalid=true the valid rows are
+    imported and the invalid ones reported.
+    """
+    batches = read_batches(request, MenuItemCreate)
+    if not await run_query(resturants.get_restaurant_by_id, restaurant_id):
+        raise HTTPException(status_code=404, detail="Restaurant not found")
+
+    importer = await run_in_threadpool(menu_item.MenuImport, restaurant_id)
+    errors = []
+    error_count = 0
+    row_count = 0
+    try:
+        async for batch in batches:
+            row_count += len(batch)
+            if row_count > menu_item.MENU_IMPORT_MAX_ROWS:
+                raise HTTPException(
+                    status_code=413, detail=f"At most {menu_item.MENU_IMPORT_MAX_ROWS} rows per import"
+                )
+            valid, batch_errors = validate_batch(MenuItemCreate, batch)
+            error_count += len(batch_errors)
+            errors.extend(batch_errors[:MAX_REPORTED_ERRORS - len(errors)])
+            # Once the import is going to be rejected, keep reading only to report errors
+            if valid and (skip_invalid or not error_count):
+                await run_in_threadpool(
+                    importer.write, [(item.name, item.price, item.category, item.image) for _, item in valid]
+                )
+
+        if error_count and not skip_invalid:
+            raise HTTPException(status_code=422, detail={
+                "message": "No rows were imported", "error_count": error_count, "errors": errors,
+            })
+        imported = await run_in_threadpool(importer.commit)
+    except DatabaseError as e:
+        raise HTTPException(status_code=400, detail=f"Import failed: {str(e).strip().splitlines()[0]}")
+    finally:
+        await run_in_threadpool(importer.abort)
+
+    return {"imported": imported, "skipped": error_count, "errors": errors}
 
 
 # Delete a menu item
 @router.delete("/{menu_item_id}")
-def remove_menu_item(menu_item_id: int):
-    deleted = menu_item.delete_menu_item(menu_item_id)
+async def remove_menu_item(menu_item_id: int):
+    deleted = await run_query(menu_item.delete_menu_item, menu_item_id)
     if not deleted:
         raise HTTPException(status_code=404, detail="Menu item not found")
-    return {"message": "Menu item deleted successfully", "id": deleted[0] if deleted else None}
+    return {"message": "Menu item deleted successfully", "id": deleted["id"]}
@@ -1,126 +1,152 @@
 # app/routes/orders.py
-from fastapi import APIRouter, HTTPException
-from app.models import orders
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from app.models import orders, resturants
 from app.schemas.order import OrderCreate, OrderUpdate, OrderResponse, OrderSummary, OrderItemSummary
-from typing import List
-from app.database import get_db
+from typing import List, Optional
+from app.database_async import run_query
+from app.utils.events import encode_event, event_stream, hub
+from app.utils.idempotency import (
+    IDEMPOTENCY_KEY_HEADER, MAX_KEY_LENGTH, REPLAYED_HEADER, StoredResponse, idempotency_store, request_hash,
+)
+from app.utils.pagination import NEXT_CURSOR_HEADER, PageParams
+from app.utils.serialization import JSONRenderer
+
+# Responses are rendered straight from the model rows (see app/utils/serialization.py);
+# response_model stays on each route for the OpenAPI schema
+order_renderer = JSONRenderer(OrderResponse)
+order_list_renderer = JSONRenderer(OrderResponse, many=True)
+order_summary_list_renderer = JSONRenderer(OrderSummary, many=True)
 
 router = APIRouter(
     tags=["Orders"]
 )
 
+
+def _render(renderer, rows, next_cursor=None):
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+    return Response(content=renderer.render(rows), media_type="application/json", headers=headers)
+
+
 # ✅ Create a new order
 @router.post("/", response_model=OrderResponse)
-def create_order(order: OrderCreate):
+async def create_order(
+    order: OrderCreate,
+    idempotency_key: Optional[str] = Header(
+        None, alias=IDEMPOTENCY_KEY_HEADER, min_length=1, max_length=MAX_KEY_LENGTH,
+        description="Client-generated key; retries with the same key return the first order instead of placing another",
+    ),
+):
     order_items_data = [item.dict() for item in order.items]
     # Use getattr to safely get payment_status with a default value
     payment_status = getattr(order, 'payment_status', None)
     payment_status_value = payment_status.value if payment_status else 'Unpaid'
-    
-    new_order = orders.create_order(
+    order_data = dict(
         customer_id=order.customer_id,
         restaurant_id=order.restaurant_id,
         total_price=order.total_price,
         items=order_items_data,
         payment_status=payment_status_value
     )
+
+    if idempotency_key is not None:
+        return await _create_order_once(idempotency_key, order_data)
+
+    new_order = await run_query(orders.create_order, **order_data)
     if not new_order:
         raise HTTPException(status_code=400, detail="Order could not be created")
-    # Manually cast Decimal types to float for Pydantic validation
-    new_order['total_price'] = float(new_order['total_price'])
-    for item in new_order['items']:
-        item['price'] = float(item['price'])
+    return _render(order_renderer, new_order)
 
-    return OrderResponse(**new_order)
 
+async def _create_order_once(idempotency_key, order_data):
+    fingerprint = request_hash(order_data)
 
-# ✅ Get order by ID
-@router.get("/{order_id}", response_model=OrderResponse)
-def get_order(order_id: int):
-    conn = get_db()
-    cur = conn.cursor()
-    try:
-        order = orders.get_order_by_id(cur, order_id)
-        if not order:
-            raise HTTPException(status_code=404, detail="Order not found")
+    async def place():
+        new_order, stored_hash, created = await run_query(orders.create_order_once, idempotency_key, fingerprint, **order_data)
+        if not new_order:
+            raise HTTPException(status_code=400, detail="Order could not be created")
+        return StoredResponse(200, order_renderer.render(new_order), stored_hash, replayed=not created)
+
+    # Keys are scoped to the customer, as in the idempotency_keys table
+    response = await idempotency_store.run((order_data["customer_id"], idempotency_key), fingerprint, place)
+    headers = {REPLAYED_HEADER: "true"} if response.replayed else None
+    return Response(content=response.body, status_code=response.status_code, media_type="application/json", headers=headers)
 
-        # Manually cast Decimal types to float for Pydantic validation
-        order['total_price'] = float(order['total_price'])
-        for item in order['items']:
-            item['price'] = float(item['price'])
 
-        return OrderResponse(**order)
-    finally:
-        cur.close()
-        conn.close()
+# ✅ Get order by ID
+@router.get("/{order_id}", response_model=OrderResponse)
+async def get_order(order_id: int):
+    order = await run_query(orders.get_order, order_id)
+    if not order:
+        raise HTTPException(status_code=404, detail="Order not found")
+    return _render(order_renderer, order)
 
 
 # ✅ Get orders by customer
 @router.get("/customer/{customer_id}", response_model=List[OrderSummary])
-def get_customer_orders(customer_id: int):
-    customer_orders = orders.get_orders_by_customer(customer_id)
-    if not customer_orders:
-        return []
-
-    response_orders = []
-    for order in customer_orders:
-        order_summary = {
-            'id': order['id'],
-            'customer_id': order['customer_id'],
-            'restaurant_id': order['restaurant_id'],
-            'total_price': float(order['total_price']),
-            'status': order['status'],
-            'payment_status': order['payment_status'],
-            'created_at': order['created_at'],
-            'restaurant_name': order['restaurant_name'],
-            'items': [
-                {
-                    'id': item['id'],
-                    'menu_item_id': item['menu_item_id'],
-                    'name': item['name'],
-                    'price': float(item['price']),
-                    'quantity': item['quantity']
-                }
-                for item in order.get('items', [])
-            ]
-        }
-        response_orders.append(OrderSummary(**order_summary))
-
-    return response_orders
+async def get_customer_orders(customer_id: int, page: PageParams = Depends()):
+    customer_orders = await run_query(
+        orders.get_orders_by_customer, customer_id, limit=page.fetch_size, after=page.after
+    )
+    customer_orders, next_cursor = page.trim(customer_orders)
+    return _render(order_summary_list_renderer, customer_orders, next_cursor)
 
 
 # ✅ Get orders by restaurant
 @router.get("/restaurant/{restaurant_id}", response_model=List[OrderResponse])
-def get_restaurant_orders(restaurant_id: int):
-    restaurant_orders = orders.get_orders_by_restaurant(restaurant_id)
-    response_orders = []
-    for order in restaurant_orders:
-        # Manually cast Decimal types to float for Pydantic validation
-        order['total_price'] = float(order['total_price'])
-        for item in order.get('items', []):
-            item['price'] = float(item['price'])
-        response_orders.append(OrderResponse(**order))
-    return response_orders
+async def get_restaurant_orders(restaurant_id: int, page: PageParams = Depends()):
+    restaurant_orders = await run_query(
+        orders.get_orders_by_restaurant, restaurant_id, limit=page.fetch_size, after=page.after
+    )
+    restaurant_orders, next_cursor = page.trim(restaurant_orders)
+    return _render(order_list_renderer, restaurant_orders, next_cursor)
+
+
+# ✅ Stream a restaurant's new orders and status changes (Server-Sent Events)
+@router.get("/restaurant/{restaurant_id}/events")
+async def stream_restaurant_orders(restaurant_id: int):
+    """
+    text/event-stream of order_created (the full order), order_updated and
+    order_deleted (id, status and payment_status) events for the restaurant,
+    replacing polling of GET /api/orders/restaurant/{restaurant_id}.
+    """
+    if not await run_query(resturants.get_restaurant_version, restaurant_id):
+        raise HTTPException(status_code=404, detail="Restaurant not found")
+    return event_stream(hub.subscribe(f"restaurant:{restaurant_id}"))
+
+
+# ✅ Stream one order's status changes (Server-Sent Events)
+@router.get("/{order_id}/events")
+async def stream_order(order_id: int):
+    """
+    text/event-stream starting with the current order (an `order` event),
+    then its order_updated and order_deleted events.
+    """
+    # Subscribe before loading, so no change can fall between the two
+    subscription = hub.subscribe(f"order:{order_id}")
+    try:
+        order = await run_query(orders.get_order, order_id)
+        if not order:
+            raise HTTPException(status_code=404, detail="Order not found")
+    except BaseException:
+        # Including a failed or cancelled load: nothing will read this stream
+        subscription.close()
+        raise
+    return event_stream(subscription, initial=[encode_event("order", order)])
 
 
 # ✅ Update order status
 @router.patch("/{order_id}", response_model=OrderResponse)
-def update_order_status(order_id: int, order_update: OrderUpdate):
-    updated_order = orders.update_order_status(order_id, order_update.status)
+async def update_order_status(order_id: int, order_update: OrderUpdate):
+    updated_order = await run_query(orders.update_order_status, order_id, order_update.status)
     if not updated_order:
         raise HTTPException(status_code=404, detail="Order not found")
-    # Manually cast Decimal types to float for Pydantic validation
-    updated_order['total_price'] = float(updated_order['total_price'])
-    for item in updated_order['items']:
-        item['price'] = float(item['price'])
-
-    return OrderResponse(**updated_order)
+    return _render(order_renderer, updated_order)
 
 
 # ✅ Delete order
 @router.delete("/{order_id}")
-def delete_order(order_id: int):
-    deleted = orders.delete_order(order_id)
+async def delete_order(order_id: int):
+    deleted = await run_query(orders.delete_order, order_id)
     if not deleted:
         raise HTTPException(status_code=404, detail="Order not found")
     return {"message": "Order deleted successfully", "id": deleted['id']}
\ No newline at end of file
@@ -107,19 +107,22 @@
 
 
 # app/routes/resturants.py
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
 from app.schemas.restaurant import RestaurantCreate, RestaurantResponse
 from app.models import resturants
-from app.database import get_db
+from app.database_async import run_query
+from app.utils.conditional import Validators
+from app.utils.pagination import PageParams
 
 router = APIRouter(tags=["Restaurants"])
 
 
 @router.post("/", response_model=RestaurantResponse)
-def create_restaurant(restaurant: RestaurantCreate):
+async def create_restaurant(restaurant: RestaurantCreate):
     # Get user ID from request (you'll need to implement auth middleware)
     # For now, we'll create the restaurant without owner association
-    new_restaurant = resturants.add_restaurant(
+    new_restaurant = await run_query(
+        resturants.add_restaurant,
         restaurant.name, restaurant.description, restaurant.address, restaurant.phone
     )
     if not new_restaurant:
@@ -138,22 +141,36 @@ def create_restaurant(restaurant: RestaurantCreate):
 
 
 @router.get("/", response_model=list[RestaurantResponse])
-def list_restaurants():
-    rows = resturants.get_restaurants()
-    return [RestaurantResponse(id=r["id"], name=r["name"]) for r in rows]
+async def list_restaurants(request: Request, response: Response, page: PageParams = Depends()):
+    # No Last-Modified: a deletion changes the list without a newer timestamp
+    version = await run_query(resturants.get_restaurants_version)
+    validators = Validators("restaurants", version["version"], page.limit, page.after)
+    if validators.is_current(request):
+        return validators.not_modified()
+    rows = await run_query(resturants.get_restaurants, limit=page.fetch_size, after=page.after)
+    rows = page.paginate(rows, response)
+    response.headers.update(validators.headers)
+    return [RestaurantResponse(id=r["id"], name=r["name"], created_at=r["created_at"]) for r in rows]
 
 
 @router.get("/{rest_id}", response_model=RestaurantResponse)
-def get_restaurant(rest_id: int):
-    rest = resturants.get_restaurant_by_id(rest_id)
+async def get_restaurant(rest_id: int, request: Request, response: Response):
+    version = await run_query(resturants.get_restaurant_version, rest_id)
+    if not version:
+        raise HTTPException(status_code=404, detail="Restaurant not found")
+    validators = Validators("restaurant", rest_id, version["version"], last_modified=version["updated_at"])
+    if validators.is_current(request):
+        return validators.not_modified()
+    rest = await run_query(resturants.get_restaurant_by_id, rest_id)
     if not rest:
         raise HTTPException(status_code=404, detail="Restaurant not found")
+    response.headers.update(validators.headers)
     return rest
 
 
 @router.delete("/{rest_id}")
-def remove_restaurant(rest_id: int):
-    deleted = resturants.delete_restaurant(rest_id)
+async def remove_restaurant(rest_id: int):
+    deleted = await run_query(resturants.delete_restaurant, rest_id)
     if not deleted:
         raise HTTPException(status_code=404, detail="Restaurant not found")
     return {"message": "Restaurant deleted successfully"}
@@ -0,0 +1,33 @@
+# app/routes/search.py
+from typing import List, Optional
+from fastapi import APIRouter, Query, Response
+from app.database_async import run_query
+from app.models import search
+from app.schemas.search import SearchResult, SearchResultType
+from app.utils.pagination import NEXT_CURSOR_HEADER, decode_offset_cursor, encode_offset_cursor
+from app.utils.serialization import JSONRenderer
+
+MAX_QUERY_LENGTH = 200
+
+search_renderer = JSONRenderer(SearchResult, many=True)
+
+router = APIRouter(tags=["Search"])
+
+
+# ✅ Search restaurants and menu items, best match first
+@router.get("", response_model=List[SearchResult])
+async def search_catalog(
+    q: str = Query(..., min_length=1, max_length=MAX_QUERY_LENGTH, description="Words to look for"),
+    type: Optional[SearchResultType] = Query(None, description="Only return results of this type"),
+    limit: int = Query(search.DEFAULT_SEARCH_LIMIT, ge=1, le=search.MAX_SEARCH_LIMIT),
+    cursor: Optional[str] = Query(None, description=f"Opaque cursor from the {NEXT_CURSOR_HEADER} response header"),
+):
+    offset = decode_offset_cursor(cursor) if cursor else 0
+    kinds = (type.value,) if type else search.SEARCH_KINDS
+    # One extra row tells us whether another page exists
+    rows = await run_query(search.search, q, kinds=kinds, limit=limit + 1, offset=offset)
+    headers = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        headers = {NEXT_CURSOR_HEADER: encode_offset_cursor(offset + limit)}
+    return Response(content=search_renderer.render(rows), media_type="application/json", headers=headers)
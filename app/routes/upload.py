@@ -1,44 +1,57 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi import APIRouter, Request
 from fastapi.responses import JSONResponse
-import os
-import uuid
-from pathlib import Path
+from starlette.concurrency import run_in_threadpool
+from app.database_async import run_query
+from app.models import uploads
+from app.utils.images import UPLOAD_URL_PREFIX, derivative_urls, has_derivatives, schedule_derivatives
+from app.utils.uploads import UPLOAD_DIR, receive_upload
 
 router = APIRouter()
 
 # Create uploads directory if it doesn't exist
-UPLOAD_DIR = Path("uploads")
 UPLOAD_DIR.mkdir(exist_ok=True)
 
-@router.post("/upload-image")
-async def upload_image(file: UploadFile = File(...)):
-    """Upload an image file and return the file URL"""
-    
-    # Validate file type
-    if not file.content_type.startswith('image/'):
-        raise HTTPException(status_code=400, detail="File must be an image")
-    
-    # Validate file size (10MB limit)
-    file_size = 0
-    content = await file.read()
-    file_size = len(content)
-    
-    if file_size > 10 * 1024 * 1024:  # 10MB
-        raise HTTPException(status_code=400, detail="File size too large. Maximum 10MB allowed")
-    
-    # Generate unique filename
-    file_extension = file.filename.split('.')[-1] if '.' in file.filename else 'jpg'
-    unique_filename = f"{uuid.uuid4()}.{file_extension}"
-    file_path = UPLOAD_DIR / unique_filename
-    
-    # Save file
-    try:
-        with open(file_path, "wb") as buffer:
-            buffer.write(content)
-        
-        # Return the file URL
-        file_url = f"/uploads/{unique_filename}"
-        return JSONResponse(content={"image_url": file_url})
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to save file: {str(e)}")
+# The body is streamed by hand rather than through UploadFile, so describe it for the docs
+IMAGE_UPLOAD_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                    "required": ["file"],
+                }
+            }
+        },
+    }
+}
+
+
+async def _register(upload):
+    # Registered before the file is put in place, so upload_gc cannot delete it in between
+    await run_query(uploads.register_upload, UPLOAD_URL_PREFIX + upload.path.name, upload.size, upload.content_type)
+
+
+@router.post("/upload-image", openapi_extra=IMAGE_UPLOAD_BODY)
+async def upload_image(request: Request):
+    """
+    Upload an image file (10MB limit) and return its URL plus those of its
+    resized variants. Files are stored by content, so uploading the same
+    image twice returns the same URL.
+    """
+    upload = await receive_upload(
+        request,
+        field_name="file",
+        accept_content_type=lambda content_type: content_type.startswith("image/"),
+        content_type_error="File must be an image",
+        before_store=_register,
+    )
+
+    file_url = UPLOAD_URL_PREFIX + upload.path.name
+    if upload.duplicate and await run_in_threadpool(has_derivatives, upload.path):
+        variants = derivative_urls(file_url)
+    else:
+        # Thumbnails and WebP are generated in the background
+        variants = schedule_derivatives(upload.path, file_url)
+    return JSONResponse(content={"image_url": file_url, "variants": variants})
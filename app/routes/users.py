@@ -4,8 +4,9 @@ from fastapi import APIRouter, Depends, HTTPException
 from fastapi.security import OAuth2PasswordRequestForm
 from app.schemas.user import UserCreate, UserResponse
 from app.models import users
-from app.utils.auth import verify_password, create_access_token, get_current_user
-from app.utils.hashing import hash_password
+from app.database_async import run_query
+from app.utils.auth import create_access_token, get_current_user
+from app.utils.hashing import hash_password_async, verify_password_async
 
 router = APIRouter(tags=["Users"])
 
@@ -21,14 +22,15 @@ router = APIRouter(tags=["Users"])
 
 
 @router.post("/register")
-def register(user: UserCreate):
+async def register(user: UserCreate):
     # Check if user already exists
-    existing = users.get_user_by_email(user.email)
+    existing = await run_query(users.get_user_by_email, user.email)
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
     
-    hashed_pw = hash_password(user.password)
-    new_user = users.add_user(user.name, user.email, hashed_pw, user.role)
+    # bcrypt runs in the hashing process pool, not on the request threadpool
+    hashed_pw = await hash_password_async(user.password)
+    new_user = await run_query(users.add_user, user.name, user.email, hashed_pw, user.role)
     
     # Create access token for the new user
     token = create_access_token({"sub": new_user["email"]})
@@ -49,9 +51,9 @@ def register(user: UserCreate):
 
 
 @router.post("/login")
-def login(form_data: OAuth2PasswordRequestForm = Depends()):
-    user = users.get_user_by_email(form_data.username)
-    if not user or not verify_password(form_data.password, user["password"]):  # <-- FIXED
+async def login(form_data: OAuth2PasswordRequestForm = Depends()):
+    user = await run_query(users.get_user_by_email, form_data.username)
+    if not user or not await verify_password_async(form_data.password, user["password"]):  # <-- FIXED
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
     token = create_access_token({"sub": user["email"]})
@@ -72,8 +74,15 @@ def login(form_data: OAuth2PasswordRequestForm = Depends()):
 
 # ✅ Protected profile
 @router.get("/me", response_model=UserResponse)
-def get_profile(current_user: str = Depends(get_current_user)):
-    user = users.get_user_by_email(current_user)
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
+async def get_profile(current_user: str = Depends(get_current_user)):
+    # Read-through user cache; only a miss goes to the database
+    user = users.user_cache.get(current_user)
+    if user is None:
+        generation = users.user_cache.generation
+        user = await run_query(users.get_user_by_email, current_user)
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        user = {key: value for key, value in user.items() if key != "password"}
+        # Skipped if the user was deleted while we were reading
+        users.user_cache.set(current_user, user, generation=generation)
     return user  # <-- Dict, works with response_model
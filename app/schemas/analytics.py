@@ -0,0 +1,34 @@
+# app/schemas/analytics.py
+from pydantic import BaseModel
+from typing import List
+from datetime import datetime
+from enum import Enum
+
+class Granularity(str, Enum):
+    hour = "hour"
+    day = "day"
+
+class TopItem(BaseModel):
+    menu_item_id: int
+    name: str
+    quantity: int
+    revenue: float
+
+class SalesTotals(BaseModel):
+    orders: int
+    delivered_orders: int
+    revenue: float
+    average_ticket: float
+
+class SalesBucket(SalesTotals):
+    start: datetime
+    top_items: List[TopItem]
+
+class SalesAnalytics(BaseModel):
+    restaurant_id: int
+    granularity: Granularity
+    start: datetime
+    end: datetime
+    totals: SalesTotals
+    buckets: List[SalesBucket]
+    top_items: List[TopItem]
@@ -1,7 +1,8 @@
 # app/schemas/menu_item.py
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, computed_field
+from typing import Dict, Optional
 from datetime import datetime
+from app.utils.images import written_derivative_urls
 
 class MenuItemCreate(BaseModel):
     name: str
@@ -16,3 +17,10 @@ class MenuItemResponse(BaseModel):
     category: Optional[str]
     image: Optional[str]
     created_at: Optional[datetime] = None
+
+    # Thumbnail / WebP URLs for uploaded images, so listings can load the small ones
+    # ({} until they have been generated)
+    @computed_field
+    @property
+    def image_variants(self) -> Dict[str, str]:
+        return written_derivative_urls(self.image)
@@ -0,0 +1,17 @@
+# app/schemas/search.py
+from pydantic import BaseModel
+from typing import Optional
+from enum import Enum
+
+class SearchResultType(str, Enum):
+    restaurant = "restaurant"
+    menu_item = "menu_item"
+
+class SearchResult(BaseModel):
+    type: SearchResultType
+    id: int
+    name: str
+    category: Optional[str] = None
+    restaurant_id: int
+    restaurant_name: str
+    score: float
@@ -0,0 +1,62 @@
+# app/upload_gc.py
+"""
+Garbage collection for uploaded images.
+
+Uploads are content-addressed (see app/utils/uploads.py), so one stored file
+may back any number of menu items; the uploads table counts those references
+(migration 0005_uploads). An upload nothing has referenced for the grace
+period (UPLOAD_GC_GRACE_HOURS, 24 by default) is deleted together with its
+resized variants. The grace period gives a freshly uploaded image time to be
+attached to a menu item. Run from the command line, e.g. from cron:
+
+    python -m app.upload_gc                   # delete unreferenced uploads
+    python -m app.upload_gc --grace-hours 1   # with a shorter grace period
+"""
+import argparse
+import os
+from datetime import datetime, timedelta, timezone
+from app.models import uploads
+from app.utils import uploads as upload_storage
+from app.utils.images import DERIVATIVES, UPLOAD_URL_PREFIX, derivative_filename
+
+UPLOAD_GC_GRACE_HOURS = float(os.getenv("UPLOAD_GC_GRACE_HOURS", "24"))
+
+
+def remove_files(urls, directory=None):
+    """Delete the stored files (original and variants) behind upload URLs."""
+    directory = upload_storage.UPLOAD_DIR if directory is None else directory
+    for url in urls:
+        if not url.startswith(UPLOAD_URL_PREFIX):
+            continue
+        filename = url[len(UPLOAD_URL_PREFIX):]
+        names = [filename] + [derivative_filename(filename, variant) for variant in DERIVATIVES]
+        for name in names:
+            try:
+                (directory / name).unlink()
+            except FileNotFoundError:
+                pass
+
+
+def collect(grace_hours=UPLOAD_GC_GRACE_HOURS):
+    """Delete uploads unreferenced for `grace_hours`. Returns their URLs."""
+    # uploaded_at is a TIMESTAMP column, taken to be UTC
+    cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(hours=grace_hours)
+    return uploads.delete_unreferenced_uploads(cutoff, remove_files)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Delete uploaded images no menu item references")
+    parser.add_argument(
+        "--grace-hours", type=float, default=UPLOAD_GC_GRACE_HOURS,
+        help="keep unreferenced uploads this recent (default: %(default)s)",
+    )
+    args = parser.parse_args()
+
+    deleted = collect(args.grace_hours)
+    for url in deleted:
+        print(f"Deleted {url}")
+    print(f"Deleted {len(deleted)} unreferenced upload(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+# app/utils/bulk.py
+"""
+Streaming CSV / NDJSON request bodies for bulk endpoints.
+
+read_batches() decodes the body as it arrives and yields batches of
+(row number, record) pairs, so a large import never has to sit in memory
+as a whole. CSV needs a header line; empty cells are read as missing
+values, and quoted cells may span lines. NDJSON is one JSON object per
+line. validate_batch() then validates a whole batch against a schema in
+one pydantic call, falling back to row-by-row only for batches that
+contain errors, so that every bad row is reported with its number.
+"""
+import codecs
+import csv
+import json
+from functools import lru_cache
+from typing import List
+
+from fastapi import HTTPException, Request
+from pydantic import TypeAdapter, ValidationError
+
+CSV_MEDIA_TYPES = ("text/csv",)
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+BATCH_SIZE = 1000
+
+
+def body_format(request: Request):
+    media_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if media_type in CSV_MEDIA_TYPES:
+        return "csv"
+    if media_type in NDJSON_MEDIA_TYPES:
+        return "ndjson"
+    raise HTTPException(
+        status_code=415,
+        detail=f"Send the rows as text/csv or application/x-ndjson, not {media_type or 'no content type'}",
+    )
+
+
+async def _lines(request: Request):
+    """Decoded lines of the body (with their line endings), as the chunks arrive."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in request.stream():
+        try:
+            pending += decoder.decode(chunk)
+        except UnicodeDecodeError:
+            raise HTTPException(status_code=400, detail="Body is not valid UTF-8")
+        lines = pending.splitlines(keepends=True)
+        # The last piece may be a partial line; keep it for the next chunk
+        pending = lines.pop() if lines and not lines[-1].endswith(("\n", "\r")) else ""
+        for line in lines:
+            yield line
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+async def _csv_batches(request, schema, batch_size):
+    header = None
+    batch_lines = []
+    record_lines = []
+    quotes = 0
+    row_number = 0
+
+    def parse(lines):
+        nonlocal row_number
+        rows = []
+        for cells in csv.reader(lines):
+            if not any(cells):
+                continue  # blank line
+            row_number += 1
+            if len(cells) != len(header):
+                rows.append((row_number, None, f"expected {len(header)} cells, got {len(cells)}"))
+                continue
+            rows.append((row_number, {key: value or None for key, value in zip(header, cells)}, None))
+        return rows
+
+    async for line in _lines(request):
+        record_lines.append(line)
+        quotes += line.count('"')
+        if quotes % 2:
+            continue  # inside a quoted cell
+        if header is None:
+            names = [name.strip() for name in next(csv.reader(record_lines), [])]
+            record_lines, quotes = [], 0
+            if not any(names):
+                continue  # blank line before the header
+            header = names
+            unknown = set(header) - set(schema.model_fields)
+            missing = {name for name, field in schema.model_fields.items() if field.is_required()} - set(header)
+            if unknown or missing:
+                problems = [f"{label} CSV columns: {', '.join(sorted(names))}"
+                            for label, names in (("Unknown", unknown), ("Missing", missing)) if names]
+                raise HTTPException(status_code=400, detail="; ".join(problems))
+            continue
+        batch_lines.extend(record_lines)
+        record_lines, quotes = [], 0
+        if len(batch_lines) >= batch_size:
+            yield parse(batch_lines)
+            batch_lines = []
+    batch_lines.extend(record_lines)
+    if batch_lines and header:
+        yield parse(batch_lines)
+
+
+async def _ndjson_batches(request, batch_size):
+    batch = []
+    row_number = 0
+    async for line in _lines(request):
+        if not line.strip():
+            continue
+        row_number += 1
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            batch.append((row_number, None, f"invalid JSON: {e}"))
+        else:
+            if isinstance(record, dict):
+                batch.append((row_number, record, None))
+            else:
+                batch.append((row_number, None, "expected a JSON object"))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def read_batches(request: Request, schema, batch_size=None):
+    """
+    Async iterator over batches of (row number, record dict or None, parse
+    error or None) from a CSV or NDJSON body. A CSV header must name the
+    schema's required fields and nothing outside it.
+    """
+    batch_size = batch_size or BATCH_SIZE
+    if body_format(request) == "csv":
+        return _csv_batches(request, schema, batch_size)
+    return _ndjson_batches(request, batch_size)
+
+
+@lru_cache(maxsize=None)
+def _adapters(schema):
+    return TypeAdapter(List[schema]), TypeAdapter(schema)
+
+
+def _messages(error):
+    return [
+        {"field": ".".join(str(part) for part in detail["loc"]) or None, "message": detail["msg"]}
+        for detail in error.errors(include_url=False)
+    ]
+
+
+def validate_batch(schema, batch):
+    """Returns ([(row number, model)], [{"row": n, "errors": [...]}]) for a batch from read_batches()."""
+    list_adapter, item_adapter = _adapters(schema)
+    errors = [{"row": row, "errors": [{"field": None, "message": message}]} for row, _, message in batch if message]
+    rows = [(row, record) for row, record, message in batch if not message]
+    try:
+        models = list_adapter.validate_python([record for _, record in rows])
+        return [(row, model) for (row, _), model in zip(rows, models)], errors
+    except ValidationError:
+        pass
+    valid = []
+    for row, record in rows:
+        try:
+            valid.append((row, item_adapter.validate_python(record)))
+        except ValidationError as e:
+            errors.append({"row": row, "errors": _messages(e)})
+    errors.sort(key=lambda error: error["row"])
+    return valid, errors
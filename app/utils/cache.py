@@ -0,0 +1,92 @@
+# app/utils/cache.py
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Thread-safe, bounded LRU cache whose entries also expire after `ttl` seconds.
+
+    Keeps hit/miss/eviction counters and, when given a `sizeof` function, the
+    total size of the cached values; with `maxbytes` as well, least recently
+    used entries are evicted to keep that total under it. `generation` changes on every
+    invalidation; pass the value read before loading an entry to set() so a
+    load that raced with an invalidation does not store stale data.
+    """
+
+    def __init__(self, maxsize, ttl, sizeof=None, maxbytes=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.maxbytes = maxbytes
+        self._sizeof = sizeof
+        self._lock = threading.Lock()
+        self._data = OrderedDict()  # key -> (expires_at, value, size)
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.total_size = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                if entry[0] > now:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                self._remove(key)
+            self.misses += 1
+            return default
+
+    def set(self, key, value, ttl=None, generation=None):
+        """Store a value; skipped if `generation` is given and an invalidation happened since."""
+        size = self._sizeof(value) if self._sizeof else 0
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return False
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (expires_at, value, size)
+            self.total_size += size
+            while len(self._data) > self.maxsize or (
+                    self.maxbytes is not None and self.total_size > self.maxbytes):
+                self._remove(next(iter(self._data)))
+                self.evictions += 1
+            return key in self._data
+
+    def invalidate(self, key):
+        with self._lock:
+            self.generation += 1
+            if key in self._data:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self._data.clear()
+            self.total_size = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "maxbytes": self.maxbytes,
+                "total_size": self.total_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def _remove(self, key):
+        _, _, size = self._data.pop(key)
+        self.total_size -= size
@@ -0,0 +1,69 @@
+# app/utils/conditional.py
+"""
+Conditional GETs (If-None-Match / If-Modified-Since, RFC 9110 section 13).
+
+A route looks up a cheap version of what it is about to return (see the
+version columns from migration 0004), builds Validators from it and checks
+them against the request before loading anything else; when the client's
+copy is current it answers 304 Not Modified with no body.
+
+ETags are strong: a hash of the resource, its version and anything else the
+response bytes depend on (such as the page requested). Timestamps are
+TIMESTAMP columns, taken to be UTC.
+"""
+import hashlib
+from datetime import timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from fastapi import Request, Response
+
+CACHE_CONTROL = "no-cache"  # clients may keep responses but must revalidate them
+
+
+def make_etag(*parts):
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+
+def _utc(moment):
+    return moment.replace(tzinfo=timezone.utc) if moment.tzinfo is None else moment.astimezone(timezone.utc)
+
+
+def _etag_matches(header, etag):
+    # If-None-Match uses the weak comparison: W/"x" matches "x"
+    if header.strip() == "*":
+        return True
+    tags = (tag.strip() for tag in header.split(","))
+    return any((tag[2:] if tag.startswith("W/") else tag) == etag for tag in tags)
+
+
+class Validators:
+    """The ETag (and optional Last-Modified time) of one response."""
+
+    def __init__(self, *parts, last_modified=None):
+        self.etag = make_etag(*parts)
+        self.last_modified = _utc(last_modified).replace(microsecond=0) if last_modified else None
+
+    @property
+    def headers(self):
+        headers = {"ETag": self.etag, "Cache-Control": CACHE_CONTROL}
+        if self.last_modified:
+            headers["Last-Modified"] = format_datetime(self.last_modified, usegmt=True)
+        return headers
+
+    def is_current(self, request: Request):
+        """Whether the request's preconditions say the client already has this response."""
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            # If-Modified-Since is ignored when If-None-Match is present
+            return _etag_matches(if_none_match, self.etag)
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since and self.last_modified:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            return self.last_modified <= _utc(since)
+        return False
+
+    def not_modified(self, headers=None):
+        return Response(status_code=304, headers={**self.headers, **(headers or {})})
@@ -0,0 +1,172 @@
+# app/utils/events.py
+"""
+In-process fan-out of events to Server-Sent Events streams.
+
+A stream subscribes to topics (such as "restaurant:7") on the worker's
+EventHub and gets a bounded queue. publish() may be called from any thread
+(request handlers in the threadpool, the notification listener): it encodes
+the event as an SSE frame once and hands it to every subscriber's event
+loop. Across workers, events travel through Postgres LISTEN/NOTIFY (see
+app/utils/notifications.py), so each worker needs one listener connection
+however many clients are streaming.
+
+A subscriber that falls EVENTS_QUEUE_SIZE events behind is disconnected
+rather than buffered without bound; EventSource clients reconnect on their
+own and should reload what they show. Idle streams get a comment line every
+EVENTS_HEARTBEAT seconds so proxies keep them open.
+"""
+import asyncio
+import json
+import logging
+import os
+import threading
+from datetime import date, datetime
+from decimal import Decimal
+from fastapi.responses import StreamingResponse
+
+logger = logging.getLogger(__name__)
+
+EVENTS_QUEUE_SIZE = int(os.getenv("EVENTS_QUEUE_SIZE", "100"))  # events buffered per stream
+EVENTS_HEARTBEAT = float(os.getenv("EVENTS_HEARTBEAT", "15"))    # seconds between keep-alives
+EVENTS_RETRY_MS = 3000  # how long EventSource waits before reconnecting
+
+KEEPALIVE_FRAME = b": keep-alive\n\n"
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def encode_event(event, data):
+    """One SSE frame: `event: <event>` and `data: <data as JSON>`."""
+    payload = json.dumps(data, default=_json_default, separators=(",", ":"))
+    return f"event: {event}\ndata: {payload}\n\n".encode()
+
+
+class Subscription:
+    """One stream's queue of frames; create with EventHub.subscribe() on the event loop."""
+
+    def __init__(self, hub, topics, queue_size):
+        self.topics = topics
+        self.closed = False
+        self._hub = hub
+        self._loop = asyncio.get_running_loop()
+        # One slot more than queue_size, for the end-of-stream marker
+        self._queue = asyncio.Queue(queue_size + 1)
+        self._queue_size = queue_size
+
+    def _deliver(self, frame):
+        # Runs on the subscriber's event loop
+        if self.closed:
+            return
+        if self._queue.qsize() >= self._queue_size:
+            logger.warning("Event stream for %s fell behind; disconnecting it", ", ".join(self.topics))
+            self.close()
+            return
+        self._queue.put_nowait(frame)
+
+    def close(self):
+        """Stop receiving events; frames() ends after what is already queued."""
+        if self.closed:
+            return
+        self.closed = True
+        self._hub.unsubscribe(self)
+        self._queue.put_nowait(None)
+
+    async def frames(self, heartbeat=None):
+        """Queued frames as they arrive, with a keep-alive after `heartbeat` idle seconds."""
+        heartbeat = EVENTS_HEARTBEAT if heartbeat is None else heartbeat
+        while True:
+            try:
+                frame = await asyncio.wait_for(self._queue.get(), heartbeat)
+            except asyncio.TimeoutError:
+                yield KEEPALIVE_FRAME
+                continue
+            if frame is None:
+                return
+            yield frame
+
+
+class EventHub:
+    def __init__(self, queue_size=EVENTS_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._subscribers = {}  # topic -> {Subscription}
+
+    @property
+    def subscriber_count(self):
+        with self._lock:
+            return len(set().union(*self._subscribers.values()))
+
+    def subscribe(self, *topics):
+        """Subscribe to events published on any of `topics`; call from the event loop."""
+        subscription = Subscription(self, topics, self.queue_size)
+        with self._lock:
+            for topic in topics:
+                self._subscribers.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for topic in subscription.topics:
+                subscribers = self._subscribers.get(topic)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscribers[topic]
+
+    def has_subscribers(self, topics):
+        with self._lock:
+            return any(topic in self._subscribers for topic in topics)
+
+    def publish(self, topics, event, data):
+        """Send an event to every stream subscribed to any of `topics`; thread-safe. Returns how many."""
+        with self._lock:
+            subscribers = set().union(*(self._subscribers.get(topic, ()) for topic in topics))
+        if not subscribers:
+            return 0
+        frame = encode_event(event, data)
+        for subscription in subscribers:
+            try:
+                subscription._loop.call_soon_threadsafe(subscription._deliver, frame)
+            except RuntimeError:
+                # Its event loop has shut down
+                self.unsubscribe(subscription)
+        return len(subscribers)
+
+    def close_all(self):
+        """End every stream; called at shutdown."""
+        with self._lock:
+            subscribers = set().union(*self._subscribers.values())
+        for subscription in subscribers:
+            try:
+                subscription._loop.call_soon_threadsafe(subscription.close)
+            except RuntimeError:
+                self.unsubscribe(subscription)
+
+
+def event_stream(subscription, initial=()):
+    """
+    A text/event-stream response sending the `initial` frames and then the
+    subscription's events until the client disconnects.
+    """
+    async def body():
+        try:
+            yield f"retry: {EVENTS_RETRY_MS}\n\n".encode()
+            for frame in initial:
+                yield frame
+            async for frame in subscription.frames():
+                yield frame
+        finally:
+            subscription.close()
+
+    return StreamingResponse(body(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+# Process-wide hub for order events (see app/models/orders.py)
+hub = EventHub()
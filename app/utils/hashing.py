@@ -1,12 +1,136 @@
 # app/utils/hashing.py
-from passlib.context import CryptContext
+"""
+Password hashing.
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+bcrypt is deliberately slow (BCRYPT_ROUNDS sets the cost: each +1 doubles
+it), so the API never runs it on the request threadpool. The async
+helpers submit the work to a small dedicated process pool: at most
+HASH_WORKERS hashes run at once, up to HASH_QUEUE_SIZE callers wait for a
+slot, and anything beyond that (or waiting longer than HASH_QUEUE_TIMEOUT)
+gets a 503, so a login burst queues behind itself instead of starving
+order and menu requests.
+
+hash_password() / verify_password() are the plain synchronous functions;
+they run in the workers and in scripts.
+"""
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import bcrypt
+from fastapi import HTTPException, status
+from starlette.concurrency import run_in_threadpool
+
+from app.utils.metrics import Gauge, Histogram
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", "2"))
+HASH_QUEUE_SIZE = int(os.getenv("HASH_QUEUE_SIZE", "64"))        # callers waiting for a worker
+HASH_QUEUE_TIMEOUT = float(os.getenv("HASH_QUEUE_TIMEOUT", "10"))  # seconds before giving up with 503
+
+# bcrypt only reads the first 72 bytes of a password
+BCRYPT_MAX_BYTES = 72
+
+HASH_QUEUE_WAIT = Histogram(
+    "password_hash_queue_wait_seconds", "Time spent waiting for a password hashing worker", ("operation",)
+)
+HASH_DURATION = Histogram(
+    "password_hash_duration_seconds", "Time spent hashing or verifying a password", ("operation",)
+)
+HASH_QUEUED = Gauge("password_hash_queued", "Password hashing calls waiting for a worker")
+
+_executor = None
+_slots = None
+_waiting = 0
+
+
+def _secret(password):
+    return password.encode("utf-8")[:BCRYPT_MAX_BYTES]
 
 
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    return bcrypt.hashpw(_secret(password), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode("ascii")
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    try:
+        return bcrypt.checkpw(_secret(plain_password), hashed_password.encode("ascii"))
+    except (ValueError, UnicodeEncodeError):
+        # Not a bcrypt hash
+        return False
+
+
+def start_hash_workers():
+    global _executor, _slots
+    if HASH_WORKERS > 0 and _executor is None:
+        # spawn: forking a process that runs an event loop and helper threads is unsafe
+        _executor = ProcessPoolExecutor(
+            max_workers=HASH_WORKERS, mp_context=multiprocessing.get_context("spawn")
+        )
+        _slots = asyncio.Semaphore(HASH_WORKERS)
+    return _executor
+
+
+def shutdown_hash_workers():
+    global _executor, _slots
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
+        _slots = None
+
+
+def _busy():
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many authentication requests, try again shortly",
+        headers={"Retry-After": "1"},
+    )
+
+
+async def _run(operation, fn, *args):
+    """Run fn in the hashing pool, queueing for a free worker; threadpool if the pool is not running."""
+    global _waiting
+    if _executor is None:
+        return await run_in_threadpool(fn, *args)
+
+    if _waiting >= HASH_QUEUE_SIZE:
+        raise _busy()
+    executor, slots = _executor, _slots
+    _waiting += 1
+    HASH_QUEUED.inc()
+    queued_at = time.perf_counter()
+    try:
+        await asyncio.wait_for(slots.acquire(), HASH_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise _busy()
+    finally:
+        _waiting -= 1
+        HASH_QUEUED.dec()
+        HASH_QUEUE_WAIT.observe(operation, value=time.perf_counter() - queued_at)
+
+    loop = asyncio.get_running_loop()
+    started = time.perf_counter()
+
+    def done(_):
+        # The worker stays busy after its caller is cancelled: free the slot
+        # when the job itself is over
+        HASH_DURATION.observe(operation, value=time.perf_counter() - started)
+        loop.call_soon_threadsafe(slots.release)
+
+    try:
+        job = executor.submit(fn, *args)
+    except BaseException:
+        slots.release()
+        raise
+    job.add_done_callback(done)
+    return await asyncio.wrap_future(job)
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run("hash", hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run("verify", verify_password, plain_password, hashed_password)
@@ -0,0 +1,95 @@
+# app/utils/idempotency.py
+"""
+Idempotency keys for retried POSTs (the Idempotency-Key request header).
+
+The first response for a key is kept in a bounded in-memory store for
+IDEMPOTENCY_CACHE_TTL seconds and replayed for retries with the same key,
+without running the request again. The store never keeps a response longer
+than the model keeps the key (IDEMPOTENCY_KEY_RETENTION_HOURS): once a key
+has expired, a retry places a new order on every worker alike. A retry that arrives while the first
+request is still running waits for it instead of starting a second one.
+The in-memory store is per worker: durability across workers and restarts
+comes from the model, which records the key in the same transaction as
+what it creates (see models.orders.create_order_once) and answers a reused
+key with the existing record.
+
+Reusing a key with a different request body is refused with 422.
+"""
+import asyncio
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from fastapi import HTTPException
+from app.utils.cache import TTLCache
+
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+IDEMPOTENCY_CACHE_SIZE = int(os.getenv("IDEMPOTENCY_CACHE_SIZE", "10000"))  # responses kept
+IDEMPOTENCY_CACHE_TTL = float(os.getenv("IDEMPOTENCY_CACHE_TTL", "3600"))   # seconds
+# How long an Idempotency-Key answers with its order; older keys are free again
+IDEMPOTENCY_KEY_RETENTION_HOURS = float(os.getenv("IDEMPOTENCY_KEY_RETENTION_HOURS", "24"))
+
+
+def request_hash(payload):
+    """SHA-256 of a JSON-able request payload, independent of key order."""
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
+
+
+@dataclass
+class StoredResponse:
+    status_code: int
+    body: bytes
+    # The request the response was first produced for
+    request_hash: str
+    replayed: bool = False
+
+
+class IdempotencyStore:
+    def __init__(self, maxsize=IDEMPOTENCY_CACHE_SIZE, ttl=None):
+        if ttl is None:
+            ttl = min(IDEMPOTENCY_CACHE_TTL, IDEMPOTENCY_KEY_RETENTION_HOURS * 3600)
+        self.responses = TTLCache(maxsize, ttl, sizeof=lambda response: len(response.body))
+        self._in_flight = {}  # key -> Future resolved when the first request for it finishes
+
+    @staticmethod
+    def _check(response, request_hash):
+        if response.request_hash != request_hash:
+            raise HTTPException(
+                status_code=422,
+                detail=f"This {IDEMPOTENCY_KEY_HEADER} was already used with a different request",
+            )
+        return response
+
+    async def run(self, key, request_hash, handler):
+        """
+        Return the stored response for `key` (marked replayed), or await
+        handler() for a new StoredResponse and store it if it succeeded.
+        Raises HTTPException(422) if `key` belongs to a different request.
+        """
+        while True:
+            stored = self.responses.get(key)
+            if stored is not None:
+                return self._check(StoredResponse(stored.status_code, stored.body, stored.request_hash, True), request_hash)
+            in_flight = self._in_flight.get(key)
+            if in_flight is None:
+                break
+            # The same key is running now: wait for it, then replay what it stored
+            # (or, if it failed, run this request ourselves)
+            await asyncio.shield(in_flight)
+
+        done = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = done
+        try:
+            response = await handler()
+            if 200 <= response.status_code < 300:
+                self.responses.set(key, response)
+        finally:
+            del self._in_flight[key]
+            done.set_result(None)
+        return self._check(response, request_hash)
+
+
+# Process-wide store for order creation
+idempotency_store = IdempotencyStore()
@@ -0,0 +1,135 @@
+# app/utils/images.py
+"""
+Image derivatives for uploaded images.
+
+After an upload is stored, resized WebP copies are generated in a process
+pool so the CPU-heavy decoding and encoding never runs on the request path
+or holds the GIL in the API process. Derivatives are written next to the
+original as <stem>_<variant>.webp and appear shortly after the upload
+returns. List endpoints point at them via written_derivative_urls(), which
+only advertises derivatives that are on disk: images uploaded before the
+pipeline existed, failed jobs and jobs still queued get none.
+
+Requires Pillow (pip install -e ".[images]"); without it, or with
+IMAGE_DERIVATIVES=false, uploads are served as originals only.
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from app.utils import uploads
+from app.utils.cache import TTLCache
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+IMAGE_DERIVATIVES = (
+    Image is not None
+    and os.getenv("IMAGE_DERIVATIVES", "true").lower() in ("1", "true", "yes")
+)
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", "2"))
+UPLOAD_URL_PREFIX = "/uploads/"
+
+# variant -> (fixed (width, height) cropped to fit, or None to keep the original size; WebP quality)
+DERIVATIVES = {
+    "thumb": ((200, 200), 75),
+    "card": ((640, 360), 80),
+    "webp": (None, 82),
+}
+
+_executor = None
+# Filenames whose derivatives were found on disk; rechecked after a while in
+# case upload_gc removed them
+_written = TTLCache(maxsize=10000, ttl=300)
+
+
+def derivative_filename(filename, variant):
+    return f"{Path(filename).stem}_{variant}.webp"
+
+
+def derivative_urls(image_url):
+    """URLs of the derivatives of an uploaded image ({} for external or missing images)."""
+    if not IMAGE_DERIVATIVES or not image_url or not image_url.startswith(UPLOAD_URL_PREFIX):
+        return {}
+    filename = image_url[len(UPLOAD_URL_PREFIX):]
+    return {variant: UPLOAD_URL_PREFIX + derivative_filename(filename, variant) for variant in DERIVATIVES}
+
+
+def written_derivative_urls(image_url):
+    """derivative_urls() of an uploaded image once every derivative has been written, else {}."""
+    urls = derivative_urls(image_url)
+    if not urls:
+        return {}
+    filename = image_url[len(UPLOAD_URL_PREFIX):]
+    if _written.get(filename) is None:
+        if not has_derivatives(uploads.UPLOAD_DIR / filename):
+            return {}
+        _written.set(filename, True)
+    return urls
+
+
+def has_derivatives(path):
+    """Whether every derivative of the image at `path` has been written."""
+    path = Path(path)
+    return all(path.with_name(derivative_filename(path.name, variant)).exists() for variant in DERIVATIVES)
+
+
+def generate_derivatives(path):
+    """Write every derivative of the image at `path`; runs in a worker process. Returns the paths written."""
+    path = Path(path)
+    written = []
+    with Image.open(path) as original:
+        image = ImageOps.exif_transpose(original)
+        image = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+        for variant, (size, quality) in DERIVATIVES.items():
+            resized = ImageOps.fit(image, size, Image.Resampling.LANCZOS) if size else image
+            target = path.with_name(derivative_filename(path.name, variant))
+            # Write then rename, so the static mount never serves a half-written file
+            tmp = target.with_suffix(".webp.part")
+            resized.save(tmp, "WEBP", quality=quality, method=4)
+            os.replace(tmp, target)
+            written.append(target)
+    return written
+
+
+def start_image_workers():
+    global _executor
+    if IMAGE_DERIVATIVES and _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=IMAGE_WORKERS, mp_context=multiprocessing.get_context("spawn")
+        )
+    return _executor
+
+
+def shutdown_image_workers():
+    """Stop the pool after letting queued derivatives finish."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
+# Filenames whose derivatives were found on disk; rechecked after a while in
+# case upload_gc removed them
+_written = TTLCache(maxsize=10000, ttl=300)
+
+
+def _log_failure(future):
+    if not future.cancelled() and future.exception() is not None:
+        logger.warning("Image derivative generation failed: %s", future.exception())
+
+
+def schedule_derivatives(path, image_url):
+    """
+    Queue derivative generation for a stored upload without waiting for it.
+    Returns the derivative URLs, or {} when the pipeline is not running.
+    """
+    if _executor is None:
+        return {}
+    future = asyncio.get_running_loop().run_in_executor(_executor, generate_derivatives, str(path))
+    future.add_done_callback(_log_failure)
+    return derivative_urls(image_url)
@@ -0,0 +1,232 @@
+# app/utils/metrics.py
+"""
+In-process Prometheus metrics.
+
+MetricsMiddleware records per-route latency, status counts and in-flight
+requests. Database cursors call record_query(), which adds to the process
+totals and to the current request's query count and DB time (tracked
+through a context variable, so it follows the request into the
+threadpool). Everything is rendered in the Prometheus text format by
+render_metrics() for the /metrics endpoint.
+
+Updates are a dict lookup, a bisect and a short lock hold, so recording
+stays cheap on the hot path.
+"""
+import bisect
+import os
+import threading
+import time
+from contextvars import ContextVar
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+_registry = []
+_collectors = []
+
+
+def _format_labels(names, values):
+    if not names:
+        return ""
+    pairs = ",".join(
+        '{}="{}"'.format(name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        self._values = {}
+        if not self.labels:
+            # Unlabelled series are exported (as zero) before the first update
+            self._values[()] = self._zero()
+        _registry.append(self)
+
+    def _zero(self):
+        return 0
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = list(self._values.items())
+        for label_values, value in items:
+            lines.extend(self._render_series(label_values, value))
+        return lines
+
+    def _render_series(self, label_values, value):
+        return [f"{self.name}{_format_labels(self.labels, label_values)} {value}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def dec(self, *label_values, amount=1):
+        self.inc(*label_values, amount=-amount)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        super().__init__(name, help_text, labels)
+
+    def _zero(self):
+        # [per-bucket counts..., +Inf count], sum
+        return [[0] * (len(self.buckets) + 1), 0.0]
+
+    def observe(self, *label_values, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(label_values)
+            if series is None:
+                series = self._values[label_values] = self._zero()
+            series[0][index] += 1
+            series[1] += value
+
+    def _render_series(self, label_values, value):
+        counts, total = value
+        names = self.labels + ("le",)
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + ("+Inf",), counts):
+            cumulative += count
+            lines.append(f"{self.name}_bucket{_format_labels(names, label_values + (bound,))} {cumulative}")
+        labels = _format_labels(self.labels, label_values)
+        lines.append(f"{self.name}_sum{labels} {total}")
+        lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+def register_collector(collect):
+    """Add a callable returning extra exposition lines (e.g. cache or pool stats) at scrape time."""
+    _collectors.append(collect)
+
+
+def cache_collector(cache_name, cache):
+    """Collector exposing a TTLCache's stats() under the given cache label."""
+    def collect():
+        stats = cache.stats()
+        label = _format_labels(("cache",), (cache_name,))
+        lines = []
+        for name, kind, key in (
+            ("app_cache_hits_total", "counter", "hits"),
+            ("app_cache_misses_total", "counter", "misses"),
+            ("app_cache_evictions_total", "counter", "evictions"),
+            ("app_cache_entries", "gauge", "size"),
+            ("app_cache_bytes", "gauge", "total_size"),
+        ):
+            lines.append(f"# TYPE {name} {kind}")
+            lines.append(f"{name}{label} {stats[key]}")
+        return lines
+    return collect
+
+
+def render_metrics():
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    for collect in _collectors:
+        lines.extend(collect())
+    return "\n".join(lines) + "\n"
+
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ("method", "route")
+)
+REQUESTS = Counter(
+    "http_requests_total", "HTTP responses by route and status", ("method", "route", "status")
+)
+IN_FLIGHT = Gauge(
+    "http_requests_in_progress", "HTTP requests currently being served", ("method",)
+)
+REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries", "Database queries issued per request", ("method", "route"),
+    buckets=QUERY_COUNT_BUCKETS,
+)
+REQUEST_DB_TIME = Histogram(
+    "http_request_db_duration_seconds", "Time spent in database queries per request", ("method", "route")
+)
+DB_QUERIES = Counter("db_queries_total", "Database queries executed")
+DB_QUERY_TIME = Counter("db_query_duration_seconds_total", "Total time spent in database queries")
+
+# [query count, seconds] for the request being served, if any
+_request_db_stats = ContextVar("request_db_stats", default=None)
+
+
+def record_query(seconds):
+    """Called by the database cursors after every statement."""
+    DB_QUERIES.inc()
+    DB_QUERY_TIME.inc(amount=seconds)
+    stats = _request_db_stats.get()
+    if stats is not None:
+        stats[0] += 1
+        stats[1] += seconds
+
+
+def _route_label(scope):
+    # Route templates keep the label set bounded (/api/menu/{restaurant_id}, not every id)
+    route = scope.get("route")
+    if route is None:
+        # Mounted apps (e.g. /uploads) set root_path to their mount point
+        return scope.get("root_path", "") or "unmatched"
+    # FastAPI versions that resolve included routers per request keep the prefixed template here
+    context = scope.get("fastapi", {}).get("effective_route_context")
+    return getattr(context, "path", None) or route.path
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware, so it adds no per-request task or body wrapping."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        method = scope["method"]
+        status = 500
+        db_stats = [0, 0.0]
+        token = _request_db_stats.set(db_stats)
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        IN_FLIGHT.inc(method)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            IN_FLIGHT.dec(method)
+            _request_db_stats.reset(token)
+            route = _route_label(scope)
+            REQUEST_LATENCY.observe(method, route, value=elapsed)
+            REQUESTS.inc(method, route, status)
+            REQUEST_DB_QUERIES.observe(method, route, value=db_stats[0])
+            REQUEST_DB_TIME.observe(method, route, value=db_stats[1])
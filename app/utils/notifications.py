@@ -0,0 +1,89 @@
+# app/utils/notifications.py
+"""
+Postgres LISTEN/NOTIFY listener.
+
+One background thread per worker holds a dedicated connection LISTENing on
+the subscribed channels and hands each payload to the channel's callbacks.
+Writers execute NOTIFY_QUERY inside their transaction, so the message is
+only delivered if the transaction commits.
+"""
+import logging
+import select
+import threading
+from psycopg2 import sql
+import psycopg2
+from app.database import get_db
+
+logger = logging.getLogger(__name__)
+
+
+# Params: (channel, payload); delivered to listeners when the transaction commits
+NOTIFY_QUERY = "SELECT pg_notify(%s, %s);"
+
+
+class NotificationListener:
+    def __init__(self, connect=get_db, poll_interval=5.0, reconnect_delay=1.0):
+        self._connect = connect
+        self.poll_interval = poll_interval
+        self.reconnect_delay = reconnect_delay
+        self._callbacks = {}  # channel -> [callback(payload)]
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def channels(self):
+        return list(self._callbacks)
+
+    def subscribe(self, channel, callback):
+        """Register a callback for a channel; subscribe before start()."""
+        self._callbacks.setdefault(channel, []).append(callback)
+
+    def start(self):
+        if self._thread is not None or not self._callbacks:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="pg-notify-listener", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_interval + 1)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            conn = None
+            try:
+                conn = self._connect()
+                conn.autocommit = True
+                cur = conn.cursor()
+                for channel in self._callbacks:
+                    cur.execute(sql.SQL("LISTEN {};").format(sql.Identifier(channel)))
+                cur.close()
+
+                while not self._stop.is_set():
+                    ready, _, _ = select.select([conn], [], [], self.poll_interval)
+                    if not ready:
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        message = conn.notifies.pop(0)
+                        self._dispatch(message.channel, message.payload)
+            except psycopg2.Error as e:
+                logger.warning("Notification listener disconnected: %s", e)
+                self._stop.wait(self.reconnect_delay)
+            finally:
+                if conn is not None and not conn.closed:
+                    conn.close()
+
+    def _dispatch(self, channel, payload):
+        for callback in self._callbacks.get(channel, []):
+            try:
+                callback(payload)
+            except Exception:
+                logger.exception("Notification callback for %s failed", channel)
+
+
+# Process-wide listener, started from the app lifespan when something subscribes
+listener = NotificationListener()
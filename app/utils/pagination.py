@@ -0,0 +1,86 @@
+# app/utils/pagination.py
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Optional
+from fastapi import HTTPException, Query, Response
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+# Cursors are opaque to clients: url-safe base64 of the (created_at, id) keyset position
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    raw = json.dumps([created_at.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (binascii.Error, ValueError, TypeError, OverflowError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+# Ranked results (search) have no stable keyset, so their cursors carry a row offset instead
+def encode_offset_cursor(offset: int) -> str:
+    raw = json.dumps(["offset", offset], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_offset_cursor(cursor: str) -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        kind, offset = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, ValueError, TypeError, OverflowError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if kind != "offset" or not isinstance(offset, int) or offset < 0:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return offset
+
+
+def keyset_condition(after, created_at_column="created_at", id_column="id", descending=False):
+    """
+    SQL condition (and its params) selecting rows that come after the cursor
+    position in (created_at, id) order. Matches everything on the first page.
+    """
+    if after is None:
+        return "TRUE", ()
+    operator = "<" if descending else ">"
+    return f"({created_at_column}, {id_column}) {operator} (%s, %s)", tuple(after)
+
+
+class PageParams:
+    """Query parameters for keyset-paginated list endpoints (use with Depends())."""
+
+    def __init__(
+        self,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        cursor: Optional[str] = Query(None, description=f"Opaque cursor from the {NEXT_CURSOR_HEADER} response header"),
+    ):
+        self.limit = limit
+        self.after = decode_cursor(cursor) if cursor else None
+
+    @property
+    def fetch_size(self):
+        # One extra row tells us whether another page exists
+        return self.limit + 1
+
+    def trim(self, rows):
+        """Drop the look-ahead row. Returns (rows, next page cursor or None)."""
+        if len(rows) > self.limit:
+            rows = rows[:self.limit]
+            last = rows[-1]
+            return rows, encode_cursor(last["created_at"], last["id"])
+        return rows, None
+
+    def paginate(self, rows, response: Response):
+        """Trim the look-ahead row and expose the next page's cursor in a response header."""
+        rows, next_cursor = self.trim(rows)
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
+        return rows
@@ -0,0 +1,39 @@
+# app/utils/periodic.py
+"""
+Background maintenance jobs that run every few seconds in each worker,
+such as folding the sales deltas (app/models/analytics.py). Jobs must be
+safe to run from several workers at once.
+"""
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    def __init__(self, name, interval, job):
+        self.name = name
+        self.interval = interval
+        self._job = job
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None or self.interval <= 0:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self._job()
+            except Exception:
+                logger.exception("Periodic task %s failed", self.name)
@@ -0,0 +1,88 @@
+# app/utils/serialization.py
+"""
+Fast JSON rendering of database rows for large responses.
+
+A JSONRenderer is built once per response schema. Building it checks that
+every field of the schema is something rows can be emitted as directly
+(scalars, str enums, nested schemas and lists of them) and compiles a
+projection that picks exactly those fields out of each row. Rendering is
+then one projection pass plus orjson, with Decimal columns written as
+numbers, instead of validating a Pydantic model per row.
+
+The database already enforces what validation would check (NOT NULL and
+CHECK constraints, column types), so rows are trusted as-is. Without
+orjson (pip install -e ".[json]") rendering falls back to validating and
+dumping the whole payload with one pydantic TypeAdapter.
+"""
+import enum
+import typing
+from datetime import date, datetime
+from decimal import Decimal
+from typing import List
+
+from pydantic import BaseModel, TypeAdapter
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_SCALARS = (int, float, str, bool, datetime, date, Decimal)
+
+
+def _default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def _converter(annotation, where):
+    """None for values emitted as-is, else a function converting the value."""
+    origin = typing.get_origin(annotation)
+    args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+    if origin is typing.Union and len(args) == 1:
+        convert = _converter(args[0], where)
+        return convert and (lambda value: None if value is None else convert(value))
+    if origin in (list, List) and args:
+        convert = _converter(args[0], where)
+        return convert and (lambda values: [convert(value) for value in values])
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return _compile(annotation)
+    if isinstance(annotation, type) and (
+        issubclass(annotation, _SCALARS) or (issubclass(annotation, enum.Enum) and issubclass(annotation, str))
+    ):
+        return None
+    raise TypeError(f"{where}: {annotation!r} cannot be rendered from rows directly")
+
+
+def _compile(model):
+    if model.model_computed_fields:
+        raise TypeError(f"{model.__name__}: computed fields cannot be rendered from rows directly")
+    plain = []
+    nested = []
+    for name, field in model.model_fields.items():
+        convert = _converter(field.annotation, f"{model.__name__}.{name}")
+        (plain if convert is None else nested).append((name, convert) if convert else name)
+
+    def project(row):
+        result = {name: row[name] for name in plain}
+        for name, convert in nested:
+            result[name] = convert(row[name])
+        return result
+    return project
+
+
+class JSONRenderer:
+    """Renders a row (or, with many=True, a list of rows) as `schema` to JSON bytes."""
+
+    def __init__(self, schema, many=False):
+        self.many = many
+        self._project = _compile(schema)
+        self._adapter = TypeAdapter(List[schema] if many else schema)
+
+    def render(self, rows):
+        if orjson is None:
+            return self._adapter.dump_json(self._adapter.validate_python(rows))
+        project = self._project
+        payload = [project(row) for row in rows] if self.many else project(rows)
+        return orjson.dumps(payload, default=_default)
@@ -0,0 +1,257 @@
+# app/utils/uploads.py
+"""
+Streaming multipart upload handling.
+
+The request body is fed through the multipart parser as it arrives and the
+file part is written to a temporary file in UPLOAD_CHUNK_SIZE chunks from the
+threadpool, so an upload never sits in memory and disk writes never block
+the event loop. The size limit is checked against the Content-Length header
+up front and again as bytes arrive; the upload is aborted as soon as it goes
+over.
+
+Files are content-addressed: they are named by the SHA-256 of their bytes,
+hashed as they are written, so uploading the same image again reuses the
+stored file. Completed files are moved into place with an atomic rename and
+never change afterwards, which is what lets UploadFiles serve them as
+immutable.
+"""
+import hashlib
+import os
+import re
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+from fastapi import HTTPException, Request
+from python_multipart.exceptions import FormParserError
+from python_multipart.multipart import MultipartParser, parse_options_header
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+
+UPLOAD_DIR = Path("uploads")
+MAX_UPLOAD_SIZE = 10 * 1024 * 1024  # 10MB
+UPLOAD_CHUNK_SIZE = 256 * 1024
+# Room for boundaries and part headers when checking Content-Length
+MULTIPART_OVERHEAD = 16 * 1024
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+_SAFE_EXTENSION = re.compile(r"^[A-Za-z0-9]{1,10}$")
+_CONTENT_ADDRESSED_NAME = re.compile(r"^([0-9a-f]{64})\.[A-Za-z0-9]{1,10}$")
+
+
+@dataclass
+class StoredUpload:
+    path: Optional[Path]
+    filename: str
+    content_type: str
+    size: int
+    sha256: str = ""
+    # The same bytes were already stored; path is the existing file
+    duplicate: bool = False
+
+
+def _file_extension(filename, default="jpg"):
+    extension = filename.rsplit(".", 1)[-1] if "." in filename else ""
+    return extension.lower() if _SAFE_EXTENSION.match(extension) else default
+
+
+def _stored_file(directory, digest):
+    """The file already stored for this content, if any (derivatives are <digest>_<variant>.webp)."""
+    return next(directory.glob(f"{digest}.*"), None)
+
+
+def _write(tmp, hasher, data):
+    hasher.update(data)
+    tmp.write(data)
+
+
+def _too_large(max_size):
+    return HTTPException(
+        status_code=400,
+        detail=f"File size too large. Maximum {max_size // (1024 * 1024)}MB allowed",
+    )
+
+
+class _PartCollector:
+    """Multipart parser callbacks; queue events so the async side can act on them."""
+
+    def __init__(self):
+        self.events = []
+        self._header_field = b""
+        self._header_value = b""
+        self._headers = {}
+
+    def callbacks(self):
+        return {
+            "on_part_begin": self.on_part_begin,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+        }
+
+    def on_part_begin(self):
+        self._headers = {}
+
+    def on_header_field(self, data, start, end):
+        self._header_field += data[start:end]
+
+    def on_header_value(self, data, start, end):
+        self._header_value += data[start:end]
+
+    def on_header_end(self):
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def on_headers_finished(self):
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        self.events.append((
+            "begin",
+            options.get(b"name", b"").decode("latin-1"),
+            options.get(b"filename", b"").decode("utf-8", "replace"),
+            self._headers.get(b"content-type", b"").decode("latin-1"),
+        ))
+
+    def on_part_data(self, data, start, end):
+        self.events.append(("data", bytes(data[start:end])))
+
+    def on_part_end(self):
+        self.events.append(("end",))
+
+
+async def receive_upload(
+    request: Request,
+    field_name="file",
+    directory=None,
+    max_size=MAX_UPLOAD_SIZE,
+    accept_content_type=None,
+    content_type_error="Unsupported file type",
+    before_store=None,
+):
+    """
+    Stream the `field_name` file of a multipart request into `directory`
+    (UPLOAD_DIR by default), named <sha256>.<extension>.
+
+    `accept_content_type` is an optional predicate on the part's declared
+    content type, checked before any bytes are written (failing it raises
+    with `content_type_error`). `before_store` is an optional coroutine
+    function called with the StoredUpload once its final path is known but
+    before the file is put there (or, for a duplicate, kept); if it raises,
+    nothing is stored. Returns the StoredUpload; raises HTTPException(400)
+    on invalid or oversized uploads, leaving nothing behind on disk.
+    """
+    directory = UPLOAD_DIR if directory is None else directory
+    content_type, options = parse_options_header(request.headers.get("content-type", ""))
+    boundary = options.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise HTTPException(status_code=400, detail="Expected a multipart/form-data upload")
+
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_size + MULTIPART_OVERHEAD:
+        raise _too_large(max_size)
+
+    collector = _PartCollector()
+    parser = MultipartParser(boundary, collector.callbacks())
+    tmp = None
+    upload = None
+    in_file_part = False
+    buffer = bytearray()
+    hasher = hashlib.sha256()
+
+    async def flush():
+        if buffer:
+            await run_in_threadpool(_write, tmp, hasher, bytes(buffer))
+            buffer.clear()
+
+    try:
+        async for chunk in request.stream():
+            try:
+                parser.write(chunk)
+            except FormParserError:
+                raise HTTPException(status_code=400, detail="Malformed multipart body")
+
+            events, collector.events = collector.events, []
+            for event in events:
+                kind = event[0]
+                if kind == "begin":
+                    _, name, filename, part_type = event
+                    in_file_part = name == field_name and upload is None
+                    if not in_file_part:
+                        continue
+                    if accept_content_type and not accept_content_type(part_type):
+                        raise HTTPException(status_code=400, detail=content_type_error)
+                    tmp = await run_in_threadpool(
+                        tempfile.NamedTemporaryFile, dir=directory, suffix=".part", delete=False
+                    )
+                    upload = StoredUpload(
+                        path=None,
+                        filename=filename,
+                        content_type=part_type,
+                        size=0,
+                    )
+                elif kind == "data" and in_file_part:
+                    upload.size += len(event[1])
+                    if upload.size > max_size:
+                        raise _too_large(max_size)
+                    buffer += event[1]
+                    if len(buffer) >= UPLOAD_CHUNK_SIZE:
+                        await flush()
+                elif kind == "end" and in_file_part:
+                    await flush()
+                    in_file_part = False
+
+        if upload is None:
+            raise HTTPException(status_code=400, detail=f"No '{field_name}' file in upload")
+        if in_file_part:
+            raise HTTPException(status_code=400, detail="Upload ended unexpectedly")
+
+        await run_in_threadpool(tmp.close)
+        upload.sha256 = hasher.hexdigest()
+        existing = await run_in_threadpool(_stored_file, directory, upload.sha256)
+        upload.path = existing or directory / f"{upload.sha256}.{_file_extension(upload.filename)}"
+        if before_store is not None:
+            await before_store(upload)
+        if await run_in_threadpool(upload.path.exists):
+            upload.duplicate = True
+            await run_in_threadpool(_discard, tmp)
+        else:
+            await run_in_threadpool(os.replace, tmp.name, upload.path)
+        return upload
+    except BaseException:
+        # Also runs on cancellation (client went away), so clean up without awaiting
+        if tmp is not None:
+            _discard(tmp)
+        raise
+
+
+def _discard(tmp):
+    tmp.close()
+    try:
+        os.unlink(tmp.name)
+    except FileNotFoundError:
+        pass
+
+
+class UploadFiles(StaticFiles):
+    """
+    StaticFiles for UPLOAD_DIR. Stored files never change (new content gets
+    a new name), so every file is served as immutable, and content-addressed
+    originals use their SHA-256 as a strong ETag. Range requests are answered
+    by FileResponse.
+    """
+
+    def file_response(self, full_path, stat_result, scope, status_code=200):
+        headers = {"Cache-Control": IMMUTABLE_CACHE_CONTROL}
+        match = _CONTENT_ADDRESSED_NAME.match(os.path.basename(full_path))
+        if match:
+            headers["ETag"] = f'"{match.group(1)}"'
+        response = FileResponse(full_path, status_code=status_code, stat_result=stat_result, headers=headers)
+        if self.is_not_modified(response.headers, Headers(scope=scope)):
+            return NotModifiedResponse(response.headers)
+        return response
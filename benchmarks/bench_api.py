@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Throughput and latency of the hot API endpoints.
+
+Seeds a synthetic dataset (see benchmarks/dataset.py), then drives each
+endpoint in turn with a fixed number of requests at a fixed concurrency and
+reports requests/sec and p50/p95/p99 latency. Request targets come from a
+seeded RNG, so two runs with the same arguments issue the same requests.
+Results are written as JSON (sorted keys, one object per endpoint) that can
+be diffed between commits, or compared directly with --compare.
+
+By default the app is driven in-process through httpx's ASGI transport
+(application + database cost, no network). Pass --base-url to load a
+running server instead. The seeded rows are removed afterwards. Runs on
+either backend (DB_BACKEND=sqlite SQLITE_PATH=... for SQLite).
+
+    python -m benchmarks.bench_api --requests 500 --concurrency 20
+    python -m benchmarks.bench_api --output after.json --compare before.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import platform
+import random
+import subprocess
+import time
+from datetime import datetime, timezone
+
+import httpx
+
+from app.utils.auth import create_access_token
+from benchmarks import dataset as bench_dataset
+
+
+# endpoint name -> fn(dataset, rng, tokens) returning (method, url, request kwargs)
+def _list_restaurants(ds, rng, tokens):
+    return "GET", "/api/restaurants/?limit=20", {}
+
+
+def _get_restaurant(ds, rng, tokens):
+    return "GET", f"/api/restaurants/{rng.choice(ds.restaurant_ids)}", {}
+
+
+def _menu(ds, rng, tokens):
+    return "GET", f"/api/menu/{rng.choice(ds.restaurant_ids)}", {}
+
+
+def _customer_orders(ds, rng, tokens):
+    return "GET", f"/api/orders/customer/{rng.choice(ds.user_ids)}?limit=20", {}
+
+
+def _restaurant_orders(ds, rng, tokens):
+    return "GET", f"/api/orders/restaurant/{rng.choice(ds.restaurant_ids)}?limit=20", {}
+
+
+def _get_order(ds, rng, tokens):
+    return "GET", f"/api/orders/{rng.choice(ds.order_ids)}", {}
+
+
+def _create_order(ds, rng, tokens):
+    restaurant_id = rng.choice(ds.restaurant_ids)
+    cart = rng.sample(ds.menu_items[restaurant_id], min(3, len(ds.menu_items[restaurant_id])))
+    items = [{"menu_item_id": menu_id, "quantity": 1, "price": price} for menu_id, price in cart]
+    return "POST", "/api/orders/", {"json": {
+        "customer_id": rng.choice(ds.user_ids),
+        "restaurant_id": restaurant_id,
+        "total_price": round(sum(price for _, price in cart), 2),
+        "items": items,
+    }}
+
+
+def _search(ds, rng, tokens):
+    return "GET", "/api/search", {"params": {"q": rng.choice(("bench dish", "restaurant", "dsh")), "limit": 20}}
+
+
+def _login(ds, rng, tokens):
+    return "POST", "/api/users/login", {"data": {
+        "username": rng.choice(ds.user_emails), "password": bench_dataset.BENCH_PASSWORD,
+    }}
+
+
+def _profile(ds, rng, tokens):
+    return "GET", "/api/users/me", {"headers": {"Authorization": f"Bearer {rng.choice(tokens)}"}}
+
+
+ENDPOINTS = {
+    "list_restaurants": _list_restaurants,
+    "get_restaurant": _get_restaurant,
+    "menu": _menu,
+    "customer_orders": _customer_orders,
+    "restaurant_orders": _restaurant_orders,
+    "get_order": _get_order,
+    "create_order": _create_order,
+    "search": _search,
+    "login": _login,
+    "profile": _profile,
+}
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(0, math.ceil(p / 100 * len(sorted_values)) - 1)]
+
+
+async def drive(client, specs, concurrency):
+    """Issue the requests with `concurrency` workers; returns (latencies ms, errors, wall seconds)."""
+    latencies = []
+    errors = 0
+    pending = iter(specs)
+
+    async def worker():
+        nonlocal errors
+        for method, url, kwargs in pending:
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, url, **kwargs)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            latencies.append((time.perf_counter() - start) * 1000)
+            errors += failed
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - start
+
+
+async def run_benchmark(endpoints, ds, args):
+    rng = random.Random(args.seed)
+    tokens = [create_access_token({"sub": email}) for email in ds.user_emails[:100]]
+    results = {}
+
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=60)
+        lifespan = None
+    else:
+        from app.main import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60)
+        lifespan = app.router.lifespan_context(app)
+        await lifespan.__aenter__()
+
+    try:
+        async with client:
+            for name in endpoints:
+                make = ENDPOINTS[name]
+                specs = [make(ds, rng, tokens) for _ in range(args.warmup + args.requests)]
+                await drive(client, specs[:args.warmup], args.concurrency)
+                latencies, errors, wall = await drive(client, specs[args.warmup:], args.concurrency)
+                latencies.sort()
+                results[name] = {
+                    "requests": len(latencies),
+                    "errors": errors,
+                    "rps": round(len(latencies) / wall, 1),
+                    "p50_ms": round(percentile(latencies, 50), 2),
+                    "p95_ms": round(percentile(latencies, 95), 2),
+                    "p99_ms": round(percentile(latencies, 99), 2),
+                    "mean_ms": round(sum(latencies) / len(latencies), 2),
+                }
+                r = results[name]
+                print(f"{name:<18}{r['rps']:>9.1f}{r['p50_ms']:>9.2f}{r['p95_ms']:>9.2f}{r['p99_ms']:>9.2f}{errors:>8}")
+    finally:
+        if lifespan is not None:
+            await lifespan.__aexit__(None, None, None)
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline, current):
+    print(f"\n{'endpoint':<18}{'rps':>16}{'p50 ms':>18}{'p99 ms':>18}")
+    for name, now in current["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            continue
+        cells = []
+        for key in ("rps", "p50_ms", "p99_ms"):
+            change = (now[key] - before[key]) / before[key] * 100 if before[key] else 0.0
+            cells.append(f"{now[key]:>9.1f} ({change:+5.1f}%)")
+        print(f"{name:<18}" + "".join(f"{cell:>18}" for cell in cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS), help="comma-separated subset of: " + ", ".join(ENDPOINTS))
+    parser.add_argument("--requests", type=int, default=500, help="measured requests per endpoint")
+    parser.add_argument("--warmup", type=int, default=50, help="unmeasured requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42, help="seed for the dataset and request targets")
+    parser.add_argument("--restaurants", type=int, default=100)
+    parser.add_argument("--menu-items", type=int, default=20, help="menu items per restaurant")
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--orders", type=int, default=2000)
+    parser.add_argument("--base-url", help="benchmark a running server instead of the in-process app")
+    parser.add_argument("--output", default="bench-results.json", help="JSON results file")
+    parser.add_argument("--compare", metavar="BASELINE", help="results file to compare against")
+    args = parser.parse_args()
+
+    endpoints = [name.strip() for name in args.endpoints.split(",") if name.strip()]
+    unknown = set(endpoints) - set(ENDPOINTS)
+    if unknown:
+        parser.error(f"unknown endpoints: {', '.join(sorted(unknown))}")
+
+    print(f"Seeding {args.restaurants} restaurants, {args.users} users, {args.orders} orders...")
+    ds = bench_dataset.seed(
+        restaurants=args.restaurants, menu_items=args.menu_items, users=args.users,
+        orders=args.orders, seed=args.seed,
+    )
+    try:
+        print(f"{'endpoint':<18}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}")
+        results = asyncio.run(run_benchmark(endpoints, ds, args))
+    finally:
+        bench_dataset.cleanup(ds)
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "target": args.base_url or "in-process",
+            "config": {
+                key: getattr(args, key)
+                for key in ("requests", "warmup", "concurrency", "seed", "restaurants", "menu_items", "users", "orders")
+            },
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+        f.write("\n")
+    print(f"\nWrote {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
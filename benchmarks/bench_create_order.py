@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Latency of models.orders.create_order for 1, 10 and 100-line carts.
+
+Compares the single-statement insert against the previous approach (one
+INSERT per cart line plus two read-back queries). Runs against the database
+configured through the usual DB_* environment variables and removes the
+rows it creates.
+
+    python -m benchmarks.bench_create_order --runs 200
+"""
+import argparse
+import statistics
+import time
+import uuid
+
+from app.database import db_connection
+from app.models import orders
+
+CART_SIZES = (1, 10, 100)
+
+
+def create_order_per_line(customer_id, restaurant_id, total_price, items, payment_status='Unpaid'):
+    """The pre-batching implementation: 2 + len(items) + 1 round trips."""
+    with db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            "INSERT INTO orders (customer_id, restaurant_id, total_price, payment_status) "
+            "VALUES (%s, %s, %s, %s) RETURNING id;",
+            (customer_id, restaurant_id, total_price, payment_status),
+        )
+        order_id = cur.fetchone()['id']
+        for item in items:
+            cur.execute(
+                "INSERT INTO order_items (order_id, menu_item_id, quantity, price) VALUES (%s, %s, %s, %s);",
+                (order_id, item['menu_item_id'], item['quantity'], item['price']),
+            )
+        full_order = orders.get_order_by_id(cur, order_id)
+        conn.commit()
+        cur.close()
+    return full_order
+
+
+def seed(menu_size):
+    tag = uuid.uuid4().hex[:8]
+    with db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            "INSERT INTO users (name, email, password, role) VALUES (%s, %s, %s, 'customer') RETURNING id;",
+            (f"Bench {tag}", f"bench-{tag}@example.com", "x"),
+        )
+        customer_id = cur.fetchone()['id']
+        cur.execute("INSERT INTO restaurants (name) VALUES (%s) RETURNING id;", (f"Bench {tag}",))
+        restaurant_id = cur.fetchone()['id']
+        cur.execute(
+            "INSERT INTO menu_items (restaurant_id, name, price) "
+            "SELECT %s, 'Bench item ' || n, 9.99 FROM generate_series(1, %s) AS n RETURNING id;",
+            (restaurant_id, menu_size),
+        )
+        menu_item_ids = [row['id'] for row in cur.fetchall()]
+        conn.commit()
+        cur.close()
+    return customer_id, restaurant_id, menu_item_ids
+
+
+def cleanup(customer_id, restaurant_id):
+    with db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute("DELETE FROM restaurants WHERE id = %s;", (restaurant_id,))
+        cur.execute("DELETE FROM users WHERE id = %s;", (customer_id,))
+        conn.commit()
+        cur.close()
+
+
+def measure(create, runs, customer_id, restaurant_id, items):
+    total = sum(item['price'] * item['quantity'] for item in items)
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        order = create(customer_id, restaurant_id, total, items)
+        timings.append((time.perf_counter() - start) * 1000)
+        assert order and len(order['items']) == len(items)
+    timings.sort()
+    return {
+        "p50": statistics.median(timings),
+        "p95": timings[int(len(timings) * 0.95) - 1],
+        "mean": statistics.fmean(timings),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=100, help="orders created per cart size and implementation")
+    args = parser.parse_args()
+
+    customer_id, restaurant_id, menu_item_ids = seed(max(CART_SIZES))
+    try:
+        print(f"{'lines':>5}  {'implementation':<16}{'p50 ms':>9}{'p95 ms':>9}{'mean ms':>9}")
+        for size in CART_SIZES:
+            items = [{"menu_item_id": i, "quantity": 1, "price": 9.99} for i in menu_item_ids[:size]]
+            for name, create in (("per-line", create_order_per_line), ("single-statement", orders.create_order)):
+                stats = measure(create, args.runs, customer_id, restaurant_id, items)
+                print(f"{size:>5}  {name:<16}{stats['p50']:>9.2f}{stats['p95']:>9.2f}{stats['mean']:>9.2f}")
+    finally:
+        cleanup(customer_id, restaurant_id)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Planning overhead and latency of the hot model queries, sent as text versus
+executed as server-side prepared statements.
+
+For each query registered with app.database.prepared_statement that the
+models run on every request (menu pages, order by id, order items, user by
+email) it reports:
+
+- the planning time Postgres reports in EXPLAIN ANALYZE, once with the query
+  text and once for EXECUTE of the prepared statement (after warm-up, so a
+  generic plan is cached where Postgres chooses one), and
+- end-to-end latency of --runs calls from this process, one connection each
+  way, cycling through the seeded rows.
+
+Runs against the Postgres database configured through the usual DB_*
+environment variables and removes the rows it creates.
+
+    python -m benchmarks.bench_prepared --runs 2000
+"""
+import argparse
+import itertools
+import statistics
+import time
+
+from app import database
+from app.database import execute_prepared, get_db
+from app.models import menu_item, orders, users
+from benchmarks.dataset import cleanup, seed
+
+PAGE_SIZE = 20
+WARMUP_RUNS = 10  # Postgres considers a generic plan after five custom ones
+
+
+def workloads(cur, dataset):
+    """(statement, endless iterator of params) for each hot query"""
+    cur.execute(
+        "SELECT restaurant_id, created_at, id FROM menu_items WHERE restaurant_id = ANY(%s) "
+        "ORDER BY restaurant_id, created_at, id;",
+        (dataset.restaurant_ids,),
+    )
+    positions = [(row["restaurant_id"], row["created_at"], row["id"]) for row in cur.fetchall()]
+    return [
+        (menu_item.GET_MENU_ITEMS_FIRST_PAGE, itertools.cycle(
+            [(restaurant_id, PAGE_SIZE) for restaurant_id in dataset.restaurant_ids])),
+        (menu_item.GET_MENU_ITEMS_NEXT_PAGE, itertools.cycle(
+            [(restaurant_id, created_at, row_id, PAGE_SIZE) for restaurant_id, created_at, row_id in positions])),
+        (orders.GET_ORDER, itertools.cycle([(order_id,) for order_id in dataset.order_ids])),
+        (orders.GET_ORDER_ITEMS, itertools.cycle([(order_id,) for order_id in dataset.order_ids])),
+        (users.GET_USER_BY_EMAIL, itertools.cycle([(email,) for email in dataset.user_emails])),
+    ]
+
+
+def run_text(cur, statement, params):
+    cur.execute(statement.query, params)
+    return cur.fetchall()
+
+
+def run_prepared(cur, statement, params):
+    execute_prepared(cur, statement, params)
+    return cur.fetchall()
+
+
+def planning_ms(cur, statement, params, prepared):
+    if prepared:
+        cur.execute("EXPLAIN (ANALYZE, FORMAT JSON) " + statement.execute_sql, params)
+    else:
+        cur.execute("EXPLAIN (ANALYZE, FORMAT JSON) " + statement.query, params)
+    return cur.fetchone()["QUERY PLAN"][0]["Planning Time"]
+
+
+def measure(cur, run, statement, params, runs):
+    for _ in range(WARMUP_RUNS):
+        run(cur, statement, next(params))
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        run(cur, statement, next(params))
+        timings.append((time.perf_counter() - start) * 1000)
+    cur.connection.rollback()
+    timings.sort()
+    return {
+        "p50": statistics.median(timings),
+        "p95": timings[int(len(timings) * 0.95) - 1],
+        "mean": statistics.fmean(timings),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=1000, help="calls per query and mode")
+    parser.add_argument("--explain-runs", type=int, default=50, help="EXPLAIN ANALYZE samples per query and mode")
+    args = parser.parse_args()
+    # Measure prepared statements even if they are turned off for the app
+    database.DB_PREPARED_STATEMENTS = True
+
+    dataset = seed(restaurants=50, menu_items=100, users=500, orders=2000)
+    text_conn, prepared_conn = get_db(), get_db()
+    try:
+        text_cur, prepared_cur = text_conn.cursor(), prepared_conn.cursor()
+        print(f"{'query':<28}{'mode':<10}{'plan ms':>9}{'p50 ms':>9}{'p95 ms':>9}{'mean ms':>9}")
+        for statement, params in workloads(text_cur, dataset):
+            for mode, cur, run in (("text", text_cur, run_text), ("prepared", prepared_cur, run_prepared)):
+                stats = measure(cur, run, statement, params, args.runs)
+                planning = statistics.median(
+                    planning_ms(cur, statement, next(params), mode == "prepared") for _ in range(args.explain_runs)
+                )
+                cur.connection.rollback()
+                print(f"{statement.name:<28}{mode:<10}{planning:>9.3f}"
+                      f"{stats['p50']:>9.3f}{stats['p95']:>9.3f}{stats['mean']:>9.3f}")
+    finally:
+        text_conn.close()
+        prepared_conn.close()
+        cleanup(dataset)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Latency of models.search.search against a large catalogue.
+
+Seeds --restaurants restaurants with --menu-items menu items each (the
+defaults make a million items) whose names are drawn from a small dish
+vocabulary, so common words match hundreds of thousands of rows, then times
+a fixed set of searches: rare and common words, several words, a partial
+word and, on Postgres, a misspelling. Runs against the database configured
+through the usual DB_* / DB_BACKEND environment variables (migrated to
+0003_search) and removes the rows it creates.
+
+    python -m benchmarks.bench_search --restaurants 2000 --menu-items 500 --runs 50
+"""
+import argparse
+import random
+import statistics
+import time
+import uuid
+
+from app.database import IS_SQLITE, db_connection
+from app.models import search
+from benchmarks.dataset import CATEGORIES, _insert_rows
+
+STYLES = ("Masala", "Paneer", "Butter", "Tandoori", "Chilli", "Garlic", "Mysore", "Hyderabadi", "Kerala", "Malai")
+DISHES = ("Dosa", "Biryani", "Naan", "Tikka", "Korma", "Idli", "Vada", "Pulao", "Kebab", "Halwa", "Lassi", "Uttapam")
+
+QUERIES = {
+    "common word": "masala",
+    "two words": "paneer tikka",
+    "rare word": "uttapam 17",
+    "partial word": "hyderab",
+    "restaurant": "restaurant 42",
+}
+if not IS_SQLITE:
+    QUERIES["misspelt"] = "biriyani"
+
+
+def seed(restaurants, menu_items, rng):
+    tag = uuid.uuid4().hex[:8]
+    with db_connection() as conn:
+        cur = conn.cursor()
+        restaurant_ids = _insert_rows(
+            cur, "restaurants", ("name", "description", "address"),
+            [(f"Bench {tag} Restaurant {n}", "Benchmark restaurant", f"{n} Bench Street") for n in range(restaurants)],
+        )
+        for restaurant_id in restaurant_ids:
+            _insert_rows(cur, "menu_items", ("restaurant_id", "name", "price", "category"), [
+                (restaurant_id, f"{rng.choice(STYLES)} {rng.choice(DISHES)} {n}", 9.5, rng.choice(CATEGORIES))
+                for n in range(menu_items)
+            ])
+        conn.commit()
+        if not IS_SQLITE:
+            cur.execute("ANALYZE restaurants; ANALYZE menu_items;")
+            conn.commit()
+        cur.close()
+    return tag
+
+
+def cleanup(tag):
+    with db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute("DELETE FROM restaurants WHERE name LIKE %s;", (f"Bench {tag} %",))
+        conn.commit()
+        cur.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--restaurants", type=int, default=2000)
+    parser.add_argument("--menu-items", type=int, default=500, help="menu items per restaurant")
+    parser.add_argument("--runs", type=int, default=50, help="measured searches per query")
+    parser.add_argument("--limit", type=int, default=search.DEFAULT_SEARCH_LIMIT)
+    args = parser.parse_args()
+
+    total = args.restaurants * args.menu_items
+    print(f"Seeding {args.restaurants} restaurants with {total} menu items...")
+    start = time.perf_counter()
+    tag = seed(args.restaurants, args.menu_items, random.Random(42))
+    print(f"Seeded in {time.perf_counter() - start:.1f}s")
+    try:
+        print(f"{'query':<16}{'results':>8}{'p50 ms':>9}{'p95 ms':>9}{'max ms':>9}")
+        for name, text in QUERIES.items():
+            rows = search.search(text, limit=args.limit)  # warm-up
+            timings = []
+            for _ in range(args.runs):
+                start = time.perf_counter()
+                search.search(text, limit=args.limit)
+                timings.append((time.perf_counter() - start) * 1000)
+            timings.sort()
+            p95 = timings[max(0, int(len(timings) * 0.95) - 1)]
+            print(f"{name:<16}{len(rows):>8}{statistics.median(timings):>9.2f}{p95:>9.2f}{timings[-1]:>9.2f}")
+    finally:
+        cleanup(tag)
+
+
+if __name__ == "__main__":
+    main()
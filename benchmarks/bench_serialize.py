@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+CPU cost of rendering order lists, per 1,000 orders.
+
+Compares the previous route code (per-row Decimal -> float loops, one
+OrderResponse / OrderSummary model per order, then FastAPI's own response
+validation and encoding) against the current routes, which render the DB
+rows with app.utils.serialization.JSONRenderer (a compiled projection plus
+orjson, or one pydantic TypeAdapter pass when orjson is not installed).
+Both are served through the full ASGI stack; the model functions are
+replaced by synthetic rows shaped like the database's (float prices, as
+NUMERIC_AS_FLOAT loads them, and datetime timestamps), so no database is
+needed.
+
+    python -m benchmarks.bench_serialize --orders 1000 --items 3 --runs 20
+"""
+import argparse
+import statistics
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+from fastapi import APIRouter, Depends, FastAPI, Response
+from fastapi.testclient import TestClient
+
+from app.database_async import run_query
+from app.models import orders
+from app.routes import orders as order_routes
+from app.schemas.order import OrderResponse, OrderSummary
+from app.utils import serialization
+from app.utils.pagination import MAX_PAGE_SIZE, PageParams
+
+legacy = APIRouter()
+
+
+# The previous route implementations
+@legacy.get("/customer/{customer_id}", response_model=List[OrderSummary])
+async def legacy_customer_orders(customer_id: int, response: Response, page: PageParams = Depends()):
+    customer_orders = await run_query(
+        orders.get_orders_by_customer, customer_id, limit=page.fetch_size, after=page.after
+    )
+    customer_orders = page.paginate(customer_orders, response)
+    response_orders = []
+    for order in customer_orders:
+        order_summary = {
+            'id': order['id'],
+            'customer_id': order['customer_id'],
+            'restaurant_id': order['restaurant_id'],
+            'total_price': float(order['total_price']),
+            'status': order['status'],
+            'payment_status': order['payment_status'],
+            'created_at': order['created_at'],
+            'restaurant_name': order['restaurant_name'],
+            'items': [
+                {
+                    'id': item['id'],
+                    'menu_item_id': item['menu_item_id'],
+                    'name': item['name'],
+                    'price': float(item['price']),
+                    'quantity': item['quantity']
+                }
+                for item in order.get('items', [])
+            ]
+        }
+        response_orders.append(OrderSummary(**order_summary))
+    return response_orders
+
+
+@legacy.get("/restaurant/{restaurant_id}", response_model=List[OrderResponse])
+async def legacy_restaurant_orders(restaurant_id: int, response: Response, page: PageParams = Depends()):
+    restaurant_orders = await run_query(
+        orders.get_orders_by_restaurant, restaurant_id, limit=page.fetch_size, after=page.after
+    )
+    restaurant_orders = page.paginate(restaurant_orders, response)
+    response_orders = []
+    for order in restaurant_orders:
+        order['total_price'] = float(order['total_price'])
+        for item in order.get('items', []):
+            item['price'] = float(item['price'])
+        response_orders.append(OrderResponse(**order))
+    return response_orders
+
+
+def synthetic_orders(count, items_per_order):
+    start = datetime(2024, 1, 1)
+    return [
+        {
+            "id": order_id, "customer_id": 1, "restaurant_id": 1,
+            "total_price": 24.75, "status": "placed", "payment_status": "Unpaid",
+            "created_at": start - timedelta(minutes=order_id), "restaurant_name": "Bench Restaurant",
+            "items": [
+                {"id": order_id * 10 + n, "menu_item_id": n, "name": f"Bench dish {n}",
+                 "quantity": 2, "price": 8.25}
+                for n in range(items_per_order)
+            ],
+        }
+        for order_id in range(1, count + 1)
+    ]
+
+
+def measure(client, url, runs, page_size):
+    """CPU and wall ms per request, after one warm-up request."""
+    client.get(url).raise_for_status()
+    cpu, wall = [], []
+    for _ in range(runs):
+        cpu_start, wall_start = time.process_time(), time.perf_counter()
+        response = client.get(url)
+        cpu.append((time.process_time() - cpu_start) * 1000)
+        wall.append((time.perf_counter() - wall_start) * 1000)
+        assert response.status_code == 200 and len(response.json()) == page_size
+    return statistics.median(cpu), statistics.median(wall)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, default=1000, help="orders rendered (in pages of up to MAX_PAGE_SIZE)")
+    parser.add_argument("--items", type=int, default=3, help="line items per order")
+    parser.add_argument("--runs", type=int, default=20, help="measured requests per endpoint and implementation")
+    args = parser.parse_args()
+
+    # Pages are capped at MAX_PAGE_SIZE, so larger totals are rendered in several requests
+    page_size = min(args.orders, MAX_PAGE_SIZE)
+    pages = -(-args.orders // page_size)
+    rows = synthetic_orders(page_size + 1, args.items)
+
+    def fresh_copies():
+        # The legacy routes mutate the rows, so every request gets its own copy, made up front
+        # to keep copying out of the measurement
+        for _ in range(args.runs + 1):
+            yield [{**row, "items": [dict(item) for item in row["items"]]} for row in rows]
+
+    copies = {}
+
+    def fake_query(key, *_, limit, after=None):
+        return next(copies[key])[:limit]
+
+    orders.get_orders_by_customer = lambda *a, **kw: fake_query("customer", *a, **kw)
+    orders.get_orders_by_restaurant = lambda *a, **kw: fake_query("restaurant", *a, **kw)
+
+    app = FastAPI()
+    app.include_router(order_routes.router, prefix="/current")
+    app.include_router(legacy, prefix="/legacy")
+
+    encoder = "orjson" if serialization.orjson else "pydantic TypeAdapter"
+    print(f"{args.orders} orders x {args.items} items, {pages} request(s) of {page_size}, encoder: {encoder}")
+    print(f"{'endpoint':<12}{'implementation':<16}{'CPU ms/1k':>11}{'wall ms/1k':>12}")
+    with TestClient(app) as client:
+        for endpoint, path in (("customer", "/customer/1"), ("restaurant", "/restaurant/1")):
+            for name in ("legacy", "current"):
+                copies[endpoint] = fresh_copies()
+                cpu, wall = measure(client, f"/{name}{path}?limit={page_size}", args.runs, page_size)
+                scale = 1000 / page_size
+                print(f"{endpoint:<12}{name:<16}{cpu * scale:>11.2f}{wall * scale:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Peak RSS of the image upload endpoint under concurrent 10MB uploads.
+
+Compares the streaming upload (app.utils.uploads.receive_upload) against the
+previous handler, which read the whole file into memory before writing it.
+Each implementation runs in its own subprocess, since peak RSS only ever
+grows, and is driven in-process through httpx's ASGI transport. Uploads are
+written to a temporary directory. No database is needed.
+
+    python -m benchmarks.bench_upload --concurrency 50 --size-mb 10
+"""
+import argparse
+import asyncio
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+import httpx
+from fastapi import FastAPI, File, HTTPException, Request, UploadFile
+
+from app.utils import uploads
+
+BOUNDARY = "benchboundary"
+CHUNK_SIZE = 64 * 1024
+
+
+def buffered_app(directory):
+    """The pre-streaming handler: whole file in memory, written on the event loop."""
+    app = FastAPI()
+
+    @app.post("/upload-image")
+    async def upload_image(file: UploadFile = File(...)):
+        if not file.content_type.startswith("image/"):
+            raise HTTPException(status_code=400, detail="File must be an image")
+        content = await file.read()
+        if len(content) > 10 * 1024 * 1024:
+            raise HTTPException(status_code=400, detail="File size too large. Maximum 10MB allowed")
+        path = directory / f"{uuid.uuid4()}.png"
+        with open(path, "wb") as buffer:
+            buffer.write(content)
+        return {"image_url": f"/uploads/{path.name}"}
+
+    return app
+
+
+def streaming_app(directory):
+    app = FastAPI()
+
+    @app.post("/upload-image")
+    async def upload_image(request: Request):
+        upload = await uploads.receive_upload(
+            request,
+            directory=directory,
+            accept_content_type=lambda content_type: content_type.startswith("image/"),
+        )
+        return {"image_url": f"/uploads/{upload.path.name}"}
+
+    return app
+
+
+async def multipart_body(payload):
+    """Stream one multipart body; every upload shares the same payload bytes."""
+    yield (
+        f"--{BOUNDARY}\r\n"
+        'Content-Disposition: form-data; name="file"; filename="bench.png"\r\n'
+        "Content-Type: image/png\r\n\r\n"
+    ).encode()
+    view = memoryview(payload)
+    for start in range(0, len(payload), CHUNK_SIZE):
+        yield bytes(view[start:start + CHUNK_SIZE])
+        await asyncio.sleep(0)
+    yield f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+async def run(impl, concurrency, size):
+    payload = b"\x89PNG" + b"\0" * (size - 4)
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        app = streaming_app(directory) if impl == "streaming" else buffered_app(directory)
+        headers = {"Content-Type": f"multipart/form-data; boundary={BOUNDARY}"}
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            start = time.perf_counter()
+            responses = await asyncio.gather(*(
+                client.post("/upload-image", content=multipart_body(payload), headers=headers)
+                for _ in range(concurrency)
+            ))
+            elapsed = time.perf_counter() - start
+        assert all(r.status_code == 200 for r in responses), [r.text for r in responses if r.status_code != 200]
+        assert len(list(directory.iterdir())) == concurrency
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"{impl:<10}{peak_kb / 1024:>12.1f}{(peak_kb - baseline_kb) / 1024:>12.1f}{elapsed:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--size-mb", type=float, default=10)
+    parser.add_argument("--impl", choices=("streaming", "buffered"), help="run one implementation in this process")
+    args = parser.parse_args()
+    size = int(args.size_mb * 1024 * 1024) - 1024  # stay just under the limit
+
+    if args.impl:
+        asyncio.run(run(args.impl, args.concurrency, size))
+        return
+
+    print(f"{args.concurrency} concurrent uploads of {args.size_mb}MB")
+    print(f"{'impl':<10}{'peak MB':>12}{'growth MB':>12}{'secs':>10}")
+    for impl in ("buffered", "streaming"):
+        subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_upload", "--impl", impl,
+             "--concurrency", str(args.concurrency), "--size-mb", str(args.size_mb)],
+            check=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Synthetic dataset for the benchmarks.
+
+seed() inserts restaurants, menus, users and orders through the app's own
+connection pool, in multi-row INSERTs, using a seeded RNG so the same
+arguments always produce the same data. Every row is tagged with a run id so
+cleanup() removes exactly what was inserted (menus and orders cascade from
+their restaurant).
+"""
+import random
+import uuid
+from dataclasses import dataclass, field
+
+from app.database import db_connection
+from app.utils.hashing import hash_password
+
+BENCH_PASSWORD = "bench-password"
+CATEGORIES = ("Starter", "Main Course", "Dessert", "Beverage", None)
+INSERT_BATCH_SIZE = 500
+
+
+@dataclass
+class Dataset:
+    tag: str
+    restaurant_ids: list = field(default_factory=list)
+    # restaurant_id -> [(menu_item_id, price)]
+    menu_items: dict = field(default_factory=dict)
+    user_ids: list = field(default_factory=list)
+    user_emails: list = field(default_factory=list)
+    order_ids: list = field(default_factory=list)
+
+
+def _insert_rows(cur, table, columns, rows):
+    """Insert rows in multi-row batches; returns the new ids in row order."""
+    ids = []
+    placeholders = "(" + ", ".join(["%s"] * len(columns)) + ")"
+    for start in range(0, len(rows), INSERT_BATCH_SIZE):
+        batch = rows[start:start + INSERT_BATCH_SIZE]
+        cur.execute(
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES "
+            + ", ".join([placeholders] * len(batch))
+            + " RETURNING id;",
+            [value for row in batch for value in row],
+        )
+        ids.extend(row["id"] for row in cur.fetchall())
+    return ids
+
+
+def seed(restaurants=100, menu_items=20, users=500, orders=2000, items_per_order=3, seed=42):
+    rng = random.Random(seed)
+    dataset = Dataset(tag=uuid.uuid4().hex[:8])
+    # bcrypt is slow on purpose; every bench user shares one hash
+    password_hash = hash_password(BENCH_PASSWORD)
+
+    with db_connection() as conn:
+        cur = conn.cursor()
+        dataset.restaurant_ids = _insert_rows(
+            cur, "restaurants", ("name", "description", "address", "phone"),
+            [(f"Bench {dataset.tag} Restaurant {n}", "Benchmark restaurant", f"{n} Bench Street", "555-0000")
+             for n in range(restaurants)],
+        )
+
+        menu_rows = [
+            (restaurant_id, f"Bench dish {n}", round(rng.uniform(2, 30), 2), rng.choice(CATEGORIES))
+            for restaurant_id in dataset.restaurant_ids
+            for n in range(menu_items)
+        ]
+        menu_ids = _insert_rows(cur, "menu_items", ("restaurant_id", "name", "price", "category"), menu_rows)
+        for menu_id, (restaurant_id, _, price, _) in zip(menu_ids, menu_rows):
+            dataset.menu_items.setdefault(restaurant_id, []).append((menu_id, price))
+
+        dataset.user_emails = [f"bench-{dataset.tag}-{n}@example.com" for n in range(users)]
+        dataset.user_ids = _insert_rows(
+            cur, "users", ("name", "email", "password", "role"),
+            [(f"Bench user {n}", email, password_hash, "customer") for n, email in enumerate(dataset.user_emails)],
+        )
+
+        carts = []
+        for _ in range(orders):
+            restaurant_id = rng.choice(dataset.restaurant_ids)
+            cart = rng.sample(dataset.menu_items[restaurant_id], min(items_per_order, menu_items))
+            quantities = [rng.randint(1, 3) for _ in cart]
+            total = round(sum(price * q for (_, price), q in zip(cart, quantities)), 2)
+            carts.append((rng.choice(dataset.user_ids), restaurant_id, total, cart, quantities))
+        dataset.order_ids = _insert_rows(
+            cur, "orders", ("customer_id", "restaurant_id", "total_price"),
+            [(customer_id, restaurant_id, total) for customer_id, restaurant_id, total, _, _ in carts],
+        )
+        _insert_rows(
+            cur, "order_items", ("order_id", "menu_item_id", "quantity", "price"),
+            [
+                (order_id, menu_id, quantity, price)
+                for order_id, (_, _, _, cart, quantities) in zip(dataset.order_ids, carts)
+                for (menu_id, price), quantity in zip(cart, quantities)
+            ],
+        )
+        conn.commit()
+        cur.close()
+    return dataset
+
+
+def cleanup(dataset):
+    with db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute("DELETE FROM restaurants WHERE name LIKE %s;", (f"Bench {dataset.tag} %",))
+        cur.execute("DELETE FROM users WHERE email LIKE %s;", (f"bench-{dataset.tag}-%",))
+        conn.commit()
+        cur.close()
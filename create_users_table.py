@@ -1,23 +1,15 @@
 #!/usr/bin/env python3
-from app.database import get_db
+# The users table (and the rest of the schema) is now created by the versioned
+# migrations in migrations/; this script is kept as a shortcut for
+# `python -m app.migrate`.
+from app.migrate import run_migrations
 
 def create_users_table():
-    query = """
-    CREATE TABLE IF NOT EXISTS users (
-        id SERIAL PRIMARY KEY,
-        name VARCHAR(100) NOT NULL,
-        email VARCHAR(100) UNIQUE NOT NULL,
-        password VARCHAR(255) NOT NULL,
-        created_at TIMESTAMP DEFAULT NOW()
-    );
-    """
-    conn = get_db()
-    cur = conn.cursor()
-    cur.execute(query)
-    conn.commit()
-    cur.close()
-    conn.close()
-    print("Users table created successfully!")
+    applied = run_migrations()
+    if applied:
+        print(f"Applied migrations: {', '.join(str(version) for version in applied)}")
+    else:
+        print("Database schema is up to date")
 
 if __name__ == "__main__":
     create_users_table()
@@ -1,25 +1,30 @@
+-- Base schema, as used by app/models.
+-- Written to be safe on databases created by the old ad-hoc create_*_table
+-- helpers: tables are only created when missing and later columns are added.
+
 -- Users Table
 CREATE TABLE IF NOT EXISTS users (
     id SERIAL PRIMARY KEY,
     name VARCHAR(100) NOT NULL,
     email VARCHAR(150) UNIQUE NOT NULL,
-    password_hash TEXT NOT NULL,
-    role VARCHAR(20) CHECK (role IN ('customer', 'restaurant_owner', 'admin')) NOT NULL,
+    password VARCHAR(255) NOT NULL,
+    role VARCHAR(20) CHECK (role IN ('customer', 'restaurant_owner', 'admin')) NOT NULL DEFAULT 'customer',
     created_at TIMESTAMP DEFAULT NOW()
 );
+ALTER TABLE users ADD COLUMN IF NOT EXISTS role VARCHAR(20) NOT NULL DEFAULT 'customer';
 
 -- Restaurants Table
 CREATE TABLE IF NOT EXISTS restaurants (
     id SERIAL PRIMARY KEY,
-    owner_id INT REFERENCES users(id) ON DELETE CASCADE,
     name VARCHAR(200) NOT NULL,
-    cuisine VARCHAR(100),
-    image TEXT,
-    location VARCHAR(200),
-    rating NUMERIC(2,1) DEFAULT 0.0,
-    is_approved BOOLEAN DEFAULT FALSE,
+    description TEXT,
+    address VARCHAR(300),
+    phone VARCHAR(20),
     created_at TIMESTAMP DEFAULT NOW()
 );
+ALTER TABLE restaurants ADD COLUMN IF NOT EXISTS description TEXT;
+ALTER TABLE restaurants ADD COLUMN IF NOT EXISTS address VARCHAR(300);
+ALTER TABLE restaurants ADD COLUMN IF NOT EXISTS phone VARCHAR(20);
 
 -- Menu Items Table
 CREATE TABLE IF NOT EXISTS menu_items (
@@ -39,14 +44,16 @@ CREATE TABLE IF NOT EXISTS orders (
     restaurant_id INT REFERENCES restaurants(id) ON DELETE CASCADE,
     total_price NUMERIC(10,2) NOT NULL,
     status VARCHAR(20) CHECK (status IN ('placed', 'delivered')) DEFAULT 'placed',
+    payment_status VARCHAR(10) DEFAULT 'Unpaid',
     created_at TIMESTAMP DEFAULT NOW()
 );
+ALTER TABLE orders ADD COLUMN IF NOT EXISTS payment_status VARCHAR(10) DEFAULT 'Unpaid';
 
 -- Order Items Table
 CREATE TABLE IF NOT EXISTS order_items (
     id SERIAL PRIMARY KEY,
     order_id INT REFERENCES orders(id) ON DELETE CASCADE,
-    menu_item_id INT REFERENCES menu_items(id),
+    menu_item_id INT REFERENCES menu_items(id) ON DELETE CASCADE,
     quantity INT NOT NULL CHECK (quantity > 0),
     price NUMERIC(10,2) NOT NULL
 );
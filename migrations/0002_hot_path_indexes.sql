@@ -0,0 +1,29 @@
+-- Composite indexes matching the queries in app/models.
+-- Listing indexes follow the (created_at, id) keyset order of each endpoint,
+-- so a page is an index range scan with no sort.
+
+-- orders.get_orders_by_customer: WHERE customer_id = ? ORDER BY created_at DESC, id DESC
+CREATE INDEX IF NOT EXISTS idx_orders_customer_created
+    ON orders (customer_id, created_at DESC, id DESC);
+
+-- orders.get_orders_by_restaurant: WHERE restaurant_id = ? ORDER BY created_at DESC, id DESC
+CREATE INDEX IF NOT EXISTS idx_orders_restaurant_created
+    ON orders (restaurant_id, created_at DESC, id DESC);
+
+-- orders.get_order_items_by_order_id(s): WHERE order_id = ANY(?)
+CREATE INDEX IF NOT EXISTS idx_order_items_order
+    ON order_items (order_id);
+
+-- ON DELETE CASCADE from menu_items would otherwise scan order_items
+CREATE INDEX IF NOT EXISTS idx_order_items_menu_item
+    ON order_items (menu_item_id);
+
+-- menu_item.get_menu_items_by_restaurant: WHERE restaurant_id = ? ORDER BY created_at, id
+CREATE INDEX IF NOT EXISTS idx_menu_items_restaurant_created
+    ON menu_items (restaurant_id, created_at, id);
+
+-- resturants.get_restaurants and users.get_users: ORDER BY created_at, id
+CREATE INDEX IF NOT EXISTS idx_restaurants_created
+    ON restaurants (created_at, id);
+CREATE INDEX IF NOT EXISTS idx_users_created
+    ON users (created_at, id);
@@ -0,0 +1,31 @@
+-- Full-text and fuzzy search (models/search.py).
+-- Each searchable table gets a generated, weighted tsvector (name outranks the
+-- other columns) with a GIN index for websearch_to_tsquery matches, plus a
+-- trigram GIN index on the name for typo-tolerant `name % term` matches.
+-- pg_trgm is a trusted extension from PostgreSQL 13, so the database owner
+-- can create it; on older servers a superuser has to run this migration.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+ALTER TABLE restaurants ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(address, '')), 'C')
+    ) STORED;
+
+ALTER TABLE menu_items ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(category, '')), 'B')
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_restaurants_search
+    ON restaurants USING GIN (search_vector);
+CREATE INDEX IF NOT EXISTS idx_restaurants_name_trgm
+    ON restaurants USING GIN (name gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_menu_items_search
+    ON menu_items USING GIN (search_vector);
+CREATE INDEX IF NOT EXISTS idx_menu_items_name_trgm
+    ON menu_items USING GIN (name gin_trgm_ops);
@@ -0,0 +1,62 @@
+-- Validators for conditional GETs (app/utils/conditional.py).
+-- version / updated_at change whenever a restaurant's own columns do, and
+-- menu_version / menu_updated_at whenever any of its menu items is added,
+-- changed or removed, so a route can tell whether a client's copy is current
+-- with one primary-key lookup instead of reloading the response.
+
+ALTER TABLE restaurants
+    ADD COLUMN IF NOT EXISTS version BIGINT NOT NULL DEFAULT 1,
+    ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    ADD COLUMN IF NOT EXISTS menu_version BIGINT NOT NULL DEFAULT 1,
+    ADD COLUMN IF NOT EXISTS menu_updated_at TIMESTAMP NOT NULL DEFAULT NOW();
+
+-- resturants.get_restaurants_version: MAX(updated_at)
+CREATE INDEX IF NOT EXISTS idx_restaurants_updated
+    ON restaurants (updated_at);
+
+CREATE OR REPLACE FUNCTION bump_restaurant_version() RETURNS trigger AS $$
+BEGIN
+    IF (NEW.name, NEW.description, NEW.address, NEW.phone)
+            IS DISTINCT FROM (OLD.name, OLD.description, OLD.address, OLD.phone) THEN
+        NEW.version := OLD.version + 1;
+        NEW.updated_at := NOW();
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS restaurants_version ON restaurants;
+CREATE TRIGGER restaurants_version BEFORE UPDATE ON restaurants
+    FOR EACH ROW EXECUTE FUNCTION bump_restaurant_version();
+
+-- Statement-level, so a bulk import (one COPY) bumps each restaurant once
+CREATE OR REPLACE FUNCTION bump_menu_version() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        UPDATE restaurants SET menu_version = menu_version + 1, menu_updated_at = NOW()
+        WHERE id IN (SELECT restaurant_id FROM new_items);
+    ELSIF TG_OP = 'DELETE' THEN
+        UPDATE restaurants SET menu_version = menu_version + 1, menu_updated_at = NOW()
+        WHERE id IN (SELECT restaurant_id FROM old_items);
+    ELSE
+        UPDATE restaurants SET menu_version = menu_version + 1, menu_updated_at = NOW()
+        WHERE id IN (SELECT restaurant_id FROM old_items UNION SELECT restaurant_id FROM new_items);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS menu_items_version_insert ON menu_items;
+CREATE TRIGGER menu_items_version_insert AFTER INSERT ON menu_items
+    REFERENCING NEW TABLE AS new_items
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_menu_version();
+
+DROP TRIGGER IF EXISTS menu_items_version_update ON menu_items;
+CREATE TRIGGER menu_items_version_update AFTER UPDATE ON menu_items
+    REFERENCING OLD TABLE AS old_items NEW TABLE AS new_items
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_menu_version();
+
+DROP TRIGGER IF EXISTS menu_items_version_delete ON menu_items;
+CREATE TRIGGER menu_items_version_delete AFTER DELETE ON menu_items
+    REFERENCING OLD TABLE AS old_items
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_menu_version();
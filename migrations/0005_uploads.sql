@@ -0,0 +1,53 @@
+-- Content-addressed uploads (app/utils/uploads.py) and their reference counts.
+-- Every stored upload has a row keyed by its URL; triggers count the
+-- menu_items.image values pointing at it, and app/upload_gc.py deletes the
+-- files nothing has referenced since a grace period after their last upload.
+
+CREATE TABLE IF NOT EXISTS uploads (
+    url VARCHAR(300) PRIMARY KEY,
+    size BIGINT NOT NULL DEFAULT 0,
+    content_type VARCHAR(100),
+    ref_count INT NOT NULL DEFAULT 0,
+    uploaded_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+-- upload_gc: WHERE ref_count = 0 AND uploaded_at < ?
+CREATE INDEX IF NOT EXISTS idx_uploads_unreferenced
+    ON uploads (uploaded_at) WHERE ref_count = 0;
+
+-- Images uploaded before this migration, with their current references
+INSERT INTO uploads (url, ref_count)
+SELECT image, COUNT(*) FROM menu_items WHERE image LIKE '/uploads/%' GROUP BY image
+ON CONFLICT (url) DO NOTHING;
+
+-- Statement-level, so a bulk import updates each referenced upload once
+CREATE OR REPLACE FUNCTION count_upload_references() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE uploads SET ref_count = ref_count - changed.n
+        FROM (SELECT image, COUNT(*) AS n FROM old_items WHERE image IS NOT NULL GROUP BY image) changed
+        WHERE uploads.url = changed.image;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'INSERT') THEN
+        UPDATE uploads SET ref_count = ref_count + changed.n
+        FROM (SELECT image, COUNT(*) AS n FROM new_items WHERE image IS NOT NULL GROUP BY image) changed
+        WHERE uploads.url = changed.image;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS menu_items_uploads_insert ON menu_items;
+CREATE TRIGGER menu_items_uploads_insert AFTER INSERT ON menu_items
+    REFERENCING NEW TABLE AS new_items
+    FOR EACH STATEMENT EXECUTE FUNCTION count_upload_references();
+
+DROP TRIGGER IF EXISTS menu_items_uploads_update ON menu_items;
+CREATE TRIGGER menu_items_uploads_update AFTER UPDATE ON menu_items
+    REFERENCING OLD TABLE AS old_items NEW TABLE AS new_items
+    FOR EACH STATEMENT EXECUTE FUNCTION count_upload_references();
+
+DROP TRIGGER IF EXISTS menu_items_uploads_delete ON menu_items;
+CREATE TRIGGER menu_items_uploads_delete AFTER DELETE ON menu_items
+    REFERENCING OLD TABLE AS old_items
+    FOR EACH STATEMENT EXECUTE FUNCTION count_upload_references();
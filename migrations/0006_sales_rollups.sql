@@ -0,0 +1,105 @@
+-- Hourly sales rollups behind GET /api/analytics (app/models/analytics.py).
+-- Triggers keep them in step with orders and order_items in the same
+-- transaction as the change, so a dashboard reads one row per hour (and per
+-- item sold in it) however many orders there are. Hours are UTC, like
+-- created_at; days are summed from hours when queried.
+
+CREATE TABLE IF NOT EXISTS restaurant_sales_hourly (
+    restaurant_id INT NOT NULL REFERENCES restaurants(id) ON DELETE CASCADE,
+    hour TIMESTAMP NOT NULL,
+    status VARCHAR(20) NOT NULL,
+    order_count INT NOT NULL DEFAULT 0,
+    revenue NUMERIC(14,2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (restaurant_id, hour, status)
+);
+
+-- Revenue is quantity * price of the order lines. Rows go when their menu
+-- item does, as its order_items rows do.
+CREATE TABLE IF NOT EXISTS menu_item_sales_hourly (
+    restaurant_id INT NOT NULL REFERENCES restaurants(id) ON DELETE CASCADE,
+    hour TIMESTAMP NOT NULL,
+    menu_item_id INT NOT NULL REFERENCES menu_items(id) ON DELETE CASCADE,
+    quantity INT NOT NULL DEFAULT 0,
+    revenue NUMERIC(14,2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (restaurant_id, hour, menu_item_id)
+);
+
+-- Orders placed before this migration
+INSERT INTO restaurant_sales_hourly (restaurant_id, hour, status, order_count, revenue)
+SELECT restaurant_id, date_trunc('hour', created_at), COALESCE(status, 'placed'), COUNT(*), SUM(total_price)
+FROM orders
+WHERE restaurant_id IS NOT NULL AND created_at IS NOT NULL
+GROUP BY 1, 2, 3
+ON CONFLICT DO NOTHING;
+
+INSERT INTO menu_item_sales_hourly (restaurant_id, hour, menu_item_id, quantity, revenue)
+SELECT o.restaurant_id, date_trunc('hour', o.created_at), oi.menu_item_id, SUM(oi.quantity), SUM(oi.quantity * oi.price)
+FROM order_items oi
+JOIN orders o ON o.id = oi.order_id
+WHERE o.restaurant_id IS NOT NULL AND o.created_at IS NOT NULL AND oi.menu_item_id IS NOT NULL
+GROUP BY 1, 2, 3
+ON CONFLICT DO NOTHING;
+
+-- One order per row: placing one adds it to its hour, a status change moves
+-- it between statuses, and deleting it takes it (and its lines) back out
+CREATE OR REPLACE FUNCTION rollup_order_sales() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE restaurant_sales_hourly
+        SET order_count = order_count - 1, revenue = revenue - OLD.total_price
+        WHERE restaurant_id = OLD.restaurant_id
+          AND hour = date_trunc('hour', OLD.created_at)
+          AND status = COALESCE(OLD.status, 'placed');
+    END IF;
+    IF TG_OP = 'DELETE' THEN
+        -- Runs before the delete: ON DELETE CASCADE has not removed the lines yet
+        UPDATE menu_item_sales_hourly s
+        SET quantity = s.quantity - lines.quantity, revenue = s.revenue - lines.revenue
+        FROM (
+            SELECT menu_item_id, SUM(quantity) AS quantity, SUM(quantity * price) AS revenue
+            FROM order_items WHERE order_id = OLD.id GROUP BY menu_item_id
+        ) lines
+        WHERE s.restaurant_id = OLD.restaurant_id
+          AND s.hour = date_trunc('hour', OLD.created_at)
+          AND s.menu_item_id = lines.menu_item_id;
+        RETURN OLD;
+    END IF;
+    IF NEW.restaurant_id IS NOT NULL AND NEW.created_at IS NOT NULL THEN
+        INSERT INTO restaurant_sales_hourly AS s (restaurant_id, hour, status, order_count, revenue)
+        VALUES (NEW.restaurant_id, date_trunc('hour', NEW.created_at), COALESCE(NEW.status, 'placed'), 1, NEW.total_price)
+        ON CONFLICT (restaurant_id, hour, status) DO UPDATE
+        SET order_count = s.order_count + 1, revenue = s.revenue + EXCLUDED.revenue;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS orders_sales_rollup ON orders;
+CREATE TRIGGER orders_sales_rollup AFTER INSERT OR UPDATE OF restaurant_id, status, total_price, created_at ON orders
+    FOR EACH ROW EXECUTE FUNCTION rollup_order_sales();
+
+DROP TRIGGER IF EXISTS orders_sales_rollup_delete ON orders;
+CREATE TRIGGER orders_sales_rollup_delete BEFORE DELETE ON orders
+    FOR EACH ROW EXECUTE FUNCTION rollup_order_sales();
+
+-- Statement-level, so an order's lines (one INSERT in create_order) are
+-- added with one upsert per menu item
+CREATE OR REPLACE FUNCTION rollup_menu_item_sales() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO menu_item_sales_hourly AS s (restaurant_id, hour, menu_item_id, quantity, revenue)
+    SELECT o.restaurant_id, date_trunc('hour', o.created_at), lines.menu_item_id,
+           SUM(lines.quantity), SUM(lines.quantity * lines.price)
+    FROM new_lines lines
+    JOIN orders o ON o.id = lines.order_id
+    WHERE o.restaurant_id IS NOT NULL AND o.created_at IS NOT NULL AND lines.menu_item_id IS NOT NULL
+    GROUP BY 1, 2, 3
+    ON CONFLICT (restaurant_id, hour, menu_item_id) DO UPDATE
+    SET quantity = s.quantity + EXCLUDED.quantity, revenue = s.revenue + EXCLUDED.revenue;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS order_items_sales_rollup ON order_items;
+CREATE TRIGGER order_items_sales_rollup AFTER INSERT ON order_items
+    REFERENCING NEW TABLE AS new_lines
+    FOR EACH STATEMENT EXECUTE FUNCTION rollup_menu_item_sales();
@@ -0,0 +1,37 @@
+-- Order events for the streaming endpoints (app/utils/events.py).
+-- Every order placed, updated or deleted is announced on the order_events
+-- channel when its transaction commits; each worker's notification listener
+-- fans the events out to its open streams, so clients stop polling.
+-- Payload: {"type", "id", "restaurant_id", "customer_id", "status", "payment_status"}
+
+CREATE OR REPLACE FUNCTION notify_order_event() RETURNS trigger AS $$
+DECLARE
+    changed orders%ROWTYPE;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        changed := OLD;
+    ELSE
+        changed := NEW;
+    END IF;
+    PERFORM pg_notify('order_events', json_build_object(
+        'type', CASE TG_OP WHEN 'INSERT' THEN 'order_created' WHEN 'UPDATE' THEN 'order_updated' ELSE 'order_deleted' END,
+        'id', changed.id,
+        'restaurant_id', changed.restaurant_id,
+        'customer_id', changed.customer_id,
+        'status', changed.status,
+        'payment_status', changed.payment_status
+    )::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS orders_notify_insert_delete ON orders;
+CREATE TRIGGER orders_notify_insert_delete AFTER INSERT OR DELETE ON orders
+    FOR EACH ROW EXECUTE FUNCTION notify_order_event();
+
+-- Only real changes: setting the status an order already has announces nothing
+DROP TRIGGER IF EXISTS orders_notify_update ON orders;
+CREATE TRIGGER orders_notify_update AFTER UPDATE OF status, payment_status ON orders
+    FOR EACH ROW
+    WHEN ((OLD.status, OLD.payment_status) IS DISTINCT FROM (NEW.status, NEW.payment_status))
+    EXECUTE FUNCTION notify_order_event();
@@ -0,0 +1,19 @@
+-- Idempotency keys for POST /api/orders (app/utils/idempotency.py).
+-- A keyed order inserts its row here in the same statement as the order,
+-- so a retry with the same key hits the primary key and is answered with
+-- the order it already created, including when both requests run at once:
+-- the second waits on the unique index until the first commits or rolls back.
+-- Keys are scoped to the customer; a key goes when its order does.
+
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    customer_id INT NOT NULL,
+    key VARCHAR(255) NOT NULL,
+    request_hash CHAR(64) NOT NULL,
+    order_id INT NOT NULL REFERENCES orders(id) ON DELETE CASCADE,
+    created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (customer_id, key)
+);
+
+-- ON DELETE CASCADE from orders
+CREATE INDEX IF NOT EXISTS idx_idempotency_keys_order
+    ON idempotency_keys (order_id);
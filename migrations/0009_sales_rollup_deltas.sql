@@ -0,0 +1,133 @@
+-- Append-only sales deltas in front of the hourly rollups (migration 0006).
+-- Upserting the rollups from the order triggers made every order of a
+-- restaurant in the same hour wait on one restaurant_sales_hourly row, and
+-- concurrent orders could deadlock on the item rows they upserted in plan
+-- order. The triggers now only append deltas; fold_sales_deltas(), run
+-- periodically by the app (SALES_FOLD_INTERVAL), moves them into the hourly
+-- rows. Reports read the restaurant_sales and menu_item_sales views, which
+-- add the deltas not folded yet, so they stay exact.
+
+-- Hours are UTC: take created_at in UTC whatever the server's TimeZone is.
+-- Orders placed before this migration keep the time they were given.
+ALTER TABLE orders ALTER COLUMN created_at SET DEFAULT timezone('UTC', now());
+
+CREATE TABLE IF NOT EXISTS restaurant_sales_deltas (
+    id BIGSERIAL PRIMARY KEY,
+    restaurant_id INT NOT NULL REFERENCES restaurants(id) ON DELETE CASCADE,
+    hour TIMESTAMP NOT NULL,
+    status VARCHAR(20) NOT NULL,
+    order_count INT NOT NULL,
+    revenue NUMERIC(14,2) NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS menu_item_sales_deltas (
+    id BIGSERIAL PRIMARY KEY,
+    restaurant_id INT NOT NULL REFERENCES restaurants(id) ON DELETE CASCADE,
+    hour TIMESTAMP NOT NULL,
+    menu_item_id INT NOT NULL REFERENCES menu_items(id) ON DELETE CASCADE,
+    quantity INT NOT NULL,
+    revenue NUMERIC(14,2) NOT NULL
+);
+
+-- Reports: WHERE restaurant_id = ? AND hour >= ? AND hour < ? (through the views)
+CREATE INDEX IF NOT EXISTS idx_restaurant_sales_deltas_restaurant_hour
+    ON restaurant_sales_deltas (restaurant_id, hour);
+CREATE INDEX IF NOT EXISTS idx_menu_item_sales_deltas_restaurant_hour
+    ON menu_item_sales_deltas (restaurant_id, hour);
+-- ON DELETE CASCADE from menu_items
+CREATE INDEX IF NOT EXISTS idx_menu_item_sales_deltas_menu_item
+    ON menu_item_sales_deltas (menu_item_id);
+
+CREATE OR REPLACE VIEW restaurant_sales AS
+SELECT restaurant_id, hour, status, order_count, revenue FROM restaurant_sales_hourly
+UNION ALL
+SELECT restaurant_id, hour, status, order_count, revenue FROM restaurant_sales_deltas;
+
+CREATE OR REPLACE VIEW menu_item_sales AS
+SELECT restaurant_id, hour, menu_item_id, quantity, revenue FROM menu_item_sales_hourly
+UNION ALL
+SELECT restaurant_id, hour, menu_item_id, quantity, revenue FROM menu_item_sales_deltas;
+
+-- Same bookkeeping as before, as inserts that take no locks on shared rows
+CREATE OR REPLACE FUNCTION rollup_order_sales() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.restaurant_id IS NOT NULL AND OLD.created_at IS NOT NULL THEN
+        INSERT INTO restaurant_sales_deltas (restaurant_id, hour, status, order_count, revenue)
+        VALUES (OLD.restaurant_id, date_trunc('hour', OLD.created_at), COALESCE(OLD.status, 'placed'), -1, -OLD.total_price);
+    END IF;
+    IF TG_OP = 'DELETE' THEN
+        -- Runs before the delete: ON DELETE CASCADE has not removed the lines yet
+        IF OLD.restaurant_id IS NOT NULL AND OLD.created_at IS NOT NULL THEN
+            INSERT INTO menu_item_sales_deltas (restaurant_id, hour, menu_item_id, quantity, revenue)
+            SELECT OLD.restaurant_id, date_trunc('hour', OLD.created_at), menu_item_id,
+                   -SUM(quantity), -SUM(quantity * price)
+            FROM order_items
+            WHERE order_id = OLD.id AND menu_item_id IS NOT NULL
+            GROUP BY menu_item_id;
+        END IF;
+        RETURN OLD;
+    END IF;
+    IF NEW.restaurant_id IS NOT NULL AND NEW.created_at IS NOT NULL THEN
+        INSERT INTO restaurant_sales_deltas (restaurant_id, hour, status, order_count, revenue)
+        VALUES (NEW.restaurant_id, date_trunc('hour', NEW.created_at), COALESCE(NEW.status, 'placed'), 1, NEW.total_price);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION rollup_menu_item_sales() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO menu_item_sales_deltas (restaurant_id, hour, menu_item_id, quantity, revenue)
+    SELECT o.restaurant_id, date_trunc('hour', o.created_at), lines.menu_item_id,
+           SUM(lines.quantity), SUM(lines.quantity * lines.price)
+    FROM new_lines lines
+    JOIN orders o ON o.id = lines.order_id
+    WHERE o.restaurant_id IS NOT NULL AND o.created_at IS NOT NULL AND lines.menu_item_id IS NOT NULL
+    GROUP BY 1, 2, 3;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Moves the committed deltas into the hourly rows and returns how many
+-- deltas it folded. One caller folds at a time (others return 0 at once),
+-- and rows are upserted in key order, so folding cannot deadlock.
+CREATE OR REPLACE FUNCTION fold_sales_deltas() RETURNS INT AS $$
+DECLARE
+    orders_folded INT;
+    items_folded INT;
+BEGIN
+    IF NOT pg_try_advisory_xact_lock(hashtext('fold_sales_deltas')) THEN
+        RETURN 0;
+    END IF;
+
+    WITH moved AS (
+        DELETE FROM restaurant_sales_deltas
+        RETURNING restaurant_id, hour, status, order_count, revenue
+    ), folded AS (
+        INSERT INTO restaurant_sales_hourly AS s (restaurant_id, hour, status, order_count, revenue)
+        SELECT restaurant_id, hour, status, SUM(order_count), SUM(revenue)
+        FROM moved
+        GROUP BY 1, 2, 3
+        ORDER BY 1, 2, 3
+        ON CONFLICT (restaurant_id, hour, status) DO UPDATE
+        SET order_count = s.order_count + EXCLUDED.order_count, revenue = s.revenue + EXCLUDED.revenue
+    )
+    SELECT COUNT(*) INTO orders_folded FROM moved;
+
+    WITH moved AS (
+        DELETE FROM menu_item_sales_deltas
+        RETURNING restaurant_id, hour, menu_item_id, quantity, revenue
+    ), folded AS (
+        INSERT INTO menu_item_sales_hourly AS s (restaurant_id, hour, menu_item_id, quantity, revenue)
+        SELECT restaurant_id, hour, menu_item_id, SUM(quantity), SUM(revenue)
+        FROM moved
+        GROUP BY 1, 2, 3
+        ORDER BY 1, 2, 3
+        ON CONFLICT (restaurant_id, hour, menu_item_id) DO UPDATE
+        SET quantity = s.quantity + EXCLUDED.quantity, revenue = s.revenue + EXCLUDED.revenue
+    )
+    SELECT COUNT(*) INTO items_folded FROM moved;
+
+    RETURN orders_folded + items_folded;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,11 @@
+-- Retention for idempotency keys (migration 0008). A key answers retries
+-- with its order for IDEMPOTENCY_KEY_RETENTION_HOURS (24 by default); after
+-- that create_order_once treats it as unused, and each worker deletes
+-- expired keys every IDEMPOTENCY_KEY_PURGE_INTERVAL seconds.
+
+-- The retention cutoff is computed in UTC, whatever the server's TimeZone is
+ALTER TABLE idempotency_keys ALTER COLUMN created_at SET DEFAULT timezone('UTC', now());
+
+-- Purge: WHERE created_at < ?
+CREATE INDEX IF NOT EXISTS idx_idempotency_keys_created_at
+    ON idempotency_keys (created_at);
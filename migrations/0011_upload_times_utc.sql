@@ -0,0 +1,6 @@
+-- uploads.uploaded_at in UTC, whatever the server's TimeZone is: upload_gc
+-- compares it with a UTC cutoff, so on a server behind UTC a fresh upload
+-- looked hours old and could be collected within its grace period.
+-- Re-uploads set it the same way (app/models/uploads.py).
+
+ALTER TABLE uploads ALTER COLUMN uploaded_at SET DEFAULT timezone('UTC', now());
@@ -0,0 +1,62 @@
+-- Validators for GET /api/restaurants/ and UTC timestamps for all of them
+-- (migration 0004).
+--
+-- The list's ETag came from COUNT(*) and MAX(updated_at) over every
+-- restaurant, a full count on each list request. It now comes from a
+-- single-row counter that statement-level triggers bump whenever a
+-- restaurant is added or removed or its name changes. The list shows only
+-- those, and writes to restaurants are rare, so the shared row costs nothing.
+--
+-- updated_at / menu_updated_at are sent as Last-Modified in UTC, so they
+-- are taken in UTC whatever the server's TimeZone is. Values written before
+-- this migration keep the time they were given.
+
+ALTER TABLE restaurants
+    ALTER COLUMN updated_at SET DEFAULT timezone('UTC', now()),
+    ALTER COLUMN menu_updated_at SET DEFAULT timezone('UTC', now());
+
+CREATE OR REPLACE FUNCTION bump_restaurant_version() RETURNS trigger AS $$
+BEGIN
+    IF (NEW.name, NEW.description, NEW.address, NEW.phone)
+            IS DISTINCT FROM (OLD.name, OLD.description, OLD.address, OLD.phone) THEN
+        NEW.version := OLD.version + 1;
+        NEW.updated_at := timezone('UTC', now());
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION bump_menu_version() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        UPDATE restaurants SET menu_version = menu_version + 1, menu_updated_at = timezone('UTC', now())
+        WHERE id IN (SELECT restaurant_id FROM new_items);
+    ELSIF TG_OP = 'DELETE' THEN
+        UPDATE restaurants SET menu_version = menu_version + 1, menu_updated_at = timezone('UTC', now())
+        WHERE id IN (SELECT restaurant_id FROM old_items);
+    ELSE
+        UPDATE restaurants SET menu_version = menu_version + 1, menu_updated_at = timezone('UTC', now())
+        WHERE id IN (SELECT restaurant_id FROM old_items UNION SELECT restaurant_id FROM new_items);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TABLE IF NOT EXISTS restaurant_list_version (
+    id INT PRIMARY KEY CHECK (id = 1),
+    version BIGINT NOT NULL DEFAULT 1
+);
+
+INSERT INTO restaurant_list_version (id) VALUES (1)
+ON CONFLICT (id) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION bump_restaurant_list_version() RETURNS trigger AS $$
+BEGIN
+    UPDATE restaurant_list_version SET version = version + 1 WHERE id = 1;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS restaurants_list_version ON restaurants;
+CREATE TRIGGER restaurants_list_version AFTER INSERT OR DELETE OR UPDATE OF name ON restaurants
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_restaurant_list_version();
@@ -0,0 +1,49 @@
+-- Base schema for the SQLite backend (DB_BACKEND=sqlite); mirrors migrations/0001_initial.sql.
+-- Timestamps are 'YYYY-MM-DD HH:MM:SS.SSS' text so they sort chronologically,
+-- and NUMERIC / TIMESTAMP declarations select the converters in app/database_sqlite.py.
+
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,
+    email VARCHAR(150) UNIQUE NOT NULL,
+    password VARCHAR(255) NOT NULL,
+    role VARCHAR(20) CHECK (role IN ('customer', 'restaurant_owner', 'admin')) NOT NULL DEFAULT 'customer',
+    created_at TIMESTAMP DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now'))
+);
+
+CREATE TABLE IF NOT EXISTS restaurants (
+    id INTEGER PRIMARY KEY,
+    name VARCHAR(200) NOT NULL,
+    description TEXT,
+    address VARCHAR(300),
+    phone VARCHAR(20),
+    created_at TIMESTAMP DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now'))
+);
+
+CREATE TABLE IF NOT EXISTS menu_items (
+    id INTEGER PRIMARY KEY,
+    restaurant_id INTEGER REFERENCES restaurants(id) ON DELETE CASCADE,
+    name VARCHAR(200) NOT NULL,
+    price NUMERIC(10,2) NOT NULL,
+    category VARCHAR(100),
+    image TEXT,
+    created_at TIMESTAMP DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now'))
+);
+
+CREATE TABLE IF NOT EXISTS orders (
+    id INTEGER PRIMARY KEY,
+    customer_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
+    restaurant_id INTEGER REFERENCES restaurants(id) ON DELETE CASCADE,
+    total_price NUMERIC(10,2) NOT NULL,
+    status VARCHAR(20) CHECK (status IN ('placed', 'delivered')) DEFAULT 'placed',
+    payment_status VARCHAR(10) DEFAULT 'Unpaid',
+    created_at TIMESTAMP DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now'))
+);
+
+CREATE TABLE IF NOT EXISTS order_items (
+    id INTEGER PRIMARY KEY,
+    order_id INTEGER REFERENCES orders(id) ON DELETE CASCADE,
+    menu_item_id INTEGER REFERENCES menu_items(id) ON DELETE CASCADE,
+    quantity INTEGER NOT NULL CHECK (quantity > 0),
+    price NUMERIC(10,2) NOT NULL
+);
@@ -0,0 +1,55 @@
+-- Full-text search for the SQLite backend; mirrors migrations/0003_search.sql.
+-- FTS5 external-content tables index the searchable columns without storing
+-- a second copy of them, and triggers keep them in step with their tables.
+-- There is no trigram matching here; instead the last word of a search is a
+-- prefix query (models/search.py), served by the 2- and 3-character prefix
+-- indexes, and the rank configuration weights name above the other columns.
+
+CREATE VIRTUAL TABLE IF NOT EXISTS restaurants_fts USING fts5(
+    name, description, address,
+    content='restaurants', content_rowid='id', tokenize='porter unicode61 remove_diacritics 2', prefix='2 3'
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS menu_items_fts USING fts5(
+    name, category,
+    content='menu_items', content_rowid='id', tokenize='porter unicode61 remove_diacritics 2', prefix='2 3'
+);
+
+INSERT INTO restaurants_fts (restaurants_fts, rank) VALUES ('rank', 'bm25(10.0, 4.0, 1.0)');
+INSERT INTO menu_items_fts (menu_items_fts, rank) VALUES ('rank', 'bm25(10.0, 4.0)');
+
+-- Index the rows that existed before this migration
+INSERT INTO restaurants_fts (restaurants_fts) VALUES ('rebuild');
+INSERT INTO menu_items_fts (menu_items_fts) VALUES ('rebuild');
+
+CREATE TRIGGER IF NOT EXISTS restaurants_fts_insert AFTER INSERT ON restaurants BEGIN
+    INSERT INTO restaurants_fts (rowid, name, description, address)
+    VALUES (new.id, new.name, new.description, new.address);
+END;
+
+CREATE TRIGGER IF NOT EXISTS restaurants_fts_delete AFTER DELETE ON restaurants BEGIN
+    INSERT INTO restaurants_fts (restaurants_fts, rowid, name, description, address)
+    VALUES ('delete', old.id, old.name, old.description, old.address);
+END;
+
+CREATE TRIGGER IF NOT EXISTS restaurants_fts_update AFTER UPDATE ON restaurants BEGIN
+    INSERT INTO restaurants_fts (restaurants_fts, rowid, name, description, address)
+    VALUES ('delete', old.id, old.name, old.description, old.address);
+    INSERT INTO restaurants_fts (rowid, name, description, address)
+    VALUES (new.id, new.name, new.description, new.address);
+END;
+
+CREATE TRIGGER IF NOT EXISTS menu_items_fts_insert AFTER INSERT ON menu_items BEGIN
+    INSERT INTO menu_items_fts (rowid, name, category) VALUES (new.id, new.name, new.category);
+END;
+
+CREATE TRIGGER IF NOT EXISTS menu_items_fts_delete AFTER DELETE ON menu_items BEGIN
+    INSERT INTO menu_items_fts (menu_items_fts, rowid, name, category)
+    VALUES ('delete', old.id, old.name, old.category);
+END;
+
+CREATE TRIGGER IF NOT EXISTS menu_items_fts_update AFTER UPDATE ON menu_items BEGIN
+    INSERT INTO menu_items_fts (menu_items_fts, rowid, name, category)
+    VALUES ('delete', old.id, old.name, old.category);
+    INSERT INTO menu_items_fts (rowid, name, category) VALUES (new.id, new.name, new.category);
+END;
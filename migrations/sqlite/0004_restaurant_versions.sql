@@ -0,0 +1,52 @@
+-- Validators for conditional GETs; mirrors migrations/0004_restaurant_versions.sql.
+-- SQLite cannot add a column with a NOW() default, so updated_at and
+-- menu_updated_at are filled in by an insert trigger, and it has no
+-- statement-level triggers, so every changed menu item bumps its restaurant.
+
+ALTER TABLE restaurants ADD COLUMN version INTEGER NOT NULL DEFAULT 1;
+ALTER TABLE restaurants ADD COLUMN updated_at TIMESTAMP;
+ALTER TABLE restaurants ADD COLUMN menu_version INTEGER NOT NULL DEFAULT 1;
+ALTER TABLE restaurants ADD COLUMN menu_updated_at TIMESTAMP;
+
+UPDATE restaurants SET updated_at = created_at, menu_updated_at = created_at;
+
+-- resturants.get_restaurants_version: MAX(updated_at)
+CREATE INDEX IF NOT EXISTS idx_restaurants_updated
+    ON restaurants (updated_at);
+
+-- Reindex a restaurant for search only when a searchable column changes,
+-- not on every version bump
+DROP TRIGGER IF EXISTS restaurants_fts_update;
+CREATE TRIGGER IF NOT EXISTS restaurants_fts_update AFTER UPDATE OF name, description, address ON restaurants BEGIN
+    INSERT INTO restaurants_fts (restaurants_fts, rowid, name, description, address)
+    VALUES ('delete', old.id, old.name, old.description, old.address);
+    INSERT INTO restaurants_fts (rowid, name, description, address)
+    VALUES (new.id, new.name, new.description, new.address);
+END;
+
+CREATE TRIGGER IF NOT EXISTS restaurants_version_insert AFTER INSERT ON restaurants BEGIN
+    UPDATE restaurants SET updated_at = new.created_at, menu_updated_at = new.created_at WHERE id = new.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS restaurants_version AFTER UPDATE OF name, description, address, phone ON restaurants
+WHEN new.name IS NOT old.name OR new.description IS NOT old.description
+    OR new.address IS NOT old.address OR new.phone IS NOT old.phone
+BEGIN
+    UPDATE restaurants SET version = old.version + 1, updated_at = strftime('%Y-%m-%d %H:%M:%f', 'now')
+    WHERE id = new.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS menu_items_version_insert AFTER INSERT ON menu_items BEGIN
+    UPDATE restaurants SET menu_version = menu_version + 1, menu_updated_at = strftime('%Y-%m-%d %H:%M:%f', 'now')
+    WHERE id = new.restaurant_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS menu_items_version_update AFTER UPDATE ON menu_items BEGIN
+    UPDATE restaurants SET menu_version = menu_version + 1, menu_updated_at = strftime('%Y-%m-%d %H:%M:%f', 'now')
+    WHERE id IN (old.restaurant_id, new.restaurant_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS menu_items_version_delete AFTER DELETE ON menu_items BEGIN
+    UPDATE restaurants SET menu_version = menu_version + 1, menu_updated_at = strftime('%Y-%m-%d %H:%M:%f', 'now')
+    WHERE id = old.restaurant_id;
+END;
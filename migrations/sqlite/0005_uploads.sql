@@ -0,0 +1,36 @@
+-- Content-addressed uploads and their reference counts; mirrors migrations/0005_uploads.sql.
+
+CREATE TABLE IF NOT EXISTS uploads (
+    url VARCHAR(300) PRIMARY KEY,
+    size INTEGER NOT NULL DEFAULT 0,
+    content_type VARCHAR(100),
+    ref_count INTEGER NOT NULL DEFAULT 0,
+    uploaded_at TIMESTAMP DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now'))
+);
+
+-- upload_gc: WHERE ref_count = 0 AND uploaded_at < ?
+CREATE INDEX IF NOT EXISTS idx_uploads_unreferenced
+    ON uploads (uploaded_at) WHERE ref_count = 0;
+
+-- Images uploaded before this migration, with their current references
+INSERT INTO uploads (url, ref_count)
+SELECT image, COUNT(*) FROM menu_items WHERE image LIKE '/uploads/%' GROUP BY image;
+
+CREATE TRIGGER IF NOT EXISTS menu_items_uploads_insert AFTER INSERT ON menu_items
+WHEN new.image IS NOT NULL
+BEGIN
+    UPDATE uploads SET ref_count = ref_count + 1 WHERE url = new.image;
+END;
+
+CREATE TRIGGER IF NOT EXISTS menu_items_uploads_update AFTER UPDATE OF image ON menu_items
+WHEN old.image IS NOT new.image
+BEGIN
+    UPDATE uploads SET ref_count = ref_count - 1 WHERE url = old.image;
+    UPDATE uploads SET ref_count = ref_count + 1 WHERE url = new.image;
+END;
+
+CREATE TRIGGER IF NOT EXISTS menu_items_uploads_delete AFTER DELETE ON menu_items
+WHEN old.image IS NOT NULL
+BEGIN
+    UPDATE uploads SET ref_count = ref_count - 1 WHERE url = old.image;
+END;
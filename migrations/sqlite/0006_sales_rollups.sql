@@ -0,0 +1,88 @@
+-- Hourly sales rollups; mirrors migrations/0006_sales_rollups.sql. Hours are
+-- stored in the TIMESTAMP text format ('YYYY-MM-DD HH:00:00.000').
+
+CREATE TABLE IF NOT EXISTS restaurant_sales_hourly (
+    restaurant_id INTEGER NOT NULL REFERENCES restaurants(id) ON DELETE CASCADE,
+    hour TIMESTAMP NOT NULL,
+    status VARCHAR(20) NOT NULL,
+    order_count INTEGER NOT NULL DEFAULT 0,
+    revenue NUMERIC(14,2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (restaurant_id, hour, status)
+);
+
+CREATE TABLE IF NOT EXISTS menu_item_sales_hourly (
+    restaurant_id INTEGER NOT NULL REFERENCES restaurants(id) ON DELETE CASCADE,
+    hour TIMESTAMP NOT NULL,
+    menu_item_id INTEGER NOT NULL REFERENCES menu_items(id) ON DELETE CASCADE,
+    quantity INTEGER NOT NULL DEFAULT 0,
+    revenue NUMERIC(14,2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (restaurant_id, hour, menu_item_id)
+);
+
+-- Orders placed before this migration
+INSERT OR IGNORE INTO restaurant_sales_hourly (restaurant_id, hour, status, order_count, revenue)
+SELECT restaurant_id, strftime('%Y-%m-%d %H:00:00.000', created_at), COALESCE(status, 'placed'), COUNT(*), SUM(total_price)
+FROM orders
+WHERE restaurant_id IS NOT NULL AND created_at IS NOT NULL
+GROUP BY 1, 2, 3;
+
+INSERT OR IGNORE INTO menu_item_sales_hourly (restaurant_id, hour, menu_item_id, quantity, revenue)
+SELECT o.restaurant_id, strftime('%Y-%m-%d %H:00:00.000', o.created_at), oi.menu_item_id, SUM(oi.quantity), SUM(oi.quantity * oi.price)
+FROM order_items oi
+JOIN orders o ON o.id = oi.order_id
+WHERE o.restaurant_id IS NOT NULL AND o.created_at IS NOT NULL AND oi.menu_item_id IS NOT NULL
+GROUP BY 1, 2, 3;
+
+CREATE TRIGGER IF NOT EXISTS orders_sales_rollup_insert AFTER INSERT ON orders
+WHEN new.restaurant_id IS NOT NULL AND new.created_at IS NOT NULL
+BEGIN
+    INSERT INTO restaurant_sales_hourly (restaurant_id, hour, status, order_count, revenue)
+    VALUES (new.restaurant_id, strftime('%Y-%m-%d %H:00:00.000', new.created_at), COALESCE(new.status, 'placed'), 1, new.total_price)
+    ON CONFLICT (restaurant_id, hour, status) DO UPDATE
+    SET order_count = order_count + 1, revenue = revenue + excluded.revenue;
+END;
+
+CREATE TRIGGER IF NOT EXISTS orders_sales_rollup_update AFTER UPDATE OF restaurant_id, status, total_price, created_at ON orders
+BEGIN
+    UPDATE restaurant_sales_hourly
+    SET order_count = order_count - 1, revenue = revenue - old.total_price
+    WHERE restaurant_id = old.restaurant_id
+      AND hour = strftime('%Y-%m-%d %H:00:00.000', old.created_at)
+      AND status = COALESCE(old.status, 'placed');
+    INSERT INTO restaurant_sales_hourly (restaurant_id, hour, status, order_count, revenue)
+    SELECT new.restaurant_id, strftime('%Y-%m-%d %H:00:00.000', new.created_at), COALESCE(new.status, 'placed'), 1, new.total_price
+    WHERE new.restaurant_id IS NOT NULL AND new.created_at IS NOT NULL
+    ON CONFLICT (restaurant_id, hour, status) DO UPDATE
+    SET order_count = order_count + 1, revenue = revenue + excluded.revenue;
+END;
+
+-- Before the delete, while ON DELETE CASCADE has not removed the lines yet
+CREATE TRIGGER IF NOT EXISTS orders_sales_rollup_delete BEFORE DELETE ON orders
+BEGIN
+    UPDATE restaurant_sales_hourly
+    SET order_count = order_count - 1, revenue = revenue - old.total_price
+    WHERE restaurant_id = old.restaurant_id
+      AND hour = strftime('%Y-%m-%d %H:00:00.000', old.created_at)
+      AND status = COALESCE(old.status, 'placed');
+    UPDATE menu_item_sales_hourly
+    SET quantity = quantity - (
+            SELECT SUM(quantity) FROM order_items WHERE order_id = old.id AND menu_item_id = menu_item_sales_hourly.menu_item_id
+        ),
+        revenue = revenue - (
+            SELECT SUM(quantity * price) FROM order_items WHERE order_id = old.id AND menu_item_id = menu_item_sales_hourly.menu_item_id
+        )
+    WHERE restaurant_id = old.restaurant_id
+      AND hour = strftime('%Y-%m-%d %H:00:00.000', old.created_at)
+      AND menu_item_id IN (SELECT menu_item_id FROM order_items WHERE order_id = old.id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS order_items_sales_rollup AFTER INSERT ON order_items
+WHEN new.menu_item_id IS NOT NULL
+BEGIN
+    INSERT INTO menu_item_sales_hourly (restaurant_id, hour, menu_item_id, quantity, revenue)
+    SELECT o.restaurant_id, strftime('%Y-%m-%d %H:00:00.000', o.created_at), new.menu_item_id, new.quantity, new.quantity * new.price
+    FROM orders o
+    WHERE o.id = new.order_id AND o.restaurant_id IS NOT NULL AND o.created_at IS NOT NULL
+    ON CONFLICT (restaurant_id, hour, menu_item_id) DO UPDATE
+    SET quantity = quantity + excluded.quantity, revenue = revenue + excluded.revenue;
+END;
@@ -0,0 +1,4 @@
+-- Mirrors migrations/0007_order_events.sql. SQLite has no NOTIFY, so
+-- app/models/orders.py publishes order events to the in-process hub itself
+-- (they reach streams served by the worker that made the change); there is
+-- nothing to create.
@@ -0,0 +1,13 @@
+-- Idempotency keys for POST /api/orders; mirrors migrations/0008_idempotency_keys.sql.
+
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    customer_id INTEGER NOT NULL,
+    key VARCHAR(255) NOT NULL,
+    request_hash CHAR(64) NOT NULL,
+    order_id INTEGER NOT NULL REFERENCES orders(id) ON DELETE CASCADE,
+    created_at TIMESTAMP NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now')),
+    PRIMARY KEY (customer_id, key)
+);
+
+CREATE INDEX IF NOT EXISTS idx_idempotency_keys_order
+    ON idempotency_keys (order_id);
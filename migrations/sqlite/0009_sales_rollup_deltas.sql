@@ -0,0 +1,10 @@
+-- Sales report views; mirrors migrations/0009_sales_rollup_deltas.sql.
+-- SQLite has a single writer, so the triggers of 0006 keep upserting the
+-- hourly rows directly and the views are those tables alone. created_at
+-- defaults are already UTC here.
+
+CREATE VIEW IF NOT EXISTS restaurant_sales AS
+SELECT restaurant_id, hour, status, order_count, revenue FROM restaurant_sales_hourly;
+
+CREATE VIEW IF NOT EXISTS menu_item_sales AS
+SELECT restaurant_id, hour, menu_item_id, quantity, revenue FROM menu_item_sales_hourly;
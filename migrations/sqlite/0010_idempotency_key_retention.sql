@@ -0,0 +1,5 @@
+-- Retention for idempotency keys; mirrors migrations/0010_idempotency_key_retention.sql.
+-- created_at already defaults to UTC here.
+
+CREATE INDEX IF NOT EXISTS idx_idempotency_keys_created_at
+    ON idempotency_keys (created_at);
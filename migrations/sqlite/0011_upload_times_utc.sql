@@ -0,0 +1,2 @@
+-- uploads.uploaded_at in UTC; mirrors migrations/0011_upload_times_utc.sql.
+-- SQLite's clock is UTC already, so there is nothing to change here.
@@ -0,0 +1,24 @@
+-- Validators for GET /api/restaurants/; mirrors migrations/0012_restaurant_list_version.sql.
+-- SQLite timestamps are UTC already. It has no statement-level triggers, so
+-- every added, removed or renamed restaurant bumps the counter.
+
+CREATE TABLE IF NOT EXISTS restaurant_list_version (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    version INTEGER NOT NULL DEFAULT 1
+);
+
+INSERT OR IGNORE INTO restaurant_list_version (id) VALUES (1);
+
+CREATE TRIGGER IF NOT EXISTS restaurants_list_version_insert AFTER INSERT ON restaurants BEGIN
+    UPDATE restaurant_list_version SET version = version + 1 WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS restaurants_list_version_delete AFTER DELETE ON restaurants BEGIN
+    UPDATE restaurant_list_version SET version = version + 1 WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS restaurants_list_version_update AFTER UPDATE OF name ON restaurants
+WHEN new.name IS NOT old.name
+BEGIN
+    UPDATE restaurant_list_version SET version = version + 1 WHERE id = 1;
+END;
@@ -8,7 +8,7 @@ psql -h localhost -U postgres -tc "SELECT 1 FROM pg_database WHERE datname = 'zo
     psql -h localhost -U postgres -c "CREATE DATABASE zomato_clone"
 
 # Apply migrations
-psql -h localhost -U postgres -d zomato_clone -f migrations/initial.sql
+python3 -m app.migrate
 
 # Run tests
 python3 -m pytest tests/ -v
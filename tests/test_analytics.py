@@ -0,0 +1,190 @@
+# tests/test_analytics.py
+from datetime import datetime
+import pytest
+from fastapi.testclient import TestClient
+from app.database import ConnectionPool
+from app.database_sqlite import connect, split_statements
+from app.main import app
+from app.migrate import MIGRATIONS_ROOT
+from app.models import analytics, orders, resturants
+
+client = TestClient(app)
+
+EMPTY_REPORT = {
+    "totals": {"orders": 0, "delivered_orders": 0, "revenue": 0.0, "average_ticket": 0.0},
+    "buckets": [],
+    "top_items": [],
+}
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    calls = []
+
+    def fake_get_sales(restaurant_id, granularity, start, end, top=analytics.DEFAULT_TOP_ITEMS):
+        calls.append({"granularity": granularity, "start": start, "end": end, "top": top})
+        return EMPTY_REPORT
+
+    monkeypatch.setattr(analytics, "get_sales", fake_get_sales)
+    monkeypatch.setattr(resturants, "get_restaurant_version", lambda rest_id: {"version": 1} if rest_id == 7 else None)
+    return calls
+
+
+class TestSalesEndpoint:
+    """Test cases for the sales analytics route"""
+
+    def test_range_is_widened_to_whole_buckets(self, calls):
+        """Test start and end are rounded out to bucket boundaries"""
+        response = client.get("/api/analytics/restaurants/7/sales", params={
+            "granularity": "hour", "start": "2024-05-01T10:15:00", "end": "2024-05-01T12:30:00", "top": 3,
+        })
+
+        assert response.status_code == 200
+        assert response.json()["start"] == "2024-05-01T10:00:00"
+        assert response.json()["end"] == "2024-05-01T13:00:00"
+        assert calls == [{
+            "granularity": "hour", "start": datetime(2024, 5, 1, 10), "end": datetime(2024, 5, 1, 13), "top": 3,
+        }]
+
+    def test_offsets_are_converted_to_utc(self, calls):
+        """Test a range given with a UTC offset is queried in UTC"""
+        client.get("/api/analytics/restaurants/7/sales", params={
+            "start": "2024-05-02T02:00:00+05:30", "end": "2024-05-03T00:00:00+00:00",
+        })
+
+        assert calls[0]["start"] == datetime(2024, 5, 1)
+        assert calls[0]["end"] == datetime(2024, 5, 3)
+
+    def test_default_range(self, calls):
+        """Test the range defaults to the last 30 days, by day"""
+        client.get("/api/analytics/restaurants/7/sales")
+
+        assert calls[0]["granularity"] == "day"
+        assert (calls[0]["end"] - calls[0]["start"]).days in (30, 31)
+
+    @pytest.mark.parametrize("params", [
+        {"start": "2024-05-02T00:00:00", "end": "2024-05-01T00:00:00"},
+        {"granularity": "hour", "start": "2024-01-01T00:00:00", "end": "2024-03-01T00:00:00"},
+    ])
+    def test_invalid_ranges(self, calls, params):
+        """Test empty and oversized ranges are rejected without querying"""
+        response = client.get("/api/analytics/restaurants/7/sales", params=params)
+
+        assert response.status_code == 400
+        assert calls == []
+
+    @pytest.mark.parametrize("params", [{"granularity": "week"}, {"top": 0}, {"top": 1000}])
+    def test_invalid_parameters(self, calls, params):
+        """Test unknown granularities and out-of-range top values are validation errors"""
+        assert client.get("/api/analytics/restaurants/7/sales", params=params).status_code == 422
+
+    def test_unknown_restaurant(self, calls):
+        """Test a missing restaurant is a 404"""
+        assert client.get("/api/analytics/restaurants/8/sales").status_code == 404
+        assert calls == []
+
+
+class TestSalesRollupsSQLite:
+    """Test cases for the rollup triggers and reports (SQLite backend)"""
+
+    @pytest.fixture
+    def pool(self, tmp_path, monkeypatch):
+        path = str(tmp_path / "analytics.db")
+        conn = connect(path)
+        cur = conn.cursor()
+        for migration in sorted((MIGRATIONS_ROOT / "sqlite").glob("*.sql")):
+            for statement in split_statements(migration.read_text()):
+                cur.execute(statement)
+        cur.execute("INSERT INTO users (id, name, email, password) VALUES (1, 'Test User', 'test@example.com', 'x');")
+        cur.execute("INSERT INTO restaurants (id, name) VALUES (7, 'Test Restaurant');")
+        cur.execute("INSERT INTO menu_items (id, restaurant_id, name, price) VALUES (1, 7, 'Dosa', 4), (2, 7, 'Vada', 2), (3, 7, 'Idli', 3);")
+        conn.commit()
+        conn.close()
+
+        pool = ConnectionPool(lambda: connect(path), min_size=0, max_size=2)
+        for module in (orders, analytics):
+            monkeypatch.setattr(module, "IS_SQLITE", True)
+        monkeypatch.setattr(orders, "db_connection", pool.connection)
+        monkeypatch.setattr(analytics, "read_connection", pool.connection)
+        yield pool
+        pool.close()
+
+    def fetch(self, pool, query):
+        with pool.connection() as conn:
+            cur = conn.cursor()
+            cur.execute(query)
+            return [dict(row) for row in cur.fetchall()]
+
+    def place(self, pool, created_at, lines, status="placed"):
+        """Insert an order at a given time, as create_order would"""
+        with pool.connection() as conn:
+            cur = conn.cursor()
+            cur.execute(
+                "INSERT INTO orders (customer_id, restaurant_id, total_price, status, created_at) VALUES (1, 7, %s, %s, %s) RETURNING id;",
+                (sum(quantity * price for _, quantity, price in lines), status, created_at),
+            )
+            order_id = cur.fetchone()["id"]
+            cur.executemany(
+                "INSERT INTO order_items (order_id, menu_item_id, quantity, price) VALUES (%s, %s, %s, %s);",
+                [(order_id, *line) for line in lines],
+            )
+            conn.commit()
+        return order_id
+
+    def test_rollups_follow_orders(self, pool):
+        """Test placing, delivering and deleting orders keeps the rollups equal to a full recount"""
+        first = orders.create_order(1, 7, 10, [
+            {"menu_item_id": 1, "quantity": 2, "price": 4}, {"menu_item_id": 2, "quantity": 1, "price": 2},
+        ])
+        second = orders.create_order(1, 7, 4, [{"menu_item_id": 1, "quantity": 1, "price": 4}])
+        orders.create_order(1, 7, 3, [{"menu_item_id": 3, "quantity": 1, "price": 3}])
+        orders.update_order_status(first["id"], "delivered")
+        orders.delete_order(second["id"])
+
+        sales = self.fetch(pool, "SELECT status, SUM(order_count) AS n, SUM(revenue) AS revenue FROM restaurant_sales_hourly GROUP BY status;")
+        recount = self.fetch(pool, "SELECT status, COUNT(*) AS n, SUM(total_price) AS revenue FROM orders GROUP BY status;")
+        assert sorted(sales, key=str) == sorted(recount, key=str)
+
+        items = self.fetch(pool, "SELECT menu_item_id, SUM(quantity) AS quantity FROM menu_item_sales_hourly GROUP BY menu_item_id;")
+        assert {row["menu_item_id"]: row["quantity"] for row in items} == {1: 2, 2: 1, 3: 1}
+
+    def test_hourly_and_daily_reports(self, pool):
+        """Test buckets, their top items and the range totals"""
+        self.place(pool, datetime(2024, 5, 1, 10, 5), [(1, 2, 4.0), (2, 1, 2.0)], status="delivered")
+        self.place(pool, datetime(2024, 5, 1, 10, 55), [(2, 3, 2.0)])
+        self.place(pool, datetime(2024, 5, 1, 13, 0), [(3, 1, 3.0)])
+        self.place(pool, datetime(2024, 5, 2, 9, 30), [(1, 1, 4.0)])
+
+        hourly = analytics.get_sales(7, "hour", datetime(2024, 5, 1), datetime(2024, 5, 2), top=1)
+
+        assert [(str(b["start"])[:13], b["orders"], b["revenue"]) for b in hourly["buckets"]] == [
+            ("2024-05-01 10", 2, 16.0), ("2024-05-01 13", 1, 3.0),
+        ]
+        assert hourly["buckets"][0]["delivered_orders"] == 1
+        assert hourly["buckets"][0]["average_ticket"] == 8.0
+        assert [item["name"] for item in hourly["buckets"][0]["top_items"]] == ["Vada"]
+        assert hourly["totals"] == {"orders": 3, "delivered_orders": 1, "revenue": 19.0, "average_ticket": 6.33}
+
+        daily = analytics.get_sales(7, "day", datetime(2024, 5, 1), datetime(2024, 5, 3))
+
+        assert [b["orders"] for b in daily["buckets"]] == [3, 1]
+        assert [(item["name"], item["quantity"], item["revenue"]) for item in daily["top_items"]] == [
+            ("Vada", 4, 8.0), ("Dosa", 3, 12.0), ("Idli", 1, 3.0),
+        ]
+
+    def test_nothing_to_fold(self, pool):
+        """Test folding is a no-op on SQLite, whose triggers update the rollups directly"""
+        self.place(pool, datetime(2024, 5, 1, 10), [(1, 1, 4.0)])
+
+        assert analytics.fold_sales_deltas() == 0
+        assert analytics.get_sales(7, "hour", datetime(2024, 5, 1), datetime(2024, 5, 2))["totals"]["orders"] == 1
+
+    def test_empty_range(self, pool):
+        """Test a range without orders reports zeros"""
+        self.place(pool, datetime(2024, 5, 1, 10), [(1, 1, 4.0)])
+
+        assert analytics.get_sales(7, "day", datetime(2024, 6, 1), datetime(2024, 6, 2)) == EMPTY_REPORT
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,203 @@
+# tests/test_bulk_import.py
+import json
+import pytest
+from fastapi.testclient import TestClient
+from app.database import ConnectionPool
+from app.database_sqlite import connect, split_statements
+from app.main import app
+from app.migrate import MIGRATIONS_ROOT
+from app.models import menu_item, resturants
+
+client = TestClient(app)
+
+CSV_HEADERS = {"Content-Type": "text/csv"}
+NDJSON_HEADERS = {"Content-Type": "application/x-ndjson"}
+
+
+class FakeImport:
+    """Stands in for menu_item.MenuImport, recording what would be written"""
+    instances = []
+
+    def __init__(self, restaurant_id):
+        self.restaurant_id = restaurant_id
+        self.batches = []
+        self.committed = False
+        self.aborted = False
+        FakeImport.instances.append(self)
+
+    def write(self, rows):
+        self.batches.append(rows)
+
+    def commit(self):
+        self.committed = True
+        return sum(len(batch) for batch in self.batches)
+
+    def abort(self):
+        self.aborted = True
+
+
+@pytest.fixture
+def importer(monkeypatch):
+    FakeImport.instances = []
+    monkeypatch.setattr(menu_item, "MenuImport", FakeImport)
+    monkeypatch.setattr(resturants, "get_restaurant_by_id", lambda rest_id: {"id": rest_id} if rest_id == 7 else None)
+    return FakeImport.instances
+
+
+class TestImportEndpoint:
+    """Test cases for parsing and validating bulk menu imports"""
+
+    def test_csv_import(self, importer):
+        """Test CSV rows are imported with empty cells read as missing values"""
+        body = 'name,price,category,image\nMasala Dosa,4.50,Main Course,\n"Idli, two pieces",3,,\n'
+
+        response = client.post("/api/menu/7/import", content=body, headers=CSV_HEADERS)
+
+        assert response.status_code == 200
+        assert response.json() == {"imported": 2, "skipped": 0, "errors": []}
+        assert importer[0].batches == [[
+            ("Masala Dosa", 4.5, "Main Course", None), ("Idli, two pieces", 3.0, None, None),
+        ]]
+        assert importer[0].committed
+
+    def test_quoted_cells_can_span_lines(self, importer):
+        """Test a quoted cell containing a newline stays one row"""
+        body = 'name,price\n"Thali\nwith rice",9\nVada,2\n'
+
+        response = client.post("/api/menu/7/import", content=body, headers=CSV_HEADERS)
+
+        assert response.json()["imported"] == 2
+        assert importer[0].batches[0][0][0] == "Thali\nwith rice"
+
+    def test_ndjson_import_in_batches(self, importer, monkeypatch):
+        """Test NDJSON bodies stream through in batches within one import"""
+        monkeypatch.setattr("app.utils.bulk.BATCH_SIZE", 2)
+        body = "".join(json.dumps({"name": f"Dish {n}", "price": n + 1}) + "\n" for n in range(5))
+
+        response = client.post("/api/menu/7/import", content=body, headers=NDJSON_HEADERS)
+
+        assert response.json()["imported"] == 5
+        assert [len(batch) for batch in importer[0].batches] == [2, 2, 1]
+
+    def test_invalid_rows_reject_the_import(self, importer):
+        """Test any invalid row rolls the whole import back and every bad row is reported"""
+        body = 'name,price\nDosa,4\nVada,cheap\n,3\nIdli,2\n'
+
+        response = client.post("/api/menu/7/import", content=body, headers=CSV_HEADERS)
+
+        assert response.status_code == 422
+        detail = response.json()["detail"]
+        assert detail["error_count"] == 2
+        assert [error["row"] for error in detail["errors"]] == [2, 3]
+        assert detail["errors"][0]["errors"][0]["field"] == "price"
+        assert not importer[0].committed
+        assert importer[0].aborted
+
+    def test_skip_invalid(self, importer):
+        """Test skip_invalid imports the valid rows and reports the rest"""
+        body = '{"name": "Dosa", "price": 4}\nnot json\n["a list"]\n{"name": "Vada"}\n{"name": "Idli", "price": 2}\n'
+
+        response = client.post("/api/menu/7/import?skip_invalid=true", content=body, headers=NDJSON_HEADERS)
+
+        assert response.status_code == 200
+        result = response.json()
+        assert result["imported"] == 2
+        assert result["skipped"] == 3
+        assert [error["row"] for error in result["errors"]] == [2, 3, 4]
+
+    def test_bad_header(self, importer):
+        """Test unknown or missing CSV columns are rejected up front"""
+        response = client.post("/api/menu/7/import", content="name,cost\nDosa,4\n", headers=CSV_HEADERS)
+
+        assert response.status_code == 400
+        assert "Unknown CSV columns: cost" in response.json()["detail"]
+        assert "Missing CSV columns: price" in response.json()["detail"]
+
+    def test_unsupported_content_type(self, importer):
+        """Test bodies that are neither CSV nor NDJSON are refused"""
+        response = client.post("/api/menu/7/import", json=[{"name": "Dosa", "price": 4}])
+
+        assert response.status_code == 415
+        assert importer == []
+
+    def test_unknown_restaurant(self, importer):
+        """Test importing into a missing restaurant is a 404"""
+        response = client.post("/api/menu/8/import", content="name,price\nDosa,4\n", headers=CSV_HEADERS)
+
+        assert response.status_code == 404
+        assert importer == []
+
+    def test_row_limit(self, importer, monkeypatch):
+        """Test imports over MENU_IMPORT_MAX_ROWS are refused and rolled back"""
+        monkeypatch.setattr(menu_item, "MENU_IMPORT_MAX_ROWS", 2)
+
+        response = client.post("/api/menu/7/import", content="name,price\na,1\nb,2\nc,3\n", headers=CSV_HEADERS)
+
+        assert response.status_code == 413
+        assert importer[0].aborted and not importer[0].committed
+
+
+class TestMenuImportSQLite:
+    """Test cases for writing an import in one transaction (SQLite backend)"""
+
+    @pytest.fixture
+    def pool(self, tmp_path, monkeypatch):
+        path = str(tmp_path / "import.db")
+        conn = connect(path)
+        cur = conn.cursor()
+        for migration in sorted((MIGRATIONS_ROOT / "sqlite").glob("*.sql")):
+            for statement in split_statements(migration.read_text()):
+                cur.execute(statement)
+        cur.execute("INSERT INTO restaurants (id, name) VALUES (7, 'Test Restaurant');")
+        conn.commit()
+        conn.close()
+
+        pool = ConnectionPool(lambda: connect(path), min_size=0, max_size=2)
+        monkeypatch.setattr(menu_item, "IS_SQLITE", True)
+        monkeypatch.setattr(menu_item, "get_pool", lambda: pool)
+        yield pool
+        pool.close()
+
+    def count(self, pool):
+        with pool.connection() as conn:
+            cur = conn.cursor()
+            cur.execute("SELECT COUNT(*) AS n FROM menu_items WHERE restaurant_id = 7;")
+            return cur.fetchone()["n"]
+
+    def test_commit(self, pool):
+        """Test every batch lands once the import commits"""
+        importer = menu_item.MenuImport(7)
+        importer.write([("Dosa", 4.5, "Main Course", None)])
+        importer.write([("Idli", 3.0, None, None), ("Vada", 2.0, None, None)])
+
+        assert importer.commit() == 3
+        assert self.count(pool) == 3
+        assert pool.idle == 1
+
+    def test_no_connection_while_staging(self, pool):
+        """Test writes are staged without checking out a connection"""
+        importer = menu_item.MenuImport(7)
+        importer.write([("Dosa", 4.5, None, None)])
+
+        assert pool.size == 0
+        importer.abort()
+
+    def test_special_characters_round_trip(self, pool):
+        """Test tabs, newlines, backslashes and NULLs survive staging"""
+        importer = menu_item.MenuImport(7)
+        importer.write([("Tab\there\nnew \\N", 4.5, None, "a\\b")])
+        importer.commit()
+
+        with pool.connection() as conn:
+            cur = conn.cursor()
+            cur.execute("SELECT name, price, category, image FROM menu_items WHERE restaurant_id = 7;")
+            row = cur.fetchone()
+        assert (row["name"], row["price"], row["category"], row["image"]) == ("Tab\there\nnew \\N", 4.5, None, "a\\b")
+
+    def test_abort_rolls_back(self, pool):
+        """Test an aborted import leaves no rows behind"""
+        importer = menu_item.MenuImport(7)
+        importer.write([("Dosa", 4.5, None, None)])
+        importer.abort()
+
+        assert self.count(pool) == 0
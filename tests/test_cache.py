@@ -0,0 +1,254 @@
+# tests/test_cache.py
+import time
+from datetime import datetime, timedelta
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.database import PoolTimeoutError
+from app.models import menu_item, users
+from app.utils import auth
+from app.utils.cache import TTLCache
+from app.utils.pagination import encode_cursor
+
+client = TestClient(app)
+
+
+class TestTTLCache:
+    """Test cases for the bounded LRU/TTL cache"""
+
+    def test_hit_and_miss_counters(self):
+        """Test lookups are counted as hits or misses"""
+        cache = TTLCache(maxsize=10, ttl=60)
+        cache.set("a", 1)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_least_recently_used_is_evicted(self):
+        """Test the cache stays bounded by evicting the least recently used key"""
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.stats()["evictions"] == 1
+
+    def test_entries_expire(self):
+        """Test entries older than the TTL are not served"""
+        cache = TTLCache(maxsize=10, ttl=0.01)
+        cache.set("a", 1)
+        time.sleep(0.02)
+
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_total_size_is_tracked(self):
+        """Test the sizeof function feeds the total size metric"""
+        cache = TTLCache(maxsize=1, ttl=60, sizeof=len)
+        cache.set("a", b"12345")
+        assert cache.stats()["total_size"] == 5
+
+        cache.set("b", b"12")
+        assert cache.stats()["total_size"] == 2
+
+        cache.invalidate("b")
+        assert cache.stats()["total_size"] == 0
+
+    def test_total_size_is_bounded(self):
+        """Test least recently used entries are evicted to stay under maxbytes"""
+        cache = TTLCache(maxsize=10, ttl=60, sizeof=len, maxbytes=8)
+        cache.set("a", b"12345")
+        cache.set("b", b"123")
+        cache.get("a")
+        cache.set("c", b"12")
+
+        assert cache.get("b") is None
+        assert cache.stats()["total_size"] == 7
+        assert cache.set("d", b"123456789") is False
+
+    def test_set_after_invalidation_is_dropped(self):
+        """Test a value loaded before an invalidation is not stored"""
+        cache = TTLCache(maxsize=10, ttl=60)
+        generation = cache.generation
+        cache.invalidate("a")
+
+        assert cache.set("a", "stale", generation=generation) is False
+        assert cache.get("a") is None
+
+
+class TestMenuCache:
+    """Test cases for the menu read-through cache"""
+
+    @pytest.fixture(autouse=True)
+    def fake_menu(self, monkeypatch):
+        """Serve menu rows from memory and count the reads"""
+        reads = []
+        rows = [{
+            "id": 1, "name": "Test Idli", "price": 3.5, "category": None,
+            "image": None, "created_at": datetime(2024, 1, 1),
+        }]
+
+        def get_menu_items_by_restaurant(restaurant_id, limit, after=None):
+            reads.append(restaurant_id)
+            return list(rows)
+
+        monkeypatch.setattr(menu_item, "get_menu_items_by_restaurant", get_menu_items_by_restaurant)
+        monkeypatch.setattr(
+            menu_item, "get_menu_version",
+            lambda restaurant_id: {"menu_version": 1, "menu_updated_at": datetime(2024, 1, 1)},
+        )
+        menu_item.menu_cache.clear()
+        yield {"reads": reads, "rows": rows}
+        menu_item.menu_cache.clear()
+
+    def test_repeat_reads_are_served_from_cache(self, fake_menu):
+        """Test the second request for a menu does not query the database"""
+        first = client.get("/api/menu/7")
+        second = client.get("/api/menu/7")
+
+        assert first.headers["X-Cache"] == "MISS"
+        assert second.headers["X-Cache"] == "HIT"
+        assert second.content == first.content
+        assert second.json()[0]["name"] == "Test Idli"
+        assert fake_menu["reads"] == [7]
+
+    def test_pages_are_cached_separately(self, fake_menu):
+        """Test different page sizes are separate cache entries"""
+        client.get("/api/menu/7?limit=10")
+        response = client.get("/api/menu/7?limit=20")
+
+        assert response.headers["X-Cache"] == "MISS"
+        assert fake_menu["reads"] == [7, 7]
+
+    def test_later_pages_are_not_cached(self, fake_menu):
+        """Test pages requested with a cursor are read every time"""
+        cursor = encode_cursor(datetime(2024, 1, 1), 1)
+        client.get("/api/menu/7", params={"cursor": cursor})
+        response = client.get("/api/menu/7", params={"cursor": cursor})
+
+        assert response.headers["X-Cache"] == "MISS"
+        assert fake_menu["reads"] == [7, 7]
+
+    def test_page_sizes_per_restaurant_are_bounded(self, fake_menu, monkeypatch):
+        """Test only the most recent MENU_CACHE_PAGES page sizes of a menu are kept"""
+        monkeypatch.setattr(menu_item, "MENU_CACHE_PAGES", 2)
+        for limit in (10, 20, 30):
+            client.get("/api/menu/7", params={"limit": limit})
+
+        assert sorted(menu_item.menu_cache.get(7)) == [20, 30]
+
+    def test_missing_restaurant_is_not_cached(self, fake_menu, monkeypatch):
+        """Test an empty menu for a restaurant that does not exist is not kept"""
+        monkeypatch.setattr(menu_item, "get_menu_version", lambda restaurant_id: None)
+
+        client.get("/api/menu/8")
+
+        assert menu_item.menu_cache.get(8) is None
+
+    def test_invalidation_reloads_menu(self, fake_menu):
+        """Test an invalidated menu is read again"""
+        client.get("/api/menu/7")
+        fake_menu["rows"].append({**fake_menu["rows"][0], "id": 2, "name": "Test Vada"})
+        menu_item.invalidate_menu_cache(7)
+
+        response = client.get("/api/menu/7")
+
+        assert response.headers["X-Cache"] == "MISS"
+        assert [item["name"] for item in response.json()] == ["Test Idli", "Test Vada"]
+
+    def test_failed_reads_are_not_cached(self, monkeypatch):
+        """Test errors propagate instead of caching an empty menu"""
+        def busy(restaurant_id, limit, after=None):
+            raise PoolTimeoutError("busy")
+
+        monkeypatch.setattr(menu_item, "get_menu_items_by_restaurant", busy)
+
+        assert client.get("/api/menu/7").status_code == 503
+        assert menu_item.menu_cache.get(7) is None
+
+
+class TestAuthCaches:
+    """Test cases for the verified-token and current-user caches"""
+
+    @pytest.fixture(autouse=True)
+    def fake_users(self, monkeypatch):
+        """Serve user rows from memory and count the reads"""
+        reads = []
+
+        def get_user_by_email(email):
+            reads.append(email)
+            return {
+                "id": 1, "name": "Test User", "email": email, "password": "hash",
+                "role": "customer", "created_at": datetime(2024, 1, 1),
+            }
+
+        monkeypatch.setattr(users, "get_user_by_email", get_user_by_email)
+        auth.token_cache.clear()
+        users.user_cache.clear()
+        yield reads
+        auth.token_cache.clear()
+        users.user_cache.clear()
+
+    @pytest.fixture
+    def decodes(self, monkeypatch):
+        """Count JWT signature verifications"""
+        calls = []
+        decode = auth.jwt.decode
+
+        def counting_decode(*args, **kwargs):
+            calls.append(args[0])
+            return decode(*args, **kwargs)
+
+        monkeypatch.setattr(auth.jwt, "decode", counting_decode)
+        return calls
+
+    def test_repeat_requests_skip_verification_and_lookup(self, fake_users, decodes):
+        """Test the second /me with a token neither re-verifies it nor queries the user"""
+        token = auth.create_access_token({"sub": "cached@example.com"})
+        headers = {"Authorization": f"Bearer {token}"}
+
+        first = client.get("/api/users/me", headers=headers)
+        second = client.get("/api/users/me", headers=headers)
+
+        assert first.status_code == second.status_code == 200
+        assert second.json() == first.json()
+        assert "password" not in users.user_cache.get("cached@example.com")
+        assert decodes == [token]
+        assert fake_users == ["cached@example.com"]
+
+    def test_token_entry_expires_with_token(self):
+        """Test a token is cached only until its own expiry, not for the cache's default TTL"""
+        token = auth.create_access_token({"sub": "a@example.com"}, expires_delta=timedelta(seconds=30))
+
+        auth.decode_access_token(token)
+        expires_at = auth.token_cache._data[token][0]
+
+        assert expires_at - time.monotonic() <= 30
+
+    def test_invalid_tokens_are_not_cached(self):
+        """Test a token failing verification is rejected every time"""
+        for _ in range(2):
+            response = client.get("/api/users/me", headers={"Authorization": "Bearer not-a-token"})
+            assert response.status_code == 401
+        assert len(auth.token_cache) == 0
+
+    def test_deleted_user_is_invalidated(self, fake_users):
+        """Test invalidation drops the cached user so the next request reads it again"""
+        token = auth.create_access_token({"sub": "gone@example.com"})
+        headers = {"Authorization": f"Bearer {token}"}
+        client.get("/api/users/me", headers=headers)
+
+        users.invalidate_user_cache("gone@example.com")
+        client.get("/api/users/me", headers=headers)
+
+        assert fake_users == ["gone@example.com", "gone@example.com"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
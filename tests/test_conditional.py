@@ -0,0 +1,155 @@
+# tests/test_conditional.py
+from datetime import datetime
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.models import menu_item, resturants
+from app.schemas.restaurant import RestaurantResponse
+from app.utils.conditional import Validators
+
+client = TestClient(app)
+
+
+class FakeRequest:
+    def __init__(self, **headers):
+        self.headers = {name.replace("_", "-"): value for name, value in headers.items()}
+
+
+class TestValidators:
+    """Test cases for evaluating If-None-Match / If-Modified-Since"""
+
+    validators = Validators("menu", 7, 3, last_modified=datetime(2024, 5, 1, 12, 0, 0, 500000))
+
+    def test_headers(self):
+        """Test responses carry a strong ETag and a second-resolution Last-Modified"""
+        headers = self.validators.headers
+
+        assert headers["ETag"].startswith('"') and not headers["ETag"].startswith("W/")
+        assert headers["Last-Modified"] == "Wed, 01 May 2024 12:00:00 GMT"
+        assert headers["Cache-Control"] == "no-cache"
+
+    def test_etag_changes_with_version(self):
+        """Test a new version or another page gets a different ETag"""
+        assert Validators("menu", 7, 4).etag != Validators("menu", 7, 3).etag
+        assert Validators("menu", 7, 3, (100, None)).etag != Validators("menu", 7, 3, (10, None)).etag
+
+    @pytest.mark.parametrize("header, current", [
+        ("{etag}", True),
+        ('"other", {etag}', True),
+        ("W/{etag}", True),
+        ("*", True),
+        ('"other"', False),
+    ])
+    def test_if_none_match(self, header, current):
+        """Test If-None-Match lists, weak tags and * are all understood"""
+        request = FakeRequest(if_none_match=header.format(etag=self.validators.etag))
+
+        assert self.validators.is_current(request) is current
+
+    @pytest.mark.parametrize("header, current", [
+        ("Wed, 01 May 2024 12:00:00 GMT", True),
+        ("Thu, 02 May 2024 00:00:00 GMT", True),
+        ("Wed, 01 May 2024 11:59:59 GMT", False),
+        ("not a date", False),
+    ])
+    def test_if_modified_since(self, header, current):
+        """Test If-Modified-Since compares at one-second resolution"""
+        assert self.validators.is_current(FakeRequest(if_modified_since=header)) is current
+
+    def test_if_none_match_takes_precedence(self):
+        """Test a stale ETag is not overridden by a recent If-Modified-Since"""
+        request = FakeRequest(if_none_match='"other"', if_modified_since="Thu, 02 May 2024 00:00:00 GMT")
+
+        assert not self.validators.is_current(request)
+
+
+@pytest.fixture
+def reads(monkeypatch):
+    """Serve restaurants and menus from memory and count the body reads"""
+    reads = []
+    version = {"version": 2, "menu_version": 5, "updated_at": datetime(2024, 5, 1)}
+
+    def read(name, value):
+        def fn(*args, **kwargs):
+            reads.append(name)
+            return value
+        return fn
+
+    monkeypatch.setattr(resturants, "get_restaurants_version", lambda: version)
+    monkeypatch.setattr(resturants, "get_restaurant_version", lambda rest_id: version if rest_id == 7 else None)
+    monkeypatch.setattr(menu_item, "get_menu_version", lambda restaurant_id: {
+        "menu_version": version["menu_version"], "menu_updated_at": version["updated_at"],
+    })
+    monkeypatch.setattr(resturants, "get_restaurants", read("restaurants", [
+        {"id": 7, "name": "Test Restaurant", "created_at": datetime(2024, 1, 1)},
+    ]))
+    monkeypatch.setattr(resturants, "get_restaurant_by_id", read("restaurant", RestaurantResponse(
+        id=7, name="Test Restaurant", created_at=datetime(2024, 1, 1),
+    )))
+    monkeypatch.setattr(menu_item, "get_menu_items_by_restaurant", read("menu", [
+        {"id": 1, "name": "Test Idli", "price": 3.5, "category": None, "image": None,
+         "created_at": datetime(2024, 1, 1)},
+    ]))
+    menu_item.menu_cache.clear()
+    yield {"reads": reads, "version": version}
+    menu_item.menu_cache.clear()
+
+
+class TestConditionalRoutes:
+    """Test cases for 304 responses from the restaurant and menu routes"""
+
+    @pytest.mark.parametrize("url, read", [
+        ("/api/restaurants/", "restaurants"),
+        ("/api/restaurants/7", "restaurant"),
+        ("/api/menu/7", "menu"),
+    ])
+    def test_revalidation(self, reads, url, read):
+        """Test a matching If-None-Match gets an empty 304 without reading the body"""
+        first = client.get(url)
+        menu_item.menu_cache.clear()
+
+        second = client.get(url, headers={"If-None-Match": first.headers["ETag"]})
+
+        assert first.status_code == 200
+        assert second.status_code == 304
+        assert second.content == b""
+        assert second.headers["ETag"] == first.headers["ETag"]
+        assert reads["reads"] == [read]
+
+    @pytest.mark.parametrize("url, key", [
+        ("/api/restaurants/", "version"),
+        ("/api/restaurants/7", "version"),
+        ("/api/menu/7", "menu_version"),
+    ])
+    def test_changes_are_resent(self, reads, url, key):
+        """Test a new version answers an old ETag with the full body"""
+        etag = client.get(url).headers["ETag"]
+        reads["version"][key] += 1
+        menu_item.menu_cache.clear()
+
+        response = client.get(url, headers={"If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+
+    def test_if_modified_since(self, reads):
+        """Test Last-Modified can be used to revalidate a restaurant"""
+        last_modified = client.get("/api/restaurants/7").headers["Last-Modified"]
+
+        response = client.get("/api/restaurants/7", headers={"If-Modified-Since": last_modified})
+
+        assert response.status_code == 304
+
+    def test_cached_menu_revalidates_without_the_database(self, reads, monkeypatch):
+        """Test a cached menu page answers If-None-Match with no version lookup"""
+        etag = client.get("/api/menu/7").headers["ETag"]
+        monkeypatch.setattr(menu_item, "get_menu_version", None)
+
+        response = client.get("/api/menu/7", headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.headers["X-Cache"] == "HIT"
+
+    def test_missing_restaurant(self, reads):
+        """Test unknown restaurants are still a 404 and unknown menus still empty"""
+        assert client.get("/api/restaurants/8").status_code == 404
@@ -0,0 +1,446 @@
+# tests/test_database.py
+import asyncio
+import threading
+import psycopg2
+import pytest
+from psycopg2 import extensions
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+from app import database, database_async
+from app.database import (
+    NUMERIC_AS_FLOAT, ConnectionPool, PoolTimeoutError, PreparedStatement, Replica, ReplicaRoutingMiddleware,
+    execute_prepared, prepared_statement, read_connection,
+)
+from app.database_async import async_variant, run_query
+from app.database_sqlite import connect
+
+
+class FakeConnection:
+    """Minimal stand-in for a psycopg2 connection, tracking pool interactions"""
+
+    def __init__(self):
+        self.closed = 0
+        self.in_transaction = False
+        self.rollbacks = 0
+
+    def get_transaction_status(self):
+        if self.in_transaction:
+            return extensions.TRANSACTION_STATUS_INTRANS
+        return extensions.TRANSACTION_STATUS_IDLE
+
+    def cursor(self):
+        conn = self
+
+        class Cursor:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+            def execute(self, query, params=None):
+                conn.in_transaction = True
+
+        return Cursor()
+
+    def rollback(self):
+        self.in_transaction = False
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = 1
+
+
+@pytest.fixture
+def connections():
+    return []
+
+
+@pytest.fixture
+def make_pool(connections):
+    def factory(**kwargs):
+        def connect():
+            conn = FakeConnection()
+            connections.append(conn)
+            return conn
+        settings = dict(min_size=0, max_size=2, timeout=0.1, max_lifetime=3600, health_check_interval=3600)
+        settings.update(kwargs)
+        return ConnectionPool(connect, **settings)
+    return factory
+
+
+class TestConnectionPool:
+    """Test cases for the pooled connection manager"""
+
+    def test_connection_is_reused(self, make_pool, connections):
+        """Test a returned connection is handed out again instead of reconnecting"""
+        pool = make_pool()
+        with pool.connection() as first:
+            pass
+        with pool.connection() as second:
+            pass
+
+        assert first is second
+        assert len(connections) == 1
+        assert pool.idle == 1
+
+    def test_pool_is_bounded(self, make_pool):
+        """Test checkout times out once max_size connections are in use"""
+        pool = make_pool(max_size=1)
+        conn = pool.getconn()
+
+        with pytest.raises(PoolTimeoutError):
+            pool.getconn()
+
+        pool.putconn(conn)
+        assert pool.getconn() is conn
+
+    def test_waiting_checkout_gets_returned_connection(self, make_pool):
+        """Test a blocked checkout is woken up when a connection is returned"""
+        pool = make_pool(max_size=1, timeout=5)
+        conn = pool.getconn()
+        result = {}
+
+        waiter = threading.Thread(target=lambda: result.setdefault("conn", pool.getconn()))
+        waiter.start()
+        pool.putconn(conn)
+        waiter.join(timeout=5)
+
+        assert result["conn"] is conn
+
+    def test_open_transaction_is_rolled_back_on_return(self, make_pool):
+        """Test uncommitted work is discarded before a connection is reused"""
+        pool = make_pool()
+        with pool.connection() as conn:
+            conn.in_transaction = True
+
+        assert conn.rollbacks == 1
+        assert conn.get_transaction_status() == extensions.TRANSACTION_STATUS_IDLE
+
+    def test_expired_connection_is_recycled(self, make_pool, connections):
+        """Test connections older than max_lifetime are closed instead of reused"""
+        pool = make_pool(max_lifetime=0)
+        with pool.connection() as first:
+            pass
+        with pool.connection() as second:
+            pass
+
+        assert first is not second
+        assert first.closed
+        assert len(connections) == 2
+
+    def test_broken_connection_is_replaced_on_checkout(self, make_pool, connections):
+        """Test a connection closed by the server is not handed out"""
+        pool = make_pool()
+        with pool.connection() as first:
+            pass
+        first.closed = 1
+
+        with pool.connection() as second:
+            assert not second.closed
+
+        assert first is not second
+        assert pool.size == 1
+
+    def test_idle_connection_is_health_checked(self, make_pool):
+        """Test idle connections are pinged on checkout"""
+        pool = make_pool(health_check_interval=0)
+        with pool.connection() as first:
+            pass
+        with pool.connection() as second:
+            pass
+
+        assert first is second
+        assert second.rollbacks == 1  # ping transaction is closed again
+
+    def test_close_pool(self, make_pool):
+        """Test closing the pool closes idle connections"""
+        pool = make_pool(min_size=2)
+        pool.close()
+
+        assert pool.size == 0
+
+
+class TestRunQuery:
+    """Test cases for dispatching model calls between the sync and async engines"""
+
+    @staticmethod
+    def lookup(key):
+        return ("sync", key)
+
+    def test_sync_engine_runs_in_threadpool(self, monkeypatch):
+        """Test the sync model function is used when DB_ASYNC is off"""
+        monkeypatch.setattr(database_async, "DB_ASYNC", False)
+
+        assert asyncio.run(run_query(self.lookup, 1)) == ("sync", 1)
+
+    def test_async_engine_uses_registered_variant(self, monkeypatch):
+        """Test the registered async variant is awaited when DB_ASYNC is on"""
+        monkeypatch.setattr(database_async, "DB_ASYNC", True)
+
+        def lookup(key):
+            return ("sync", key)
+
+        @async_variant(lookup)
+        async def lookup_async(key):
+            return ("async", key)
+
+        assert asyncio.run(run_query(lookup, key=2)) == ("async", 2)
+
+    def test_async_engine_falls_back_without_variant(self, monkeypatch):
+        """Test functions without an async variant still run in async mode"""
+        monkeypatch.setattr(database_async, "DB_ASYNC", True)
+
+        assert asyncio.run(run_query(self.lookup, 3)) == ("sync", 3)
+
+
+
+class TestPreparedStatements:
+    """Test cases for preparing hot queries once per connection"""
+
+    class Cursor:
+        def __init__(self, connection):
+            self.connection = connection
+            self.executed = []
+
+        def execute(self, query, vars=None):
+            self.executed.append((query, vars))
+
+    class Connection:
+        def __init__(self):
+            self.prepared_statements = set()
+
+    statement = PreparedStatement("find_item", "SELECT id FROM items WHERE shop_id = %s AND name LIKE 'a%%' LIMIT %s;")
+
+    def test_placeholders_are_numbered(self):
+        """Test the PREPARE uses $n parameters and the EXECUTE passes them positionally"""
+        assert self.statement.prepare_sql == (
+            "PREPARE find_item AS SELECT id FROM items WHERE shop_id = $1 AND name LIKE 'a%' LIMIT $2;"
+        )
+        assert self.statement.execute_sql == "EXECUTE find_item (%s, %s);"
+        assert PreparedStatement("now", "SELECT NOW();").execute_sql == "EXECUTE now;"
+
+    def test_prepared_once_per_connection(self, monkeypatch):
+        """Test the first use on a connection prepares the statement and later uses only execute it"""
+        monkeypatch.setattr(database, "DB_PREPARED_STATEMENTS", True)
+        first, second = self.Connection(), self.Connection()
+        cur = self.Cursor(first)
+
+        execute_prepared(cur, self.statement, (1, 10))
+        execute_prepared(cur, self.statement, (2, 10))
+        other = self.Cursor(second)
+        execute_prepared(other, self.statement, (1, 10))
+
+        assert [query for query, _ in cur.executed] == [
+            self.statement.prepare_sql, self.statement.execute_sql, self.statement.execute_sql,
+        ]
+        assert cur.executed[-1][1] == (2, 10)
+        assert [query for query, _ in other.executed] == [self.statement.prepare_sql, self.statement.execute_sql]
+
+    def test_disabled(self, monkeypatch):
+        """Test the query text is sent as-is when prepared statements are turned off"""
+        monkeypatch.setattr(database, "DB_PREPARED_STATEMENTS", False)
+        cur = self.Cursor(self.Connection())
+
+        execute_prepared(cur, self.statement, (1, 10))
+
+        assert cur.executed == [(self.statement.query, (1, 10))]
+
+    def test_sqlite_runs_the_query_text(self, tmp_path):
+        """Test SQLite cursors, which cache compiled statements themselves, run the query directly"""
+        conn = connect(str(tmp_path / "prepared.db"))
+        cur = conn.cursor()
+
+        execute_prepared(cur, PreparedStatement("add", "SELECT %s + %s AS total;"), (1, 2))
+
+        assert cur.fetchone() == {"total": 3}
+        conn.close()
+
+    def test_names_are_unique(self):
+        """Test a name can only be registered for one query"""
+        statement = prepared_statement("test_lookup", "SELECT 1;")
+
+        assert prepared_statement("test_lookup", "SELECT 1;") is statement
+        with pytest.raises(ValueError):
+            prepared_statement("test_lookup", "SELECT 2;")
+
+
+class FakeReplicaConnection(FakeConnection):
+    """FakeConnection that answers the replication lag query"""
+
+    def __init__(self, replica):
+        super().__init__()
+        self.replica = replica
+
+    def cursor(self):
+        conn = self
+
+        class Cursor:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+            def execute(self, query, params=None):
+                conn.in_transaction = True
+                conn.replica.lag_checks += 1
+
+            def fetchone(self):
+                return {"lag": conn.replica.current_lag}
+
+        return Cursor()
+
+
+@pytest.fixture
+def replicas(monkeypatch, make_pool):
+    """Route reads over two fake replicas (lag 0 until changed) in front of a fake primary"""
+    def make_replica(name):
+        def connect():
+            if replica.down:
+                raise psycopg2.OperationalError(f"{name} is down")
+            return FakeReplicaConnection(replica)
+        replica = Replica(ConnectionPool(connect, min_size=0, max_size=2, timeout=0.1))
+        replica.name, replica.current_lag, replica.lag_checks, replica.down = name, 0.0, 0, False
+        return replica
+
+    replicas = [make_replica("first"), make_replica("second")]
+    primary = make_pool()
+    monkeypatch.setattr(database, "_replicas", replicas)
+    monkeypatch.setattr(database, "_pool", primary)
+    monkeypatch.setattr(database, "DB_REPLICA_MAX_LAG", 5)
+    monkeypatch.setattr(database, "DB_REPLICA_LAG_CHECK_INTERVAL", 0)
+    return replicas
+
+
+def read_from():
+    """Name of the replica serving a read, or primary"""
+    with read_connection() as conn:
+        return conn.replica.name if isinstance(conn, FakeReplicaConnection) else "primary"
+
+
+class TestReplicaRouting:
+    """Test cases for sending reads to read replicas"""
+
+    def test_reads_are_spread_over_replicas(self, replicas):
+        """Test reads take turns between caught-up replicas"""
+        assert sorted(read_from() for _ in range(4)) == ["first", "first", "second", "second"]
+
+    def test_without_replicas(self, make_pool, monkeypatch):
+        """Test reads use the primary when no replica is configured"""
+        monkeypatch.setattr(database, "_replicas", [])
+        monkeypatch.setattr(database, "_pool", make_pool())
+
+        assert read_from() == "primary"
+
+    def test_lagging_replica_is_skipped(self, replicas):
+        """Test a replica too far behind is skipped, and the primary used if all are"""
+        replicas[0].current_lag = 30
+
+        assert {read_from() for _ in range(4)} == {"second"}
+
+        replicas[1].current_lag = 30
+
+        assert read_from() == "primary"
+
+    def test_disconnected_replica_is_skipped(self, replicas):
+        """Test a replica whose lag cannot be told (no streaming WAL receiver) counts as lagging"""
+        replicas[0].current_lag = None
+
+        assert {read_from() for _ in range(4)} == {"second"}
+        assert replicas[0].lag is None
+
+    def test_lag_is_measured_periodically(self, replicas, monkeypatch):
+        """Test the lag query runs at most once per check interval"""
+        monkeypatch.setattr(database, "DB_REPLICA_LAG_CHECK_INTERVAL", 3600)
+        for _ in range(6):
+            read_from()
+
+        assert [replica.lag_checks for replica in replicas] == [1, 1]
+
+    def test_unavailable_replica_is_skipped(self, replicas):
+        """Test a replica that cannot be reached is skipped"""
+        replicas[1].down = True
+
+        assert {read_from() for _ in range(4)} == {"first"}
+
+    def test_request_reads_from_one_replica(self, replicas):
+        """Test every read of a request goes to the replica it first used"""
+        async def request():
+            token = database._request_routing.set(database.RequestRouting())
+            try:
+                return [read_from() for _ in range(3)]
+            finally:
+                database._request_routing.reset(token)
+
+        for _ in range(2):
+            served = asyncio.run(request())
+            assert len(set(served)) == 1 and served[0] != "primary"
+
+    def test_reads_after_a_write_use_the_primary(self, replicas):
+        """Test a request's reads go to the primary once it has committed"""
+        def endpoint(request):
+            before = read_from()
+            database._record_write()
+            return PlainTextResponse(f"{before} {read_from()}")
+
+        app = Starlette(routes=[
+            Route("/", endpoint, methods=["POST"]),
+            Route("/read", lambda request: PlainTextResponse(read_from())),
+        ])
+        client = TestClient(ReplicaRoutingMiddleware(app))
+
+        response = client.post("/")
+
+        assert response.text.split()[1] == "primary"
+        assert response.text.split()[0] != "primary"
+        assert "db_primary=1" in response.headers["set-cookie"]
+
+        # The same client keeps reading from the primary while the cookie lasts
+        sticky = client.get("/read")
+        assert sticky.text == "primary"
+        assert "set-cookie" not in sticky.headers
+
+        client.cookies.clear()
+        assert client.get("/read").text != "primary"
+
+    @pytest.mark.parametrize("seconds, max_age", [(0.5, 1), (5, 5), (2.1, 3)])
+    def test_sticky_cookie_lasts_at_least_the_setting(self, monkeypatch, seconds, max_age):
+        """Test fractional sticky periods round up instead of expiring the cookie at once"""
+        monkeypatch.setattr(database, "DB_REPLICA_STICKY_SECONDS", seconds)
+
+        _, cookie = ReplicaRoutingMiddleware(None).sticky_header
+
+        assert f"Max-Age={max_age};".encode() in cookie
+
+
+class TestNumericAdaptation:
+    """Test cases for loading NUMERIC columns as float"""
+
+    def test_sync_connections_cast_numeric_to_float(self):
+        """Test the psycopg2 typecaster parses NUMERIC text straight to float"""
+        assert NUMERIC_AS_FLOAT("12.50", None) == 12.5
+        assert isinstance(NUMERIC_AS_FLOAT("3", None), float)
+        assert NUMERIC_AS_FLOAT(None, None) is None
+
+    def test_async_connections_load_numeric_as_float(self):
+        """Test the async pool's connection setup registers a float loader for NUMERIC"""
+        psycopg = pytest.importorskip("psycopg")
+        from psycopg.adapt import AdaptersMap
+        from psycopg.pq import Format
+
+        class Connection:
+            adapters = AdaptersMap(psycopg.adapters)
+
+        conn = Connection()
+        asyncio.run(database_async._configure_connection(conn))
+        oid = psycopg.adapters.types["numeric"].oid
+        loader = conn.adapters.get_loader(oid, Format.TEXT)(oid)
+
+        assert loader.load(b"12.50") == 12.5
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,211 @@
+# tests/test_database_sqlite.py
+import sqlite3
+from datetime import datetime
+from decimal import Decimal
+import pytest
+from app import database_sqlite
+from app.database_sqlite import connect, split_statements, translate
+from app.migrate import MIGRATIONS_ROOT
+from app.models import menu_item, orders, resturants
+from app.utils.pagination import keyset_condition
+
+
+@pytest.fixture
+def conn(tmp_path):
+    """A fresh SQLite database with the SQLite migrations applied"""
+    conn = connect(str(tmp_path / "test.db"))
+    cur = conn.cursor()
+    for path in sorted((MIGRATIONS_ROOT / "sqlite").glob("*.sql")):
+        for statement in split_statements(path.read_text()):
+            cur.execute(statement)
+    cur.execute("INSERT INTO restaurants (name) VALUES (%s) RETURNING id;", ("Test Restaurant",))
+    restaurant_id = cur.fetchone()["id"]
+    cur.execute("INSERT INTO users (name, email, password) VALUES (%s, %s, %s) RETURNING id;",
+                ("Test User", "test@example.com", "hash"))
+    conn.ids = (restaurant_id, cur.fetchone()["id"])
+    conn.commit()
+    cur.close()
+    yield conn
+    conn.close()
+
+
+class TestTranslate:
+    """Test cases for rewriting psycopg2-style SQL for SQLite"""
+
+    def test_placeholders_and_escaped_percent(self):
+        """Test %s becomes ? and %% becomes a literal %"""
+        assert translate("SELECT * FROM t WHERE a = %s AND b LIKE 'x%%';") == \
+            "SELECT * FROM t WHERE a = ? AND b LIKE 'x%';"
+
+    def test_any_array_parameter(self):
+        """Test = ANY(%s) is rewritten to a json_each membership test"""
+        assert translate("WHERE id = ANY(%s)") == "WHERE id IN (SELECT value FROM json_each(?))"
+
+    def test_now(self):
+        """Test NOW() uses the same text format as the column defaults"""
+        assert translate("SET updated_at = NOW()") == "SET updated_at = " + database_sqlite.TIMESTAMP_SQL
+        assert translate("SET updated_at = timezone('UTC', now())") == "SET updated_at = " + database_sqlite.TIMESTAMP_SQL
+
+    def test_split_statements(self):
+        """Test scripts are split on complete statements, ignoring trailing comments"""
+        script = "-- header\nCREATE TABLE a (x TEXT DEFAULT ';');\nCREATE INDEX i ON a (x);\n-- end\n"
+
+        assert split_statements(script) == [
+            "-- header\nCREATE TABLE a (x TEXT DEFAULT ';');", "CREATE INDEX i ON a (x);",
+        ]
+
+
+class TestSQLiteConnection:
+    """Test cases for the psycopg2-compatible SQLite connection"""
+
+    def test_pragmas(self, conn):
+        """Test connections run in WAL mode with foreign keys enforced"""
+        cur = conn.cursor()
+        cur.execute("PRAGMA journal_mode;")
+        assert cur.fetchone()["journal_mode"] == "wal"
+        cur.execute("PRAGMA foreign_keys;")
+        assert cur.fetchone()["foreign_keys"] == 1
+
+    def test_rows_are_dicts_with_python_types(self, conn):
+        """Test rows come back as dicts with datetime and float values, like RealDictCursor"""
+        restaurant_id, _ = conn.ids
+        cur = conn.cursor()
+        cur.execute(menu_item.ADD_MENU_ITEM_QUERY, (restaurant_id, "Dosa", 4.5, None, None))
+        row = cur.fetchone()
+
+        assert row["name"] == "Dosa"
+        assert row["price"] == 4.5
+        assert isinstance(row["created_at"], datetime)
+
+    def test_parameters_and_aggregates_are_converted(self, conn):
+        """Test Decimal, datetime and list parameters bind, and whole NUMERIC sums come back as float"""
+        restaurant_id, _ = conn.ids
+        cur = conn.cursor()
+        cur.execute("INSERT INTO menu_items (restaurant_id, name, price, created_at) VALUES (%s, %s, %s, %s);",
+                    (restaurant_id, "Dosa", Decimal("4"), datetime(2024, 5, 1, 12, 30)))
+        cur.execute("SELECT SUM(price) AS price, MAX(created_at) AS created_at FROM menu_items "
+                    "WHERE restaurant_id = ANY(%s);", ([restaurant_id],))
+        row = cur.fetchone()
+
+        assert row["price"] == 4.0 and isinstance(row["price"], float)
+        assert row["created_at"] == datetime(2024, 5, 1, 12, 30)
+
+    def test_other_sqlite3_connections_are_unaffected(self, conn):
+        """Test the wrapper's conversions do not leak into plain sqlite3 connections"""
+        plain = sqlite3.connect(":memory:", detect_types=sqlite3.PARSE_DECLTYPES)
+        try:
+            plain.execute("CREATE TABLE t (amount NUMERIC);")
+            plain.execute("INSERT INTO t VALUES (2);")
+
+            assert plain.execute("SELECT amount FROM t;").fetchone() == (2,)
+            with pytest.raises(sqlite3.Error):
+                plain.execute("SELECT ?;", ([1, 2],))
+        finally:
+            plain.close()
+
+    def test_transaction_status(self, conn):
+        """Test the pool can tell whether a connection was left mid-transaction"""
+        cur = conn.cursor()
+        cur.execute("INSERT INTO restaurants (name, created_at) VALUES (%s, %s);", ("Other", "2999-01-01 00:00:00.000"))
+        assert conn.get_transaction_status() != 0
+
+        conn.rollback()
+        assert conn.get_transaction_status() == 0
+
+    def test_keyset_pagination(self, conn):
+        """Test keyset cursors built from returned datetimes resume after the last row"""
+        restaurant_id, _ = conn.ids
+        cur = conn.cursor()
+        for n in range(5):
+            cur.execute(menu_item.ADD_MENU_ITEM_QUERY, (restaurant_id, f"Dish {n}", 1, None, None))
+        seen = []
+        after = None
+        while True:
+            keyset, params = keyset_condition(after)
+            cur.execute(menu_item.GET_MENU_ITEMS_QUERY.format(keyset=keyset), (restaurant_id, *params, 2))
+            rows = cur.fetchall()
+            if not rows:
+                break
+            seen.extend(row["name"] for row in rows)
+            after = (rows[-1]["created_at"], rows[-1]["id"])
+
+        assert seen == [f"Dish {n}" for n in range(5)]
+
+    def test_create_order_and_cascade(self, conn):
+        """Test orders are inserted with their items and removed with their restaurant"""
+        restaurant_id, customer_id = conn.ids
+        cur = conn.cursor()
+        cur.execute(menu_item.ADD_MENU_ITEM_QUERY, (restaurant_id, "Idli", 3, None, None))
+        menu_id = cur.fetchone()["id"]
+
+        order = orders._insert_order_sqlite(
+            cur, customer_id, restaurant_id, 6.0,
+            [{"menu_item_id": menu_id, "quantity": 2, "price": 3.0}], "Unpaid",
+        )
+        cur.execute(orders.GET_ITEMS_FOR_ORDERS_QUERY, ([order["id"]],))
+        items = cur.fetchall()
+
+        assert order["restaurant_name"] == "Test Restaurant"
+        assert [(item["order_id"], item["quantity"]) for item in items] == [(order["id"], 2)]
+
+        cur.execute("DELETE FROM restaurants WHERE id = %s;", (restaurant_id,))
+        cur.execute("SELECT COUNT(*) AS n FROM order_items;")
+        assert cur.fetchone()["n"] == 0
+
+
+class TestVersionTriggers:
+    """Test cases for the restaurant and menu versions behind conditional GETs"""
+
+    def versions(self, conn):
+        restaurant_id, _ = conn.ids
+        cur = conn.cursor()
+        cur.execute(resturants.GET_RESTAURANT_VERSION_QUERY, (restaurant_id,))
+        restaurant = cur.fetchone()
+        cur.execute(menu_item.GET_MENU_VERSION_QUERY, (restaurant_id,))
+        return restaurant["version"], cur.fetchone()["menu_version"], restaurant["updated_at"]
+
+    def test_new_restaurants_have_timestamps(self, conn):
+        """Test the insert trigger fills in updated_at"""
+        _, _, updated_at = self.versions(conn)
+
+        assert isinstance(updated_at, datetime)
+
+    def test_menu_changes_bump_only_the_menu_version(self, conn):
+        """Test adding, editing and removing menu items bump menu_version each time"""
+        restaurant_id, _ = conn.ids
+        cur = conn.cursor()
+        cur.execute(menu_item.ADD_MENU_ITEM_QUERY, (restaurant_id, "Dosa", 4.5, None, None))
+        item_id = cur.fetchone()["id"]
+        cur.execute("UPDATE menu_items SET price = 5 WHERE id = %s;", (item_id,))
+        cur.execute(menu_item.DELETE_MENU_ITEM_QUERY, (item_id,))
+
+        assert self.versions(conn)[:2] == (1, 4)
+
+    def test_restaurant_edits_bump_the_version(self, conn):
+        """Test editing a restaurant bumps its version, and a no-op update does not"""
+        restaurant_id, _ = conn.ids
+        cur = conn.cursor()
+        cur.execute("UPDATE restaurants SET phone = %s WHERE id = %s;", ("555-0100", restaurant_id))
+        cur.execute("UPDATE restaurants SET phone = %s WHERE id = %s;", ("555-0100", restaurant_id))
+
+        assert self.versions(conn)[:2] == (2, 1)
+
+    def test_list_version_follows_inserts_deletes_and_renames(self, conn):
+        """Test replacing or renaming a restaurant changes the list version, and a menu change does not"""
+        restaurant_id, _ = conn.ids
+        cur = conn.cursor()
+        cur.execute(resturants.GET_RESTAURANTS_VERSION_QUERY)
+        before = cur.fetchone()
+        cur.execute("DELETE FROM restaurants WHERE id = %s;", (restaurant_id,))
+        cur.execute("INSERT INTO restaurants (name, created_at) VALUES (%s, %s);", ("Other", "2999-01-01 00:00:00.000"))
+        cur.execute(resturants.GET_RESTAURANTS_VERSION_QUERY)
+        after = cur.fetchone()
+        cur.execute("UPDATE restaurants SET name = %s WHERE name = %s;", ("Renamed", "Other"))
+        cur.execute(resturants.GET_RESTAURANTS_VERSION_QUERY)
+        renamed = cur.fetchone()
+        cur.execute("UPDATE restaurants SET phone = %s, menu_version = menu_version + 1;", ("555-0100",))
+        cur.execute(resturants.GET_RESTAURANTS_VERSION_QUERY)
+
+        assert after["version"] == before["version"] + 2
+        assert renamed["version"] == after["version"] + 1
+        assert cur.fetchone() == renamed
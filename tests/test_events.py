@@ -0,0 +1,240 @@
+# tests/test_events.py
+import asyncio
+import json
+import threading
+import time
+from datetime import datetime
+from decimal import Decimal
+import pytest
+from fastapi.testclient import TestClient
+from app.database import ConnectionPool
+from app.database_sqlite import connect, split_statements
+from app.main import app
+from app.migrate import MIGRATIONS_ROOT
+from app.models import orders, resturants
+from app.utils import events
+from app.utils.events import EventHub, encode_event
+
+client = TestClient(app)
+
+
+def parse_frames(body):
+    """[(event, data)] from a text/event-stream body, skipping comments and retry lines"""
+    frames = []
+    for block in body.split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if line and not line.startswith(":"))
+        if "event" in fields:
+            frames.append((fields["event"], json.loads(fields["data"])))
+    return frames
+
+
+def collect(subscription, count, heartbeat=None):
+    async def read():
+        frames = []
+        async for frame in subscription.frames(heartbeat):
+            frames.append(frame)
+            if len(frames) == count:
+                break
+        return frames
+    return read()
+
+
+class TestEventHub:
+    """Test cases for fanning events out to subscribers"""
+
+    def test_publish_from_another_thread(self):
+        """Test events published from worker threads reach subscribers of their topics only"""
+        async def main():
+            hub = EventHub()
+            kitchen = hub.subscribe("restaurant:7")
+            other = hub.subscribe("restaurant:8")
+            thread = threading.Thread(target=hub.publish, args=(("restaurant:7", "order:1"), "order_created", {"id": 1}))
+            thread.start()
+            thread.join()
+            frames = await asyncio.wait_for(collect(kitchen, 1), 5)
+            assert other._queue.empty()
+            return frames
+
+        assert asyncio.run(main()) == [encode_event("order_created", {"id": 1})]
+
+    def test_one_frame_for_several_matching_topics(self):
+        """Test a subscriber to two of an event's topics receives it once"""
+        async def main():
+            hub = EventHub()
+            subscription = hub.subscribe("restaurant:7", "order:1")
+            assert hub.publish(("restaurant:7", "order:1"), "order_updated", {"id": 1}) == 1
+            await asyncio.sleep(0)
+            return subscription._queue.qsize()
+
+        assert asyncio.run(main()) == 1
+
+    def test_slow_subscriber_is_disconnected(self):
+        """Test a subscriber that falls behind is closed after its queued frames"""
+        async def main():
+            hub = EventHub(queue_size=2)
+            subscription = hub.subscribe("restaurant:7")
+            for n in range(3):
+                hub.publish(("restaurant:7",), "order_created", {"id": n})
+            await asyncio.sleep(0)
+            frames = [frame async for frame in subscription.frames()]
+            return frames, subscription.closed, hub.subscriber_count
+
+        frames, closed, remaining = asyncio.run(main())
+        assert len(frames) == 2
+        assert closed and remaining == 0
+
+    def test_keep_alive(self):
+        """Test idle streams get keep-alive comments"""
+        async def main():
+            subscription = EventHub().subscribe("restaurant:7")
+            return await asyncio.wait_for(collect(subscription, 2, heartbeat=0.01), 5)
+
+        assert asyncio.run(main()) == [events.KEEPALIVE_FRAME] * 2
+
+    def test_encode_event(self):
+        """Test frames carry the event name and compact JSON with dates and decimals"""
+        frame = encode_event("order_created", {"total_price": Decimal("9.50"), "created_at": datetime(2024, 5, 1, 10)})
+
+        assert frame == b'event: order_created\ndata: {"total_price":9.5,"created_at":"2024-05-01T10:00:00"}\n\n'
+
+
+@pytest.fixture
+def hub(monkeypatch):
+    hub = EventHub()
+    monkeypatch.setattr(events, "hub", hub)
+    monkeypatch.setattr(orders, "hub", hub)
+    monkeypatch.setattr("app.routes.orders.hub", hub)
+    return hub
+
+
+def publish_when_subscribed(hub, topic, published):
+    """From another thread: wait for a stream on `topic`, publish, then end every stream"""
+    def run():
+        deadline = time.monotonic() + 5
+        while not hub.has_subscribers((topic,)) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        for event, data in published:
+            hub.publish((topic,), event, data)
+        hub.close_all()
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+class TestOrderStreams:
+    """Test cases for the Server-Sent Events order routes"""
+
+    def test_restaurant_stream(self, hub, monkeypatch):
+        """Test a restaurant's stream carries its order events"""
+        monkeypatch.setattr(resturants, "get_restaurant_version", lambda rest_id: {"version": 1})
+        thread = publish_when_subscribed(hub, "restaurant:7", [
+            ("order_created", {"id": 1, "status": "placed"}), ("order_updated", {"id": 1, "status": "delivered"}),
+        ])
+
+        response = client.get("/api/orders/restaurant/7/events")
+        thread.join()
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert response.headers["cache-control"] == "no-cache"
+        assert parse_frames(response.text) == [
+            ("order_created", {"id": 1, "status": "placed"}), ("order_updated", {"id": 1, "status": "delivered"}),
+        ]
+        assert hub.subscriber_count == 0
+
+    def test_order_stream_starts_with_the_order(self, hub, monkeypatch):
+        """Test an order's stream sends its current state before any change"""
+        monkeypatch.setattr(orders, "get_order", lambda order_id: {"id": order_id, "status": "placed"})
+        thread = publish_when_subscribed(hub, "order:5", [("order_updated", {"id": 5, "status": "delivered"})])
+
+        response = client.get("/api/orders/5/events")
+        thread.join()
+
+        assert parse_frames(response.text) == [
+            ("order", {"id": 5, "status": "placed"}), ("order_updated", {"id": 5, "status": "delivered"}),
+        ]
+
+    def test_missing_order(self, hub, monkeypatch):
+        """Test streaming a missing order is a 404 and leaves no subscription behind"""
+        monkeypatch.setattr(orders, "get_order", lambda order_id: None)
+
+        assert client.get("/api/orders/5/events").status_code == 404
+        assert hub.subscriber_count == 0
+
+    def test_failed_load_closes_the_subscription(self, hub, monkeypatch):
+        """Test an error loading the order leaves no subscription behind"""
+        def fail(order_id):
+            raise RuntimeError("database went away")
+        monkeypatch.setattr(orders, "get_order", fail)
+
+        with pytest.raises(RuntimeError):
+            client.get("/api/orders/5/events")
+        assert hub.subscriber_count == 0
+
+    def test_missing_restaurant(self, hub, monkeypatch):
+        """Test streaming a missing restaurant's orders is a 404"""
+        monkeypatch.setattr(resturants, "get_restaurant_version", lambda rest_id: None)
+
+        assert client.get("/api/orders/restaurant/8/events").status_code == 404
+
+
+class TestOrderEventPublishing:
+    """Test cases for where order events come from"""
+
+    def test_notification_loads_new_orders_once(self, monkeypatch):
+        """Test a NOTIFY for a new order is loaded once, off the listener thread, and fanned out; others pass through"""
+        published, loaded = [], []
+        monkeypatch.setattr(orders.hub, "has_subscribers", lambda topics: "restaurant:7" in topics)
+        monkeypatch.setattr(orders.hub, "publish", lambda topics, event, data: published.append((event, data)))
+        monkeypatch.setattr(orders, "get_order", lambda order_id: loaded.append(threading.current_thread()) or {"id": order_id, "items": []})
+        ref = {"id": 1, "restaurant_id": 7, "customer_id": 3, "status": "placed", "payment_status": "Unpaid"}
+
+        orders._on_order_notification(json.dumps({"type": "order_created", **ref}))
+        orders._on_order_notification(json.dumps({"type": "order_updated", **ref, "status": "delivered"}))
+        orders._on_order_notification(json.dumps({"type": "order_created", **ref, "restaurant_id": 8}))
+        orders._event_dispatcher.submit(lambda: None).result()
+
+        assert len(loaded) == 1 and loaded[0] is not threading.current_thread()
+        assert published == [("order_created", {"id": 1, "items": []}), ("order_updated", {**ref, "status": "delivered"})]
+
+    @pytest.fixture
+    def pool(self, tmp_path, monkeypatch):
+        path = str(tmp_path / "events.db")
+        conn = connect(path)
+        cur = conn.cursor()
+        for migration in sorted((MIGRATIONS_ROOT / "sqlite").glob("*.sql")):
+            for statement in split_statements(migration.read_text()):
+                cur.execute(statement)
+        cur.execute("INSERT INTO users (id, name, email, password) VALUES (1, 'Test User', 'test@example.com', 'x');")
+        cur.execute("INSERT INTO restaurants (id, name) VALUES (7, 'Test Restaurant');")
+        cur.execute("INSERT INTO menu_items (id, restaurant_id, name, price) VALUES (1, 7, 'Dosa', 4);")
+        conn.commit()
+        conn.close()
+
+        pool = ConnectionPool(lambda: connect(path), min_size=0, max_size=2)
+        monkeypatch.setattr(orders, "IS_SQLITE", True)
+        monkeypatch.setattr(orders, "db_connection", pool.connection)
+        yield pool
+        pool.close()
+
+    def test_sqlite_publishes_in_process(self, pool, monkeypatch):
+        """Test order changes on SQLite are published straight to the hub"""
+        published = []
+        monkeypatch.setattr(orders.hub, "publish", lambda topics, event, data: published.append((topics, event, data)))
+
+        order = orders.create_order(1, 7, 4, [{"menu_item_id": 1, "quantity": 1, "price": 4}])
+        orders.update_order_status(order["id"], "delivered")
+        orders.update_order_status(order["id"], "delivered")
+        orders.delete_order(order["id"])
+
+        # Setting the status the order already has announces nothing, as on Postgres
+        topics = ("restaurant:7", f"order:{order['id']}")
+        assert [(event_topics, event) for event_topics, event, _ in published] == [
+            (topics, "order_created"), (topics, "order_updated"), (topics, "order_deleted"),
+        ]
+        assert published[0][2]["items"][0]["name"] == "Dosa"
+        assert published[1][2]["status"] == "delivered"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,97 @@
+# tests/test_hashing.py
+import asyncio
+import time
+import pytest
+from fastapi import HTTPException
+from app.utils import hashing
+
+
+@pytest.fixture(autouse=True)
+def fast_bcrypt(monkeypatch):
+    monkeypatch.setattr(hashing, "BCRYPT_ROUNDS", 4)
+
+
+def run_with_pool(coro_fn):
+    """Run coro_fn() with the hashing process pool started, as the app lifespan does"""
+    async def main():
+        hashing.start_hash_workers()
+        try:
+            return await coro_fn()
+        finally:
+            hashing.shutdown_hash_workers()
+    return asyncio.run(main())
+
+
+class TestPasswordHashing:
+    """Test cases for bcrypt hashing and verification"""
+
+    def test_round_trip(self):
+        """Test a hash verifies against its password only"""
+        hashed = hashing.hash_password("secret-password")
+
+        assert hashing.verify_password("secret-password", hashed)
+        assert not hashing.verify_password("wrong-password", hashed)
+
+    def test_cost_is_configurable(self):
+        """Test BCRYPT_ROUNDS sets the cost stored in the hash"""
+        assert hashing.hash_password("secret-password").startswith("$2b$04$")
+
+    def test_long_passwords_are_truncated(self):
+        """Test passwords over bcrypt's 72-byte limit hash instead of raising"""
+        hashed = hashing.hash_password("x" * 100)
+
+        assert hashing.verify_password("x" * 72, hashed)
+
+    def test_invalid_hash_does_not_verify(self):
+        """Test a stored value that is not a bcrypt hash is rejected"""
+        assert not hashing.verify_password("secret-password", "not-a-hash")
+
+
+class TestHashingPool:
+    """Test cases for running bcrypt in the dedicated process pool"""
+
+    def test_async_helpers_use_the_pool(self):
+        """Test hashing and verification complete in the pool and record queue wait"""
+        before = hashing.HASH_QUEUE_WAIT._values.get(("verify",), hashing.HASH_QUEUE_WAIT._zero())[0][:]
+
+        async def hash_and_verify():
+            hashed = await hashing.hash_password_async("secret-password")
+            return await asyncio.gather(
+                hashing.verify_password_async("secret-password", hashed),
+                hashing.verify_password_async("wrong-password", hashed),
+                hashing.verify_password_async("secret-password", hashed),
+            )
+
+        assert run_with_pool(hash_and_verify) == [True, False, True]
+        assert sum(hashing.HASH_QUEUE_WAIT._values[("verify",)][0]) == sum(before) + 3
+
+    def test_full_queue_is_rejected(self, monkeypatch):
+        """Test callers beyond the queue limit get a 503 instead of waiting"""
+        monkeypatch.setattr(hashing, "HASH_QUEUE_SIZE", 0)
+
+        with pytest.raises(HTTPException) as exc:
+            run_with_pool(lambda: hashing.verify_password_async("secret-password", "not-a-hash"))
+
+        assert exc.value.status_code == 503
+
+    def test_cancelled_caller_holds_the_slot_until_the_job_ends(self, monkeypatch):
+        """Test cancelling a caller does not free its worker's slot while the job still runs"""
+        monkeypatch.setattr(hashing, "HASH_WORKERS", 1)
+
+        async def cancel_while_running():
+            task = asyncio.create_task(hashing._run("hash", time.sleep, 1))
+            await asyncio.sleep(0.2)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            held = hashing._slots.locked()
+            await asyncio.wait_for(hashing._slots.acquire(), 5)
+            return held
+
+        assert run_with_pool(cancel_while_running)
+
+    def test_threadpool_without_pool(self):
+        """Test the async helpers still work when the pool was never started (e.g. scripts)"""
+        hashed = hashing.hash_password("secret-password")
+
+        assert asyncio.run(hashing.verify_password_async("secret-password", hashed))
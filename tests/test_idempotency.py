@@ -0,0 +1,264 @@
+# tests/test_idempotency.py
+import asyncio
+import threading
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from app.database import ConnectionPool
+from app.database_sqlite import connect, split_statements
+from app.main import app
+from app.migrate import MIGRATIONS_ROOT
+from app.models import orders
+from app.routes import orders as order_routes
+from app.utils import idempotency
+from app.utils.idempotency import IdempotencyStore, StoredResponse, request_hash
+
+client = TestClient(app)
+
+ORDER = {"customer_id": 1, "restaurant_id": 7, "total_price": 4.0, "items": [{"menu_item_id": 1, "quantity": 1, "price": 4.0}]}
+
+
+def counting_handler(calls, response):
+    async def handler():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        if isinstance(response, Exception):
+            raise response
+        return response
+    return handler
+
+
+class TestIdempotencyStore:
+    """Test cases for storing and replaying responses by key"""
+
+    def test_replay(self):
+        """Test a second request with the key replays the first response without running"""
+        async def main():
+            store, calls = IdempotencyStore(), []
+            handler = counting_handler(calls, StoredResponse(200, b'{"id":1}', "h"))
+            first = await store.run("k", "h", handler)
+            second = await store.run("k", "h", handler)
+            return first, second, calls
+
+        first, second, calls = asyncio.run(main())
+        assert (first.replayed, second.replayed) == (False, True)
+        assert second.body == b'{"id":1}'
+        assert len(calls) == 1
+
+    def test_different_request_is_refused(self):
+        """Test reusing a key for another request body is a 422"""
+        async def main():
+            store = IdempotencyStore()
+            await store.run("k", "h", counting_handler([], StoredResponse(200, b"{}", "h")))
+            await store.run("k", "other", counting_handler([], StoredResponse(200, b"{}", "other")))
+
+        with pytest.raises(HTTPException) as error:
+            asyncio.run(main())
+        assert error.value.status_code == 422
+
+    def test_concurrent_duplicates_run_once(self):
+        """Test requests arriving while the first is running wait for it and replay it"""
+        async def main():
+            store, calls = IdempotencyStore(), []
+            handler = counting_handler(calls, StoredResponse(200, b'{"id":1}', "h"))
+            responses = await asyncio.gather(*(store.run("k", "h", handler) for _ in range(5)))
+            return responses, calls
+
+        responses, calls = asyncio.run(main())
+        assert len(calls) == 1
+        assert sorted(response.replayed for response in responses) == [False, True, True, True, True]
+
+    def test_failures_are_not_stored(self):
+        """Test a failed first attempt lets the next request with the key run"""
+        async def main():
+            store, calls = IdempotencyStore(), []
+            failing = counting_handler(calls, HTTPException(status_code=400))
+            results = await asyncio.gather(
+                store.run("k", "h", failing),
+                store.run("k", "h", counting_handler(calls, StoredResponse(200, b"{}", "h"))),
+                return_exceptions=True,
+            )
+            return results, calls
+
+        (failed, succeeded), calls = asyncio.run(main())
+        assert isinstance(failed, HTTPException)
+        assert succeeded.replayed is False
+        assert len(calls) == 2
+
+    def test_request_hash_ignores_key_order(self):
+        """Test the fingerprint depends on the payload, not how it is laid out"""
+        assert request_hash({"a": 1, "b": [1, 2]}) == request_hash({"b": [1, 2], "a": 1})
+        assert request_hash({"a": 1}) != request_hash({"a": 2})
+
+    def test_responses_expire_with_the_key(self, monkeypatch):
+        """Test responses are not replayed from memory after the key's retention"""
+        monkeypatch.setattr(idempotency, "IDEMPOTENCY_CACHE_TTL", 3600)
+        monkeypatch.setattr(idempotency, "IDEMPOTENCY_KEY_RETENTION_HOURS", 0.25)
+
+        assert IdempotencyStore().responses.ttl == 900
+        assert IdempotencyStore(ttl=60).responses.ttl == 60
+
+
+@pytest.fixture
+def placed(monkeypatch):
+    """Stand in for orders.create_order_once, remembering keys like the idempotency_keys table"""
+    monkeypatch.setattr(order_routes, "idempotency_store", IdempotencyStore())
+    table, calls = {}, []
+
+    def fake_create_order_once(idempotency_key, request_hash, **order):
+        calls.append(idempotency_key)
+        key = (order["customer_id"], idempotency_key)
+        created = key not in table
+        if created:
+            table[key] = ({
+                "id": len(table) + 1, "customer_id": order["customer_id"], "restaurant_id": order["restaurant_id"],
+                "total_price": order["total_price"], "status": "placed", "payment_status": order["payment_status"],
+                "created_at": "2024-05-01T10:00:00", "restaurant_name": "Test Restaurant", "items": [],
+            }, request_hash)
+        return table[key][0], table[key][1], created
+
+    monkeypatch.setattr(orders, "create_order_once", fake_create_order_once)
+    return calls
+
+
+class TestIdempotentOrderEndpoint:
+    """Test cases for the Idempotency-Key header on POST /api/orders"""
+
+    def test_retry_returns_the_first_order(self, placed):
+        """Test a retried POST with the same key returns the same order from memory"""
+        first = client.post("/api/orders/", json=ORDER, headers={"Idempotency-Key": "abc"})
+        retry = client.post("/api/orders/", json=ORDER, headers={"Idempotency-Key": "abc"})
+
+        assert first.status_code == retry.status_code == 200
+        assert retry.json() == first.json()
+        assert "idempotent-replayed" not in first.headers
+        assert retry.headers["idempotent-replayed"] == "true"
+        assert placed == ["abc"]
+
+    def test_key_recorded_by_another_worker(self, placed):
+        """Test a key missing from memory is answered from the database record"""
+        client.post("/api/orders/", json=ORDER, headers={"Idempotency-Key": "abc"})
+        order_routes.idempotency_store.responses.clear()
+
+        retry = client.post("/api/orders/", json=ORDER, headers={"Idempotency-Key": "abc"})
+
+        assert retry.headers["idempotent-replayed"] == "true"
+        assert retry.json()["id"] == 1
+        assert placed == ["abc", "abc"]
+
+    def test_keys_are_per_customer(self, placed):
+        """Test two customers can use the same key"""
+        first = client.post("/api/orders/", json=ORDER, headers={"Idempotency-Key": "abc"})
+        other = client.post("/api/orders/", json={**ORDER, "customer_id": 2}, headers={"Idempotency-Key": "abc"})
+
+        assert other.json()["id"] != first.json()["id"]
+
+    def test_changed_request_is_refused(self, placed):
+        """Test the same key with a different cart is a 422"""
+        client.post("/api/orders/", json=ORDER, headers={"Idempotency-Key": "abc"})
+        response = client.post("/api/orders/", json={**ORDER, "total_price": 5.0}, headers={"Idempotency-Key": "abc"})
+
+        assert response.status_code == 422
+
+    def test_key_length(self, placed):
+        """Test overlong keys are validation errors"""
+        response = client.post("/api/orders/", json=ORDER, headers={"Idempotency-Key": "x" * 256})
+
+        assert response.status_code == 422
+        assert placed == []
+
+
+class TestCreateOrderOnceSQLite:
+    """Test cases for recording keys with their orders (SQLite backend)"""
+
+    @pytest.fixture
+    def pool(self, tmp_path, monkeypatch):
+        path = str(tmp_path / "idempotency.db")
+        conn = connect(path)
+        cur = conn.cursor()
+        for migration in sorted((MIGRATIONS_ROOT / "sqlite").glob("*.sql")):
+            for statement in split_statements(migration.read_text()):
+                cur.execute(statement)
+        cur.execute("INSERT INTO users (id, name, email, password) VALUES (1, 'Test User', 'test@example.com', 'x');")
+        cur.execute("INSERT INTO restaurants (id, name) VALUES (7, 'Test Restaurant');")
+        cur.execute("INSERT INTO menu_items (id, restaurant_id, name, price) VALUES (1, 7, 'Dosa', 4);")
+        conn.commit()
+        conn.close()
+
+        pool = ConnectionPool(lambda: connect(path), min_size=0, max_size=4)
+        monkeypatch.setattr(orders, "IS_SQLITE", True)
+        monkeypatch.setattr(orders, "db_connection", pool.connection)
+        yield pool
+        pool.close()
+
+    def order_count(self, pool):
+        with pool.connection() as conn:
+            cur = conn.cursor()
+            cur.execute("SELECT COUNT(*) AS n FROM orders;")
+            return cur.fetchone()["n"]
+
+    def test_second_use_returns_the_order(self, pool):
+        """Test a reused key inserts nothing and returns the first order and its request hash"""
+        first, first_hash, created = orders.create_order_once("abc", "h1", **ORDER)
+        again, stored_hash, created_again = orders.create_order_once("abc", "h2", **ORDER)
+
+        assert created and not created_again
+        assert again["id"] == first["id"]
+        assert (first_hash, stored_hash) == ("h1", "h1")
+        assert self.order_count(pool) == 1
+
+    def test_concurrent_uses_create_one_order(self, pool):
+        """Test simultaneous requests with one key create a single order"""
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(orders.create_order_once("abc", "h", **ORDER)))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sorted(created for _, _, created in results) == [False, False, False, True]
+        assert len({order["id"] for order, _, _ in results}) == 1
+        assert self.order_count(pool) == 1
+
+    def test_deleting_the_order_frees_the_key(self, pool):
+        """Test the key goes with its order"""
+        order, _, _ = orders.create_order_once("abc", "h", **ORDER)
+        orders.delete_order(order["id"])
+
+        _, _, created = orders.create_order_once("abc", "h", **ORDER)
+
+        assert created
+
+    def expire(self, pool):
+        with pool.connection() as conn:
+            cur = conn.cursor()
+            cur.execute("UPDATE idempotency_keys SET created_at = '2000-01-01 00:00:00.000';")
+            conn.commit()
+
+    def test_expired_key_places_a_new_order(self, pool):
+        """Test a key past its retention is used again instead of replaying the old order"""
+        first, _, _ = orders.create_order_once("abc", "h1", **ORDER)
+        self.expire(pool)
+
+        again, stored_hash, created = orders.create_order_once("abc", "h2", **ORDER)
+
+        assert created and again["id"] != first["id"]
+        assert stored_hash == "h2"
+        assert self.order_count(pool) == 2
+
+    def test_purge_deletes_only_expired_keys(self, pool):
+        """Test purging keeps the keys still within their retention"""
+        orders.create_order_once("old", "h", **ORDER)
+        self.expire(pool)
+        orders.create_order_once("new", "h", **ORDER)
+
+        assert orders.purge_idempotency_keys() == 1
+        _, _, created = orders.create_order_once("new", "h", **ORDER)
+        assert not created
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,99 @@
+# tests/test_images.py
+import io
+import time
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.models import uploads as upload_models
+from app.schemas.menu_item import MenuItemResponse
+from app.utils import images, uploads
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def png_bytes(size=(1200, 800), mode="RGB", color="orange"):
+    buffer = io.BytesIO()
+    Image.new(mode, size, color).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def upload_dir(tmp_path, monkeypatch):
+    """Store uploads in a temporary directory"""
+    monkeypatch.setattr(uploads, "UPLOAD_DIR", tmp_path)
+    monkeypatch.setattr(upload_models, "register_upload", lambda url, size, content_type=None: None)
+    return tmp_path
+
+
+class TestImageDerivatives:
+    """Test cases for thumbnail and WebP generation"""
+
+    def test_generate_derivatives(self, tmp_path):
+        """Test every variant is written as WebP at its fixed size"""
+        original = tmp_path / "dish.png"
+        original.write_bytes(png_bytes())
+
+        written = images.generate_derivatives(original)
+
+        assert sorted(path.name for path in written) == ["dish_card.webp", "dish_thumb.webp", "dish_webp.webp"]
+        with Image.open(tmp_path / "dish_thumb.webp") as thumb:
+            assert thumb.format == "WEBP"
+            assert thumb.size == (200, 200)
+        with Image.open(tmp_path / "dish_card.webp") as card:
+            assert card.size == (640, 360)
+        with Image.open(tmp_path / "dish_webp.webp") as full:
+            assert full.size == (1200, 800)
+        assert not list(tmp_path.glob("*.part"))
+
+    def test_transparency_is_kept(self, tmp_path):
+        """Test images with alpha keep it in the WebP variants"""
+        original = tmp_path / "logo.png"
+        original.write_bytes(png_bytes(mode="RGBA", color=(255, 165, 0, 128)))
+
+        images.generate_derivatives(original)
+
+        with Image.open(tmp_path / "logo_thumb.webp") as thumb:
+            assert thumb.mode == "RGBA"
+
+    def test_derivative_urls(self):
+        """Test variant URLs are derived for uploaded images only"""
+        assert images.derivative_urls("/uploads/abc.jpg") == {
+            "thumb": "/uploads/abc_thumb.webp",
+            "card": "/uploads/abc_card.webp",
+            "webp": "/uploads/abc_webp.webp",
+        }
+        assert images.derivative_urls("https://cdn.example.com/abc.jpg") == {}
+        assert images.derivative_urls(None) == {}
+
+    def test_upload_generates_derivatives_in_background(self, upload_dir):
+        """Test an upload returns variant URLs and the files appear afterwards"""
+        with TestClient(app) as client:
+            response = client.post("/api/upload-image", files={"file": ("dish.png", png_bytes(), "image/png")})
+            assert response.status_code == 200
+            variants = response.json()["variants"]
+            assert set(variants) == set(images.DERIVATIVES)
+
+            expected = [upload_dir / url.rsplit("/", 1)[-1] for url in variants.values()]
+            deadline = time.monotonic() + 30
+            while not all(path.exists() for path in expected) and time.monotonic() < deadline:
+                time.sleep(0.1)
+
+        assert all(path.exists() for path in expected)
+
+    def test_menu_items_only_advertise_written_variants(self, upload_dir, monkeypatch):
+        """Test a menu item whose image has no derivatives gets no variant URLs, until they are written"""
+        monkeypatch.setattr(images, "IMAGE_DERIVATIVES", True)
+        monkeypatch.setattr(images, "_written", images.TTLCache(maxsize=10, ttl=300))
+        original = upload_dir / "dish.png"
+        original.write_bytes(png_bytes((40, 40)))
+        item = MenuItemResponse(id=1, name="Dosa", price=4, category=None, image="/uploads/dish.png")
+
+        assert item.image_variants == {}
+
+        images.generate_derivatives(original)
+
+        assert item.image_variants == images.derivative_urls("/uploads/dish.png")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -258,7 +258,22 @@ class TestMenuItemRetrieval:
         retrieved_names = [item["name"] for item in data]
         for item_data in menu_items:
             assert item_data["name"] in retrieved_names
-    
+
+    def test_menu_cache_is_invalidated_by_writes(self, test_restaurant):
+        """Test adding or deleting an item is visible on the next cached read"""
+        restaurant_id = test_restaurant["id"]
+        client.get(f"/api/menu/{restaurant_id}")
+        assert client.get(f"/api/menu/{restaurant_id}").headers["X-Cache"] == "HIT"
+
+        created = client.post(f"/api/menu/{restaurant_id}", json={"name": "Test Cached", "price": 2.5}).json()
+        response = client.get(f"/api/menu/{restaurant_id}")
+        assert response.headers["X-Cache"] == "MISS"
+        assert "Test Cached" in [item["name"] for item in response.json()]
+
+        client.delete(f"/api/menu/{created['id']}")
+        response = client.get(f"/api/menu/{restaurant_id}")
+        assert "Test Cached" not in [item["name"] for item in response.json()]
+
     def test_get_menu_items_empty_restaurant(self, test_restaurant):
         """Test getting menu items for restaurant with no menu items"""
         restaurant_id = test_restaurant["id"]
@@ -0,0 +1,120 @@
+# tests/test_metrics.py
+from datetime import datetime
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.models import menu_item
+from app.utils import metrics
+
+client = TestClient(app)
+
+
+def sample(text, line_prefix):
+    """Value of the exposition line starting with line_prefix"""
+    for line in text.splitlines():
+        if line.startswith(line_prefix + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return None
+
+
+class TestMetricTypes:
+    """Test cases for the metric primitives and their exposition format"""
+
+    def test_counter(self):
+        """Test labelled counters render one series per label set"""
+        counter = metrics.Counter("test_events_total", "Test events", ("kind",))
+        counter.inc("a")
+        counter.inc("a", amount=2)
+        counter.inc("b")
+
+        lines = counter.render()
+
+        assert lines[:2] == ["# HELP test_events_total Test events", "# TYPE test_events_total counter"]
+        assert 'test_events_total{kind="a"} 3' in lines
+        assert 'test_events_total{kind="b"} 1' in lines
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test observations land in cumulative le buckets with sum and count"""
+        histogram = metrics.Histogram("test_latency_seconds", "Test latency", ("route",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 5.0):
+            histogram.observe("/x", value=value)
+
+        lines = histogram.render()
+
+        assert 'test_latency_seconds_bucket{route="/x",le="0.1"} 1' in lines
+        assert 'test_latency_seconds_bucket{route="/x",le="1.0"} 2' in lines
+        assert 'test_latency_seconds_bucket{route="/x",le="+Inf"} 3' in lines
+        assert 'test_latency_seconds_sum{route="/x"} 5.55' in lines
+        assert 'test_latency_seconds_count{route="/x"} 3' in lines
+
+    def test_label_values_are_escaped(self):
+        """Test quotes in label values cannot break the exposition format"""
+        counter = metrics.Counter("test_escaped_total", "Test escaping", ("path",))
+        counter.inc('a"b')
+
+        assert 'test_escaped_total{path="a\\"b"} 1' in counter.render()
+
+
+class TestMetricsEndpoint:
+    """Test cases for request instrumentation and /metrics"""
+
+    @pytest.fixture(autouse=True)
+    def fake_menu(self, monkeypatch):
+        """Serve a menu from memory, reporting two 10ms queries"""
+        def get_menu_items_by_restaurant(restaurant_id, limit, after=None):
+            metrics.record_query(0.01)
+            metrics.record_query(0.01)
+            return [{
+                "id": 1, "name": "Test Idli", "price": 3.5, "category": None,
+                "image": None, "created_at": datetime(2024, 1, 1),
+            }]
+
+        monkeypatch.setattr(menu_item, "get_menu_items_by_restaurant", get_menu_items_by_restaurant)
+        monkeypatch.setattr(
+            menu_item, "get_menu_version",
+            lambda restaurant_id: {"menu_version": 1, "menu_updated_at": datetime(2024, 1, 1)},
+        )
+        menu_item.menu_cache.clear()
+        yield
+        menu_item.menu_cache.clear()
+
+    def test_requests_are_labelled_by_route_template(self):
+        """Test latency and status are recorded per route template, not per URL"""
+        route = 'method="GET",route="/api/menu/{restaurant_id}"'
+        before = client.get("/metrics").text
+
+        client.get("/api/menu/41")
+        client.get("/api/menu/42")
+        text = client.get("/metrics").text
+
+        count = f"http_request_duration_seconds_count{{{route}}}"
+        assert sample(text, count) - (sample(before, count) or 0) == 2
+        assert sample(text, f'http_requests_total{{{route},status="200"}}') is not None
+        assert "/api/menu/41" not in text
+
+    def test_db_queries_are_counted_per_request(self):
+        """Test queries issued while serving a request are attributed to its route"""
+        route = 'method="GET",route="/api/menu/{restaurant_id}"'
+        before = client.get("/metrics").text
+
+        client.get("/api/menu/43")
+        text = client.get("/metrics").text
+
+        queries = f"http_request_db_queries_sum{{{route}}}"
+        assert sample(text, queries) - (sample(before, queries) or 0) == 2
+        assert sample(text, "db_queries_total") - sample(before, "db_queries_total") == 2
+        assert sample(text, f"http_request_db_duration_seconds_sum{{{route}}}") >= 0.02
+
+    def test_menu_cache_stats_are_exported(self):
+        """Test cache hit and miss counters appear on /metrics"""
+        client.get("/api/menu/44")
+        client.get("/api/menu/44")
+
+        text = client.get("/metrics").text
+
+        assert sample(text, 'app_cache_hits_total{cache="menu"}') >= 1
+        assert sample(text, 'app_cache_misses_total{cache="menu"}') >= 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
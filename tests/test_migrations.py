@@ -0,0 +1,106 @@
+# tests/test_migrations.py
+import re
+import pytest
+from datetime import datetime
+from app.database import IS_SQLITE, db_connection
+from app.migrate import discover_migrations, migration_status, run_migrations
+from app.models import analytics, menu_item, orders, resturants, search
+from app.utils.pagination import keyset_condition
+
+class TestMigrationFiles:
+    """Test cases for the migration files on disk"""
+
+    def test_versions_are_sequential(self):
+        """Test migrations are numbered 1..N without gaps"""
+        versions = [version for version, _, _ in discover_migrations()]
+
+        assert versions == list(range(1, len(versions) + 1))
+
+    def test_migrations_are_idempotent_sql(self):
+        """Test every DDL statement guards against re-running on an existing schema"""
+        for _, name, path in discover_migrations():
+            sql = path.read_text().upper()
+            assert sql.count("CREATE TABLE") == sql.count("CREATE TABLE IF NOT EXISTS"), name
+            assert sql.count("CREATE INDEX") == sql.count("CREATE INDEX IF NOT EXISTS"), name
+
+class TestMigrationRunner:
+    """Test cases for applying migrations to the database"""
+
+    def test_run_migrations_is_idempotent(self):
+        """Test a second run applies nothing and every migration is recorded"""
+        run_migrations()
+
+        assert run_migrations() == []
+        assert all(is_applied for _, _, is_applied in migration_status())
+
+# A plain table scan: Postgres "Seq Scan", SQLite "SCAN <table>" without an index
+# (SQLite also reports "SCAN <alias>" for reading back a materialized subquery)
+FULL_SCAN = re.compile(r"^SCAN (users|restaurants|menu_items|orders|order_items|\w+_sales_hourly)$", re.MULTILINE) if IS_SQLITE else re.compile(r"Seq Scan")
+INDEX_ACCESS = re.compile(r"USING (COVERING )?INDEX|USING INTEGER PRIMARY KEY") if IS_SQLITE else re.compile(r"Index")
+
+def explain(query, params):
+    with db_connection() as conn:
+        cur = conn.cursor()
+        if IS_SQLITE:
+            cur.execute("EXPLAIN QUERY PLAN " + query, params)
+            plan = "\n".join(row["detail"] for row in cur.fetchall())
+            cur.close()
+            return plan
+        # Tiny test tables would always be sequentially scanned; make the
+        # planner show whether an index *can* serve the query
+        cur.execute("SET LOCAL enable_seqscan = off;")
+        cur.execute("EXPLAIN " + query, params)
+        plan = "\n".join(row["QUERY PLAN"] for row in cur.fetchall())
+        cur.close()
+    return plan
+
+HOT_QUERIES = {
+    "customer orders": lambda: (
+        orders.GET_CUSTOMER_ORDERS_QUERY.format(keyset=keyset_condition(None)[0]), (1, 10)),
+    "customer orders, next page": lambda: (
+        orders.GET_CUSTOMER_ORDERS_QUERY.format(
+            keyset=keyset_condition((datetime(2024, 1, 1), 1), "o.created_at", "o.id", descending=True)[0]),
+        (1, datetime(2024, 1, 1), 1, 10)),
+    "restaurant orders": lambda: (
+        orders.GET_RESTAURANT_ORDERS_QUERY.format(keyset=keyset_condition(None)[0]), (1, 10)),
+    "order by id": lambda: (orders.GET_ORDER_QUERY, (1,)),
+    "order items": lambda: (orders.GET_ORDER_ITEMS_QUERY, (1,)),
+    "items for orders": lambda: (orders.GET_ITEMS_FOR_ORDERS_QUERY, ([1, 2, 3],)),
+    "idempotency key": lambda: (orders.GET_IDEMPOTENCY_KEY_QUERY, (1, "abc", datetime(2024, 1, 1))),
+    "expired idempotency keys": lambda: (orders.PURGE_IDEMPOTENCY_KEYS_QUERY, (datetime(2024, 1, 1),)),
+    "menu items": lambda: (
+        menu_item.GET_MENU_ITEMS_QUERY.format(keyset=keyset_condition(None)[0]), (1, 10)),
+    "restaurants, next page": lambda: (
+        resturants.GET_RESTAURANTS_QUERY.format(keyset=keyset_condition((datetime(2024, 1, 1), 1))[0]),
+        (datetime(2024, 1, 1), 1, 10)),
+    "restaurant by id": lambda: (resturants.GET_RESTAURANT_QUERY, (1,)),
+    "search": lambda: search._search_query("masala dosa", search.SEARCH_KINDS, 20, 0),
+    "sales per day": lambda: (
+        analytics._queries("day")[0], (1, datetime(2024, 1, 1), datetime(2024, 2, 1))),
+    "top items per day": lambda: (
+        analytics._queries("day")[1], (1, datetime(2024, 1, 1), datetime(2024, 2, 1), 5)),
+    "top items": lambda: (
+        analytics.TOP_ITEMS_QUERY, (1, datetime(2024, 1, 1), datetime(2024, 2, 1), 5)),
+    "user by email": lambda: (
+        "SELECT id, name, email, password, role, created_at FROM users WHERE email = %s;", ("a@example.com",)),
+}
+
+class TestHotQueryIndexes:
+    """Test cases proving each hot model query can be served by an index"""
+
+    @pytest.fixture(scope="class", autouse=True)
+    def migrated(self):
+        run_migrations()
+
+    @pytest.mark.parametrize("name", sorted(HOT_QUERIES))
+    def test_query_uses_index(self, name):
+        """Test the query plan has no sequential scans"""
+        query, params = HOT_QUERIES[name]()
+
+        plan = explain(query, params)
+
+        assert not FULL_SCAN.search(plan), plan
+        assert INDEX_ACCESS.search(plan), plan
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,180 @@
+# tests/test_orders.py
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.models import orders
+import psycopg2
+from psycopg2.extras import RealDictCursor
+
+client = TestClient(app)
+
+# Test database setup
+def setup_test_db():
+    """Setup test database and clean tables before tests"""
+    try:
+        conn = psycopg2.connect(
+            host="localhost",
+            database="zomato_clone",
+            user="postgres",
+            password="postgres123",
+            cursor_factory=RealDictCursor
+        )
+        cur = conn.cursor()
+
+        # Clean up test data (orders and menu items cascade from restaurants)
+        cur.execute("DELETE FROM restaurants WHERE name LIKE '%Test%'")
+        cur.execute("DELETE FROM users WHERE email LIKE '%test%'")
+        conn.commit()
+        cur.close()
+        conn.close()
+    except Exception as e:
+        print(f"Database setup error: {e}")
+
+def teardown_test_db():
+    """Clean up test data after tests"""
+    setup_test_db()
+
+@pytest.fixture(autouse=True)
+def setup_and_teardown():
+    """Setup and teardown for each test"""
+    setup_test_db()
+    yield
+    teardown_test_db()
+
+@pytest.fixture
+def query_counter(monkeypatch):
+    """Count the statements executed through dict cursors"""
+    executed = []
+    original_execute = RealDictCursor.execute
+
+    def counting_execute(self, query, vars=None):
+        executed.append(query)
+        return original_execute(self, query, vars)
+
+    monkeypatch.setattr(RealDictCursor, "execute", counting_execute)
+    return executed
+
+@pytest.fixture
+def order_setup():
+    """Create a customer, a restaurant and two menu items"""
+    user_response = client.post("/api/users/register", json={
+        "name": "Test Order Customer",
+        "email": "testordercustomer@example.com",
+        "password": "orderpassword123",
+        "role": "customer"
+    })
+    assert user_response.status_code == 200
+
+    restaurant_response = client.post("/api/restaurants", json={
+        "name": "Test Order Restaurant",
+        "description": "A test restaurant for orders",
+        "address": "1 Order Street",
+        "phone": "555-ORDR"
+    })
+    assert restaurant_response.status_code == 200
+    restaurant_id = restaurant_response.json()["id"]
+
+    menu_items = []
+    for name, price in [("Test Dosa", 4.5), ("Test Coffee", 1.25)]:
+        response = client.post(f"/api/menu/{restaurant_id}", json={"name": name, "price": price})
+        assert response.status_code == 200
+        menu_items.append(response.json())
+
+    return {
+        "customer_id": user_response.json()["user"]["id"],
+        "restaurant_id": restaurant_id,
+        "menu_items": menu_items,
+    }
+
+def place_orders(order_setup, count):
+    for _ in range(count):
+        items = [
+            {"menu_item_id": item["id"], "quantity": 2, "price": item["price"]}
+            for item in order_setup["menu_items"]
+        ]
+        response = client.post("/api/orders/", json={
+            "customer_id": order_setup["customer_id"],
+            "restaurant_id": order_setup["restaurant_id"],
+            "total_price": sum(item["price"] * 2 for item in items),
+            "items": items
+        })
+        assert response.status_code == 200
+
+class TestOrderCreation:
+    """Test cases for placing orders"""
+
+    def test_create_order_is_single_statement(self, order_setup, query_counter):
+        """Test the order, its items and the returned order cost one query for any cart size"""
+        items = [
+            {"menu_item_id": item["id"], "quantity": 3, "price": item["price"]}
+            for item in order_setup["menu_items"]
+        ]
+
+        order = orders.create_order(
+            order_setup["customer_id"], order_setup["restaurant_id"], 17.25, items
+        )
+
+        assert len(query_counter) == 1
+        assert order["restaurant_name"] == "Test Order Restaurant"
+        assert order["status"] == "placed"
+        assert [item["menu_item_id"] for item in order["items"]] == [item["menu_item_id"] for item in items]
+        assert all(item["quantity"] == 3 for item in order["items"])
+
+    def test_create_order_endpoint(self, order_setup):
+        """Test the create order endpoint returns the order with named items"""
+        place_orders(order_setup, 1)
+
+        response = client.get(f"/api/orders/restaurant/{order_setup['restaurant_id']}")
+
+        assert response.status_code == 200
+        items = response.json()[0]["items"]
+        assert sorted(item["name"] for item in items) == ["Test Coffee", "Test Dosa"]
+
+class TestOrderListings:
+    """Test cases for loading order lists with their items"""
+
+    def test_restaurant_orders_use_constant_queries(self, order_setup, query_counter):
+        """Test restaurant orders and items load in two queries regardless of order count"""
+        place_orders(order_setup, 5)
+        query_counter.clear()
+
+        restaurant_orders = orders.get_orders_by_restaurant(order_setup["restaurant_id"])
+
+        assert len(restaurant_orders) == 5
+        assert len(query_counter) == 2
+        for order in restaurant_orders:
+            assert sorted(item["name"] for item in order["items"]) == ["Test Coffee", "Test Dosa"]
+
+    def test_customer_orders_use_constant_queries(self, order_setup, query_counter):
+        """Test customer orders and items load in two queries regardless of order count"""
+        place_orders(order_setup, 5)
+        query_counter.clear()
+
+        customer_orders = orders.get_orders_by_customer(order_setup["customer_id"])
+
+        assert len(customer_orders) == 5
+        assert len(query_counter) == 2
+        for order in customer_orders:
+            assert len(order["items"]) == 2
+            assert all(isinstance(item["price"], float) for item in order["items"])
+
+    def test_orders_without_items_query_once(self, order_setup, query_counter):
+        """Test an empty listing does not issue an items query"""
+        customer_orders = orders.get_orders_by_customer(order_setup["customer_id"])
+
+        assert customer_orders == []
+        assert len(query_counter) == 1
+
+    def test_get_customer_orders_endpoint(self, order_setup):
+        """Test the customer orders endpoint returns nested items"""
+        place_orders(order_setup, 2)
+
+        response = client.get(f"/api/orders/customer/{order_setup['customer_id']}")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data) == 2
+        assert all(len(order["items"]) == 2 for order in data)
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,124 @@
+# tests/test_pagination.py
+import base64
+import pytest
+from datetime import datetime
+from fastapi.testclient import TestClient
+from app.main import app
+from app.utils.pagination import (
+    decode_cursor, decode_offset_cursor, encode_cursor, encode_offset_cursor, keyset_condition, NEXT_CURSOR_HEADER
+)
+from fastapi import HTTPException
+import psycopg2
+from psycopg2.extras import RealDictCursor
+
+client = TestClient(app)
+
+def cleanup_test_restaurants():
+    try:
+        conn = psycopg2.connect(
+            host="localhost",
+            database="zomato_clone",
+            user="postgres",
+            password="postgres123",
+            cursor_factory=RealDictCursor
+        )
+        cur = conn.cursor()
+        cur.execute("DELETE FROM restaurants WHERE name LIKE 'Test Page%'")
+        conn.commit()
+        cur.close()
+        conn.close()
+    except Exception as e:
+        print(f"Database cleanup error: {e}")
+
+class TestCursor:
+    """Test cases for opaque keyset cursors"""
+
+    def test_cursor_round_trip(self):
+        """Test a cursor decodes back to the keyset position it encodes"""
+        created_at = datetime(2024, 5, 17, 12, 30, 45, 123456)
+
+        cursor = encode_cursor(created_at, 42)
+
+        assert decode_cursor(cursor) == (created_at, 42)
+        assert "=" not in cursor
+
+    def test_offset_cursor_round_trip(self):
+        """Test offset cursors decode back to their offset and reject keyset cursors"""
+        assert decode_offset_cursor(encode_offset_cursor(40)) == 40
+        with pytest.raises(HTTPException):
+            decode_offset_cursor(encode_cursor(datetime(2024, 1, 1), 1))
+
+    def test_keyset_condition_first_page(self):
+        """Test the first page is not filtered"""
+        assert keyset_condition(None) == ("TRUE", ())
+
+    def test_keyset_condition_descending(self):
+        """Test descending listings continue below the cursor position"""
+        after = (datetime(2024, 1, 1), 7)
+
+        condition, params = keyset_condition(after, "o.created_at", "o.id", descending=True)
+
+        assert condition == "(o.created_at, o.id) < (%s, %s)"
+        assert params == after
+
+    @pytest.mark.parametrize("cursor", [
+        "not-a-cursor", "e30", encode_cursor(datetime(2024, 1, 1), 1)[:-3],
+        # ["2024-01-01T00:00:00",1e999]: an id too large for int()
+        base64.urlsafe_b64encode(b'["2024-01-01T00:00:00",1e999]').decode().rstrip("="),
+    ])
+    def test_invalid_cursor_is_rejected(self, cursor):
+        """Test malformed cursors return 400"""
+        response = client.get("/api/restaurants/", params={"cursor": cursor})
+
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Invalid cursor"
+
+    def test_cursor_header_is_exposed_to_credentialed_clients(self):
+        """Test cross-origin clients may read the cursor header (a "*" is ignored with credentials)"""
+        response = client.get("/", headers={"Origin": "http://localhost:5173"})
+
+        exposed = [name.strip() for name in response.headers["access-control-expose-headers"].split(",")]
+        assert NEXT_CURSOR_HEADER in exposed
+        assert "*" not in exposed
+
+    def test_limit_is_bounded(self):
+        """Test page size above the maximum is a validation error"""
+        response = client.get("/api/restaurants/", params={"limit": 100000})
+
+        assert response.status_code == 422
+
+class TestRestaurantPagination:
+    """Test cases for paging through restaurants"""
+
+    @pytest.fixture(autouse=True)
+    def cleanup(self):
+        cleanup_test_restaurants()
+        yield
+        cleanup_test_restaurants()
+
+    def test_pages_cover_all_rows_once(self):
+        """Test following next cursors visits every restaurant exactly once"""
+        created_ids = set()
+        for i in range(5):
+            response = client.post("/api/restaurants", json={"name": f"Test Page {i}", "address": "1 Page Road"})
+            assert response.status_code == 200
+            created_ids.add(response.json()["id"])
+
+        seen_ids = []
+        params = {"limit": 2}
+        while True:
+            response = client.get("/api/restaurants/", params=params)
+            assert response.status_code == 200
+            page = response.json()
+            assert len(page) <= 2
+            seen_ids.extend(r["id"] for r in page)
+            next_cursor = response.headers.get(NEXT_CURSOR_HEADER)
+            if not next_cursor:
+                break
+            params = {"limit": 2, "cursor": next_cursor}
+
+        assert len(seen_ids) == len(set(seen_ids))
+        assert created_ids <= set(seen_ids)
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,161 @@
+# tests/test_search.py
+import pytest
+from fastapi.testclient import TestClient
+from app.database import ConnectionPool
+from app.database_sqlite import connect, split_statements
+from app.main import app
+from app.migrate import MIGRATIONS_ROOT
+from app.models import search
+from app.utils.pagination import NEXT_CURSOR_HEADER
+
+client = TestClient(app)
+
+
+def result(result_id, type="menu_item", score=1.0):
+    return {
+        "type": type, "id": result_id, "name": f"Test Dosa {result_id}", "category": None,
+        "restaurant_id": 7, "restaurant_name": "Test Restaurant", "score": score,
+    }
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    calls = []
+
+    def fake_search(text, kinds=search.SEARCH_KINDS, limit=search.DEFAULT_SEARCH_LIMIT, offset=0):
+        calls.append({"text": text, "kinds": kinds, "limit": limit, "offset": offset})
+        return [result(n) for n in range(offset, offset + limit)][:3 - offset]
+
+    monkeypatch.setattr(search, "search", fake_search)
+    return calls
+
+
+class TestSearchEndpoint:
+    """Test cases for the search route"""
+
+    def test_results_and_next_page(self, calls):
+        """Test a full page carries a cursor to the rest of the results"""
+        response = client.get("/api/search", params={"q": "dosa", "limit": 2})
+
+        assert response.status_code == 200
+        assert [row["id"] for row in response.json()] == [0, 1]
+        assert calls == [{"text": "dosa", "kinds": search.SEARCH_KINDS, "limit": 3, "offset": 0}]
+
+        response = client.get("/api/search", params={"q": "dosa", "limit": 2,
+                                                     "cursor": response.headers[NEXT_CURSOR_HEADER]})
+
+        assert [row["id"] for row in response.json()] == [2]
+        assert calls[1]["offset"] == 2
+        assert NEXT_CURSOR_HEADER not in response.headers
+
+    def test_type_filter(self, calls):
+        """Test type= restricts the search to one kind of result"""
+        client.get("/api/search", params={"q": "dosa", "type": "restaurant"})
+
+        assert calls[0]["kinds"] == ("restaurant",)
+
+    @pytest.mark.parametrize("params", [{}, {"q": ""}, {"q": "dosa", "type": "dish"}, {"q": "dosa", "limit": 1000}])
+    def test_invalid_parameters(self, calls, params):
+        """Test missing or out-of-range parameters are validation errors"""
+        assert client.get("/api/search", params=params).status_code == 422
+        assert calls == []
+
+    def test_invalid_cursor(self, calls):
+        """Test keyset cursors from the list endpoints are not accepted"""
+        response = client.get("/api/search", params={"q": "dosa", "cursor": "not-a-cursor"})
+
+        assert response.status_code == 400
+
+
+class TestSearchSQLite:
+    """Test cases for the FTS5 search queries (SQLite backend)"""
+
+    @pytest.fixture
+    def pool(self, tmp_path, monkeypatch):
+        path = str(tmp_path / "search.db")
+        conn = connect(path)
+        cur = conn.cursor()
+        for migration in sorted((MIGRATIONS_ROOT / "sqlite").glob("*.sql")):
+            for statement in split_statements(migration.read_text()):
+                cur.execute(statement)
+        cur.execute("""
+            INSERT INTO restaurants (id, name, description, address) VALUES
+            (1, 'Dosa Corner', 'South Indian breakfast', '12 MG Road'),
+            (2, 'Pizza Place', 'Wood fired pizzas', '4 Dosa Street'),
+            (3, 'Noodle Bar', 'Hand pulled noodles', '9 Park Lane');
+        """)
+        cur.execute("""
+            INSERT INTO menu_items (id, restaurant_id, name, price, category) VALUES
+            (1, 1, 'Masala Dosa', 4.5, 'Main Course'),
+            (2, 1, 'Filter Coffee', 1.5, 'Beverage'),
+            (3, 2, 'Margherita Pizza', 8, 'Main Course'),
+            (4, 3, 'Dan Dan Noodles', 7, 'Main Course');
+        """)
+        conn.commit()
+        conn.close()
+
+        pool = ConnectionPool(lambda: connect(path), min_size=0, max_size=2)
+        monkeypatch.setattr(search, "IS_SQLITE", True)
+        monkeypatch.setattr(search, "read_connection", pool.connection)
+        yield pool
+        pool.close()
+
+    def ids(self, rows):
+        return [(row["type"], row["id"]) for row in rows]
+
+    def test_name_matches_rank_first(self, pool):
+        """Test a name match outranks an address match"""
+        rows = search.search("dosa", kinds=("restaurant",))
+
+        assert self.ids(rows) == [("restaurant", 1), ("restaurant", 2)]
+        assert rows[0]["score"] > rows[1]["score"]
+
+    def test_candidates_are_the_best_matches(self, pool, monkeypatch):
+        """Test the per-table candidate cap keeps the best match, not the first row"""
+        with pool.connection() as conn:
+            cur = conn.cursor()
+            cur.execute("INSERT INTO restaurants (id, name, description) VALUES (4, 'Dosa Dosa', 'Dosa all day');")
+            conn.commit()
+        monkeypatch.setattr(search, "SEARCH_MAX_CANDIDATES", 1)
+
+        assert self.ids(search.search("dosa", kinds=("restaurant",))) == [("restaurant", 4)]
+
+    def test_prefixes_and_stems(self, pool):
+        """Test partial words and plurals match"""
+        assert self.ids(search.search("marg")) == [("menu_item", 3)]
+        assert ("menu_item", 3) in self.ids(search.search("pizzas", kinds=("menu_item",)))
+
+    def test_every_word_must_match(self, pool):
+        """Test multi-word searches match rows containing all the words"""
+        rows = search.search("main noodles")
+
+        assert self.ids(rows) == [("menu_item", 4)]
+        assert rows[0]["restaurant_name"] == "Noodle Bar"
+
+    def test_pages(self, pool):
+        """Test limit and offset page through one ranking"""
+        everything = self.ids(search.search("main", limit=10))
+
+        assert len(everything) == 3
+        assert self.ids(search.search("main", limit=2)) + self.ids(search.search("main", limit=2, offset=2)) == everything
+
+    def test_index_follows_changes(self, pool):
+        """Test updates and cascading deletes are reflected in the index"""
+        with pool.connection() as conn:
+            cur = conn.cursor()
+            cur.execute("UPDATE menu_items SET name = 'Cold Coffee' WHERE id = 2;")
+            cur.execute("DELETE FROM restaurants WHERE id = 3;")
+            conn.commit()
+
+        assert self.ids(search.search("cold")) == [("menu_item", 2)]
+        assert search.search("filter") == []
+        assert search.search("noodles") == []
+
+    @pytest.mark.parametrize("text", ["", "  ", "!!"])
+    def test_text_without_words(self, pool, text):
+        """Test text without any words matches nothing"""
+        assert search.search(text) == []
+
+    def test_query_syntax_is_not_interpreted(self, pool):
+        """Test quotes and FTS5 operators in the text are searched as plain words"""
+        assert self.ids(search.search('"masala" dosa*')) == [("menu_item", 1)]
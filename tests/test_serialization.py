@@ -0,0 +1,100 @@
+# tests/test_serialization.py
+import json
+from datetime import datetime
+from decimal import Decimal
+from typing import List, Optional
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+from app.main import app
+from app.models import orders
+from app.schemas.menu_item import MenuItemResponse
+from app.schemas.order import OrderResponse
+from app.utils import serialization
+from app.utils.serialization import JSONRenderer
+
+client = TestClient(app)
+
+
+def order_row(order_id=1):
+    """An order row as the models return it: Decimal prices and extra columns"""
+    return {
+        "id": order_id, "customer_id": 2, "restaurant_id": 3, "total_price": Decimal("24.75"),
+        "status": "placed", "payment_status": "Unpaid", "created_at": datetime(2024, 1, 1, 12, 30, 0, 250000),
+        "restaurant_name": "Test Restaurant", "updated_at": datetime(2024, 1, 2),
+        "items": [{"id": 5, "menu_item_id": 6, "name": "Test Idli", "quantity": 2, "price": Decimal("8.25")}],
+    }
+
+
+class TestJSONRenderer:
+    """Test cases for rendering rows straight to JSON"""
+
+    @pytest.mark.parametrize("fast", [True, False], ids=["orjson", "typeadapter"])
+    def test_matches_pydantic_output(self, fast, monkeypatch):
+        """Test the rendered JSON equals what the response model would produce"""
+        if fast:
+            pytest.importorskip("orjson")
+        else:
+            monkeypatch.setattr(serialization, "orjson", None)
+        rows = [order_row(1), order_row(2)]
+        expected = [OrderResponse(**row).model_dump(mode="json") for row in rows]
+
+        rendered = json.loads(JSONRenderer(OrderResponse, many=True).render(rows))
+
+        assert rendered == expected
+        assert "updated_at" not in rendered[0]
+
+    def test_single_row(self):
+        """Test a renderer without many=True renders one object"""
+        rendered = json.loads(JSONRenderer(OrderResponse).render(order_row()))
+
+        assert rendered["total_price"] == 24.75
+        assert rendered["items"][0]["price"] == 8.25
+
+    def test_optional_nested_schema(self):
+        """Test optional and nested fields are projected too"""
+        class Child(BaseModel):
+            name: str
+
+        class Parent(BaseModel):
+            note: Optional[str]
+            child: Optional[Child]
+            children: List[Child]
+
+        renderer = JSONRenderer(Parent)
+        row = {"note": None, "child": None, "children": [{"name": "a", "extra": 1}]}
+
+        assert json.loads(renderer.render(row)) == {"note": None, "child": None, "children": [{"name": "a"}]}
+
+    def test_unsupported_schemas_are_rejected_up_front(self):
+        """Test schemas the projection cannot honour fail when the renderer is built"""
+        class Tagged(BaseModel):
+            tags: dict
+
+        with pytest.raises(TypeError):
+            JSONRenderer(Tagged)
+        with pytest.raises(TypeError):
+            JSONRenderer(MenuItemResponse)  # computed image_variants
+
+
+class TestOrderRoutes:
+    """Test cases for the order routes' JSON output"""
+
+    def test_list_is_rendered_from_rows(self, monkeypatch):
+        """Test a page of orders is rendered with its next-page cursor"""
+        monkeypatch.setattr(
+            orders, "get_orders_by_restaurant", lambda restaurant_id, limit, after=None: [order_row(1), order_row(2)]
+        )
+
+        response = client.get("/api/orders/restaurant/3?limit=1")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        assert response.headers["X-Next-Cursor"]
+        assert response.json() == [OrderResponse(**order_row(1)).model_dump(mode="json")]
+
+    def test_missing_order(self, monkeypatch):
+        """Test a missing order is still a 404"""
+        monkeypatch.setattr(orders, "get_order", lambda order_id: None)
+
+        assert client.get("/api/orders/99").status_code == 404
@@ -0,0 +1,272 @@
+# tests/test_upload.py
+import hashlib
+import uuid
+from contextlib import contextmanager
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from app import upload_gc
+from app.database import IS_SQLITE, ConnectionPool, db_connection
+from app.database_sqlite import connect, split_statements
+from app.main import app
+from app.migrate import MIGRATIONS_ROOT
+from app.models import uploads as upload_models
+from app.utils import uploads
+
+client = TestClient(app)
+
+BOUNDARY = "testboundary"
+
+
+@pytest.fixture(autouse=True)
+def upload_dir(tmp_path, monkeypatch):
+    """Store uploads in a temporary directory"""
+    monkeypatch.setattr(uploads, "UPLOAD_DIR", tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def registered(monkeypatch):
+    """Record uploads instead of registering them in the database"""
+    calls = []
+    monkeypatch.setattr(upload_models, "register_upload", lambda *args: calls.append(args))
+    return calls
+
+
+def multipart_chunks(content, content_type="image/png", filename="photo.png", chunk_size=64 * 1024):
+    """Yield a multipart body in chunks (sent without a Content-Length header)"""
+    yield (
+        f"--{BOUNDARY}\r\n"
+        f'Content-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+        f"Content-Type: {content_type}\r\n\r\n"
+    ).encode()
+    for start in range(0, len(content), chunk_size):
+        yield content[start:start + chunk_size]
+    yield f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+@pytest.mark.usefixtures("registered")
+class TestImageUpload:
+    """Test cases for the streaming image upload endpoint"""
+
+    def test_upload_image(self, upload_dir):
+        """Test an image is stored under a generated name and its URL returned"""
+        content = b"\x89PNG" + bytes(range(256)) * 1000
+        response = client.post("/api/upload-image", files={"file": ("photo.png", content, "image/png")})
+
+        assert response.status_code == 200
+        image_url = response.json()["image_url"]
+        assert image_url.startswith("/uploads/") and image_url.endswith(".png")
+        stored = upload_dir / image_url.rsplit("/", 1)[-1]
+        assert stored.read_bytes() == content
+        assert [path.name for path in upload_dir.iterdir()] == [stored.name]
+
+    def test_upload_rejects_non_image(self, upload_dir):
+        """Test non-image files are rejected before anything is written"""
+        response = client.post("/api/upload-image", files={"file": ("notes.txt", b"hello", "text/plain")})
+
+        assert response.status_code == 400
+        assert response.json()["detail"] == "File must be an image"
+        assert list(upload_dir.iterdir()) == []
+
+    def test_upload_rejects_large_content_length(self, upload_dir):
+        """Test an oversized declared body is rejected up front"""
+        content = b"x" * (uploads.MAX_UPLOAD_SIZE + 1)
+        response = client.post("/api/upload-image", files={"file": ("big.png", content, "image/png")})
+
+        assert response.status_code == 400
+        assert "File size too large" in response.json()["detail"]
+        assert list(upload_dir.iterdir()) == []
+
+    def test_upload_aborts_once_limit_is_exceeded(self, upload_dir):
+        """Test a streamed body without Content-Length is cut off at the limit"""
+        response = client.post(
+            "/api/upload-image",
+            content=multipart_chunks(b"x" * (uploads.MAX_UPLOAD_SIZE * 2)),
+            headers={"Content-Type": f"multipart/form-data; boundary={BOUNDARY}"},
+        )
+
+        assert response.status_code == 400
+        assert "File size too large" in response.json()["detail"]
+        assert list(upload_dir.iterdir()) == []
+
+    def test_unsafe_extension_is_replaced(self, upload_dir):
+        """Test path characters in the client filename never reach the stored name"""
+        response = client.post("/api/upload-image", files={"file": ("x./../../evil", b"img", "image/png")})
+
+        assert response.status_code == 200
+        assert response.json()["image_url"].endswith(".jpg")
+        assert len(list(upload_dir.iterdir())) == 1
+
+    def test_upload_requires_file_field(self):
+        """Test a multipart body without the file field is rejected"""
+        response = client.post("/api/upload-image", data={"other": "value"}, files={"other_file": ("a.png", b"a", "image/png")})
+
+        assert response.status_code == 400
+
+    def test_upload_is_named_by_content(self, upload_dir, registered):
+        """Test the stored name is the SHA-256 of the bytes, registered before the file appears"""
+        content = b"\x89PNG" + b"dish" * 100
+        response = client.post("/api/upload-image", files={"file": ("photo.png", content, "image/png")})
+
+        image_url = response.json()["image_url"]
+        assert image_url == f"/uploads/{hashlib.sha256(content).hexdigest()}.png"
+        assert registered == [(image_url, len(content), "image/png")]
+
+    def test_same_content_is_stored_once(self, upload_dir, registered):
+        """Test uploading identical bytes again returns the same URL without a second file"""
+        content = b"\x89PNG" + b"dosa" * 100
+        first = client.post("/api/upload-image", files={"file": ("a.png", content, "image/png")}).json()
+        second = client.post("/api/upload-image", files={"file": ("b.jpeg", content, "image/jpeg")}).json()
+
+        assert second["image_url"] == first["image_url"]
+        assert [path.name for path in upload_dir.iterdir()] == [first["image_url"].rsplit("/", 1)[-1]]
+        assert len(registered) == 2
+
+    def test_failed_registration_stores_nothing(self, upload_dir, monkeypatch):
+        """Test nothing is left on disk when the upload cannot be registered"""
+        def fail(*args):
+            raise HTTPException(status_code=503, detail="Database unavailable")
+        monkeypatch.setattr(upload_models, "register_upload", fail)
+
+        response = client.post("/api/upload-image", files={"file": ("photo.png", b"img", "image/png")})
+
+        assert response.status_code == 503
+        assert list(upload_dir.iterdir()) == []
+
+
+class TestServingUploads:
+    """Test cases for serving stored uploads as immutable files"""
+
+    @pytest.fixture
+    def files(self, upload_dir):
+        content = bytes(range(256)) * 40
+        digest = hashlib.sha256(content).hexdigest()
+        (upload_dir / f"{digest}.png").write_bytes(content)
+        (upload_dir / f"{digest}_thumb.webp").write_bytes(b"thumb")
+        served = Starlette(routes=[Mount("/uploads", uploads.UploadFiles(directory=upload_dir))])
+        return TestClient(served), digest, content
+
+    def test_immutable_headers(self, files):
+        """Test originals get their hash as ETag and every file is cacheable forever"""
+        client, digest, content = files
+        response = client.get(f"/uploads/{digest}.png")
+
+        assert response.content == content
+        assert response.headers["cache-control"] == uploads.IMMUTABLE_CACHE_CONTROL
+        assert response.headers["etag"] == f'"{digest}"'
+        assert response.headers["accept-ranges"] == "bytes"
+
+        variant = client.get(f"/uploads/{digest}_thumb.webp")
+        assert variant.headers["cache-control"] == uploads.IMMUTABLE_CACHE_CONTROL
+
+    def test_revalidation(self, files):
+        """Test a matching If-None-Match is answered with 304"""
+        client, digest, _ = files
+        response = client.get(f"/uploads/{digest}.png", headers={"If-None-Match": f'"{digest}"'})
+
+        assert response.status_code == 304
+        assert response.content == b""
+
+    def test_range_request(self, files):
+        """Test byte ranges are served with 206"""
+        client, digest, content = files
+        response = client.get(f"/uploads/{digest}.png", headers={"Range": "bytes=100-199"})
+
+        assert response.status_code == 206
+        assert response.content == content[100:200]
+        assert response.headers["content-range"] == f"bytes 100-199/{len(content)}"
+
+
+class TestUploadGCSQLite:
+    """Test cases for reference counting and garbage collection (SQLite backend)"""
+
+    @pytest.fixture
+    def pool(self, tmp_path_factory, monkeypatch):
+        path = str(tmp_path_factory.mktemp("db") / "uploads.db")
+        conn = connect(path)
+        cur = conn.cursor()
+        for migration in sorted((MIGRATIONS_ROOT / "sqlite").glob("*.sql")):
+            for statement in split_statements(migration.read_text()):
+                cur.execute(statement)
+        cur.execute("INSERT INTO restaurants (id, name) VALUES (7, 'Test Restaurant');")
+        conn.commit()
+        conn.close()
+
+        pool = ConnectionPool(lambda: connect(path), min_size=0, max_size=2)
+        monkeypatch.setattr(upload_models, "db_connection", pool.connection)
+        yield pool
+        pool.close()
+
+    def execute(self, pool, query, params=()):
+        with pool.connection() as conn:
+            cur = conn.cursor()
+            cur.execute(query, params)
+            conn.commit()
+
+    def ref_count(self, url):
+        return upload_models.get_upload(url)["ref_count"]
+
+    def test_menu_items_are_counted(self, pool):
+        """Test references follow menu items being added, repointed and deleted"""
+        upload_models.register_upload("/uploads/a.png", 10, "image/png")
+        upload_models.register_upload("/uploads/b.png", 10, "image/png")
+
+        self.execute(pool, "INSERT INTO menu_items (id, restaurant_id, name, price, image) VALUES (1, 7, 'Dosa', 4, '/uploads/a.png');")
+        self.execute(pool, "INSERT INTO menu_items (id, restaurant_id, name, price, image) VALUES (2, 7, 'Vada', 2, '/uploads/a.png');")
+        assert self.ref_count("/uploads/a.png") == 2
+
+        self.execute(pool, "UPDATE menu_items SET image = '/uploads/b.png' WHERE id = 1;")
+        assert (self.ref_count("/uploads/a.png"), self.ref_count("/uploads/b.png")) == (1, 1)
+
+        self.execute(pool, "DELETE FROM menu_items WHERE id = 2;")
+        assert self.ref_count("/uploads/a.png") == 0
+
+    def test_collect_unreferenced(self, pool, upload_dir):
+        """Test only unreferenced uploads past the grace period are deleted, with their variants"""
+        for name in ("old.png", "old_thumb.webp", "used.png", "new.png"):
+            (upload_dir / name).write_bytes(b"x")
+        for name in ("old", "used", "new"):
+            upload_models.register_upload(f"/uploads/{name}.png", 1, "image/png")
+        self.execute(pool, "UPDATE uploads SET uploaded_at = '2000-01-01 00:00:00.000' WHERE url != '/uploads/new.png';")
+        self.execute(pool, "INSERT INTO menu_items (restaurant_id, name, price, image) VALUES (7, 'Dosa', 4, '/uploads/used.png');")
+
+        assert upload_gc.collect(grace_hours=24) == ["/uploads/old.png"]
+        assert sorted(path.name for path in upload_dir.iterdir()) == ["new.png", "used.png"]
+        assert upload_models.get_upload("/uploads/old.png") is None
+
+
+@pytest.mark.skipif(IS_SQLITE, reason="SQLite timestamps are always UTC")
+class TestUploadGCTimeZone:
+    """Test cases for garbage collection on a database server that is not on UTC"""
+
+    def test_fresh_upload_survives_behind_utc(self, monkeypatch):
+        """Test an upload registered a moment ago is kept when the session TimeZone is behind UTC"""
+        @contextmanager
+        def behind_utc():
+            with db_connection() as conn:
+                cur = conn.cursor()
+                cur.execute("SET LOCAL TimeZone = 'America/New_York';")
+                cur.close()
+                yield conn
+
+        monkeypatch.setattr(upload_models, "db_connection", behind_utc)
+        url = f"/uploads/{uuid.uuid4().hex}.png"
+        upload_models.register_upload(url, 1, "image/png")
+        try:
+            upload_models.register_upload(url, 1, "image/png")  # the ON CONFLICT path
+
+            assert url not in upload_gc.collect(grace_hours=1)
+            assert upload_models.get_upload(url) is not None
+        finally:
+            with db_connection() as conn:
+                cur = conn.cursor()
+                cur.execute("DELETE FROM uploads WHERE url = %s;", (url,))
+                conn.commit()
+                cur.close()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])